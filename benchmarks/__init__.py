@@ -0,0 +1 @@
+"""Benchmarks for the sync and Git hot paths against a local Dify stand-in"""
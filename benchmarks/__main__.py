@@ -0,0 +1,162 @@
+"""Run the benchmark suite: ``python -m benchmarks`` (or ``make bench``)"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.fixtures import generate_bare_repository  # noqa: E402
+from benchmarks.harness import Benchmark, format_table, run  # noqa: E402
+from benchmarks.mock_dify import MockDifyServer, Workspace  # noqa: E402
+from models.repository import RepositoryConfig  # noqa: E402
+from services.dify_api import DifyAPIClient  # noqa: E402
+from services.git_service import GitService  # noqa: E402
+from services.state_store import SyncStateStore  # noqa: E402
+from services.sync_service import SyncService  # noqa: E402
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("--workflows", type=int, default=100, help="Workflows in the mock workspace")
+    parser.add_argument("--applications", type=int, default=100, help="Applications in the mock workspace")
+    parser.add_argument("--nodes", type=int, default=20, help="Nodes per workflow graph")
+    parser.add_argument("--files", type=int, default=200, help="Exported files in the generated repository")
+    parser.add_argument("--commits", type=int, default=300, help="Commits on the generated repository's main branch")
+    parser.add_argument("--branches", type=int, default=100, help="Extra branches in the generated repository")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs of each sync benchmark")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added latency per mock API request")
+    parser.add_argument("--only", action="append", default=[], help="Run only benchmarks whose name contains this")
+    parser.add_argument("--json", dest="json_path", help="Also write the results as JSON to this file")
+    parser.add_argument("--no-isolate", action="store_true", help="Run benchmarks in this process instead of forked children")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated work directory")
+    return parser.parse_args(argv)
+
+
+def _sync_benchmarks(
+    args: argparse.Namespace, work_dir: Path, api_url: str, git_service: GitService, config: RepositoryConfig
+) -> List[Benchmark]:
+    def sync_service() -> SyncService:
+        store = SyncStateStore(work_dir / f"state-{os.getpid()}.db")
+        return SyncService(git_service, DifyAPIClient(api_url=api_url, api_key="bench"), store)
+
+    def export_full() -> Callable[[], None]:
+        service = sync_service()
+
+        def operation():
+            # Forget recorded hashes so every object is fetched, serialized and compared again
+            service.state_store.forget_objects(config.id)
+            result = asyncio.run(service.export_all(config))
+            assert result["success"], result
+
+        return operation
+
+    def export_incremental() -> Callable[[], None]:
+        service = sync_service()
+        asyncio.run(service.export_all(config, incremental=True))
+        return lambda: asyncio.run(service.export_all(config, incremental=True))
+
+    def import_forced() -> Callable[[], None]:
+        service = sync_service()
+
+        def operation():
+            result = asyncio.run(service.import_all(config, force=True))
+            assert result["success"], result
+
+        return operation
+
+    def import_unchanged() -> Callable[[], None]:
+        service = sync_service()
+        asyncio.run(service.import_all(config, force=True))
+        return lambda: asyncio.run(service.import_all(config))
+
+    objects = args.workflows + args.applications
+    return [
+        Benchmark("export_all (full)", export_full, items=objects, repeat=args.repeat),
+        Benchmark("export_all (incremental)", export_incremental, items=objects, repeat=args.repeat),
+        Benchmark("import_all (forced)", import_forced, items=args.files + objects, repeat=args.repeat),
+        Benchmark("import_all (unchanged)", import_unchanged, items=args.files + objects, repeat=args.repeat),
+    ]
+
+
+def _git_benchmarks(args: argparse.Namespace, git_service: GitService, config: RepositoryConfig) -> List[Benchmark]:
+    def commit() -> Callable[[], None]:
+        repo = git_service.get_repo(config)
+        revision = [0]
+
+        def operation():
+            revision[0] += 1
+            for index in range(0, args.files, max(1, args.files // 50)):
+                kind = "workflows" if index % 2 == 0 else "applications"
+                path = Path(repo.working_dir) / kind / f"obj-{index}_object-{index}.json"
+                data = {"id": f"obj-{index}", "name": f"Object {index}", "revision": f"bench-{revision[0]}"}
+                path.write_text(json.dumps({"id": data["id"], "name": data["name"], "data": data}, indent=2))
+            assert git_service.commit(repo, f"Benchmark commit {revision[0]}")["success"]
+
+        return operation
+
+    def query(method: str, *extra) -> Callable[[], Callable[[], None]]:
+        def setup():
+            repo = git_service.get_repo(config)
+            return lambda: getattr(git_service, method)(repo, *extra)
+
+        return setup
+
+    return [
+        Benchmark("commit", commit, items=min(args.files, 50), repeat=args.repeat),
+        Benchmark("get_branches", query("get_branches"), items=args.branches + 1, repeat=args.repeat * 10),
+        Benchmark("get_commit_history", query("get_commit_history", 100), items=100, repeat=args.repeat * 10),
+        Benchmark("get_repository_status", query("get_repository_status"), repeat=args.repeat * 10),
+    ]
+
+
+def _benchmarks(args: argparse.Namespace, work_dir: Path, api_url: str) -> List[Benchmark]:
+    origin = generate_bare_repository(work_dir / "origin.git", args.files, args.commits, args.branches)
+    git_service = GitService(temp_dir=str(work_dir / "git"))
+    config = RepositoryConfig(id="bench", name="bench", url=f"file://{origin}", workspace_id="bench")
+    git_service.clone_repository(config)
+    config.local_path = str(git_service.temp_dir / config.id)
+
+    return _sync_benchmarks(args, work_dir, api_url, git_service, config) + _git_benchmarks(args, git_service, config)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    work_dir = Path(tempfile.mkdtemp(prefix="dify-git-bench-"))
+    workspace = Workspace(args.workflows, args.applications, args.nodes)
+
+    try:
+        with MockDifyServer(workspace, latency=args.latency_ms / 1000) as server:
+            benchmarks = _benchmarks(args, work_dir, server.url)
+            selected = [b for b in benchmarks if not args.only or any(name in b.name for name in args.only)]
+
+            results = []
+            for benchmark in selected:
+                print(f"running {benchmark.name} ...", file=sys.stderr, flush=True)
+                results.append(run(benchmark, isolate=not args.no_isolate))
+
+        title = (
+            f"{args.workflows} workflows x {args.nodes} nodes, {args.applications} applications; "
+            f"repository with {args.files} files, {args.commits} commits, {args.branches} branches"
+        )
+        print(format_table(results, title))
+        if args.json_path:
+            with open(args.json_path, "w") as f:
+                json.dump({"parameters": vars(args), "results": [asdict(r) for r in results]}, f, indent=2)
+    finally:
+        if args.keep:
+            print(f"work directory kept at {work_dir}", file=sys.stderr)
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
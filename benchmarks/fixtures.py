@@ -0,0 +1,49 @@
+"""Generated Git repositories for benchmarks"""
+
+import json
+import subprocess
+from pathlib import Path
+from typing import List
+
+AUTHOR = "Bench <bench@example.com> 1700000000 +0000"
+
+
+def _export(kind: str, index: int, revision: int) -> bytes:
+    """An exported object in the shape the plugin writes"""
+    data = {"id": f"obj-{index}", "name": f"Object {index}", "revision": revision, "graph": {"nodes": [], "edges": []}}
+    export = {"id": f"obj-{index}", "name": f"Object {index}", "type": kind, "data": data, "version": "1.0"}
+    return (json.dumps(export, indent=2) + "\n").encode()
+
+
+def _blob_line(path: str, content: bytes) -> List[bytes]:
+    return [f"M 100644 inline {path}\n".encode(), f"data {len(content)}\n".encode(), content, b"\n"]
+
+
+def generate_bare_repository(path: Path, files: int = 500, commits: int = 200, branches: int = 50) -> Path:
+    """Create a bare repository with ``files`` exported JSON files, ``commits`` commits on main
+    and ``branches`` extra branches, using ``git fast-import`` so large repositories build quickly"""
+    subprocess.run(["git", "init", "--bare", "-q", "-b", "main", str(path)], check=True)
+
+    stream: List[bytes] = []
+    mark = 0
+    for commit in range(commits):
+        mark += 1
+        message = f"Commit {commit}".encode()
+        stream += [b"commit refs/heads/main\n", f"mark :{mark}\n".encode()]
+        stream += [f"committer {AUTHOR}\n".encode(), f"data {len(message)}\n".encode(), message, b"\n"]
+        # The first commit adds every file; later ones touch a few
+        touched = range(files) if commit == 0 else [(commit * 7 + k) % files for k in range(3)]
+        for index in touched:
+            kind = "workflow" if index % 2 == 0 else "application"
+            stream += _blob_line(f"{kind}s/obj-{index}_object-{index}.json", _export(kind, index, commit))
+        stream.append(b"\n")
+
+    for branch in range(branches):
+        # Branch off spread-out commits on main
+        stream += [
+            f"reset refs/heads/feature/branch-{branch}\n".encode(),
+            f"from :{1 + branch * commits // max(branches, 1)}\n\n".encode(),
+        ]
+
+    subprocess.run(["git", "fast-import", "--quiet"], cwd=path, input=b"".join(stream), check=True)
+    return path
@@ -0,0 +1,117 @@
+"""Timing harness: latency percentiles, throughput and peak RSS per benchmark"""
+
+import multiprocessing
+import resource
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+
+def peak_rss_mb() -> float:
+    """High-water resident set size of this process in MiB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+@dataclass
+class Benchmark:
+    """A named operation; ``setup`` returns the callable that is timed"""
+
+    name: str
+    setup: Callable[[], Callable[[], Any]]
+    items: int = 1
+    repeat: int = 10
+    warmup: int = 1
+
+
+@dataclass
+class Result:
+    name: str
+    runs: int
+    items: int
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    throughput: float
+    peak_rss_mb: float
+    rss_growth_mb: float
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+def measure(benchmark: Benchmark) -> Result:
+    """Run a benchmark in this process"""
+    rss_before = peak_rss_mb()
+    operation = benchmark.setup()
+    for _ in range(benchmark.warmup):
+        operation()
+
+    samples = []
+    for _ in range(benchmark.repeat):
+        started = time.perf_counter()
+        operation()
+        samples.append(time.perf_counter() - started)
+
+    total = sum(samples)
+    peak = peak_rss_mb()
+    return Result(
+        name=benchmark.name,
+        runs=len(samples),
+        items=benchmark.items,
+        mean_ms=statistics.fmean(samples) * 1000,
+        p50_ms=percentile(samples, 50) * 1000,
+        p95_ms=percentile(samples, 95) * 1000,
+        p99_ms=percentile(samples, 99) * 1000,
+        max_ms=max(samples) * 1000,
+        throughput=benchmark.items * len(samples) / total if total else 0.0,
+        peak_rss_mb=peak,
+        rss_growth_mb=peak - rss_before,
+    )
+
+
+def _measure_child(benchmark: Benchmark, queue) -> None:
+    try:
+        queue.put(("ok", asdict(measure(benchmark))))
+    except BaseException as e:
+        queue.put(("error", f"{type(e).__name__}: {e}"))
+
+
+def run(benchmark: Benchmark, isolate: bool = True) -> Result:
+    """Run a benchmark, in a forked child when ``isolate`` so its peak RSS is its own"""
+    if not isolate or "fork" not in multiprocessing.get_all_start_methods():
+        return measure(benchmark)
+
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    process = context.Process(target=_measure_child, args=(benchmark, queue), name=f"bench-{benchmark.name}")
+    process.start()
+    status, payload = queue.get()
+    process.join()
+    if status != "ok":
+        raise RuntimeError(f"Benchmark {benchmark.name} failed: {payload}")
+    return Result(**payload)
+
+
+def format_table(results: List[Result], title: Optional[str] = None) -> str:
+    header = (
+        f"{'benchmark':<28}{'runs':>6}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'items/s':>11}{'peak MiB':>10}"
+    )
+    lines = [title, ""] if title else []
+    lines += [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.name:<28}{r.runs:>6}{r.mean_ms:>10.1f}{r.p50_ms:>10.1f}{r.p95_ms:>10.1f}"
+            f"{r.p99_ms:>10.1f}{r.throughput:>11.1f}{r.peak_rss_mb:>10.1f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,142 @@
+"""Local stand-in for the Dify API serving a synthetic workspace"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+def make_workflow(index: int, nodes: int) -> Dict[str, Any]:
+    """A workflow with a linear graph of ``nodes`` nodes"""
+    graph_nodes = [
+        {
+            "id": f"node-{n}",
+            "type": "llm" if n % 3 else "code",
+            "data": {
+                "title": f"Step {n}",
+                "prompt": f"You are step {n} of workflow {index}. " * 4,
+                "temperature": 0.7,
+                "max_tokens": 512,
+            },
+            "position": {"x": 100.0 * n, "y": 50.0},
+        }
+        for n in range(nodes)
+    ]
+    edges = [{"id": f"edge-{n}", "source": f"node-{n}", "target": f"node-{n + 1}"} for n in range(nodes - 1)]
+    return {
+        "id": f"wf-{index:05d}",
+        "name": f"Workflow {index}",
+        "updated_at": 1_700_000_000 + index,
+        "graph": {"nodes": graph_nodes, "edges": edges},
+    }
+
+
+def make_application(index: int) -> Dict[str, Any]:
+    return {
+        "id": f"app-{index:05d}",
+        "name": f"Application {index}",
+        "mode": "chat",
+        "updated_at": 1_700_000_000 + index,
+        "model_config": {"model": "gpt-4o", "pre_prompt": f"Assistant number {index}. " * 8, "temperature": 0.3},
+    }
+
+
+class Workspace:
+    """In-memory Dify workspace"""
+
+    def __init__(self, workflows: int = 100, applications: int = 100, nodes: int = 20):
+        self.lock = threading.Lock()
+        self.objects: Dict[str, Dict[str, Dict[str, Any]]] = {
+            "workflows": {wf["id"]: wf for wf in (make_workflow(i, nodes) for i in range(workflows))},
+            "apps": {app["id"]: app for app in (make_application(i) for i in range(applications))},
+        }
+        self.requests = 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    workspace: Workspace
+    latency: float = 0.0
+
+    # Silence per-request logging
+    def log_message(self, format, *args):
+        pass
+
+    def _route(self) -> Tuple[Optional[str], Optional[str]]:
+        match = re.fullmatch(r"/api/v1/(workflows|apps)(?:/([^/]+))?", urlparse(self.path).path)
+        return (match.group(1), match.group(2)) if match else (None, None)
+
+    def _send(self, status: int, body: Any) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _begin(self):
+        with self.workspace.lock:
+            self.workspace.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def do_GET(self):
+        self._begin()
+        collection, object_id = self._route()
+        if collection is None:
+            return self._send(404, {"error": "not found"})
+
+        with self.workspace.lock:
+            objects = self.workspace.objects[collection]
+            if object_id:
+                if object_id not in objects:
+                    return self._send(404, {"error": "not found"})
+                return self._send(200, objects[object_id])
+
+            query = parse_qs(urlparse(self.path).query)
+            page, limit = int(query.get("page", ["1"])[0]), int(query.get("limit", ["20"])[0])
+            items = list(objects.values())[(page - 1) * limit : page * limit]
+            summaries = [{"id": item["id"], "name": item["name"], "updated_at": item["updated_at"]} for item in items]
+        self._send(200, {"data": summaries, "page": page, "limit": limit, "total": len(objects)})
+
+    def _write(self):
+        self._begin()
+        collection, object_id = self._route()
+        if collection is None:
+            return self._send(404, {"error": "not found"})
+
+        data = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with self.workspace.lock:
+            object_id = object_id or data.get("id") or f"new-{len(self.workspace.objects[collection])}"
+            data["id"] = object_id
+            self.workspace.objects[collection][object_id] = data
+        self._send(200, data)
+
+    do_PUT = _write
+    do_POST = _write
+
+
+class MockDifyServer:
+    """Serves a synthetic workspace on localhost in a background thread"""
+
+    def __init__(self, workspace: Workspace, latency: float = 0.0):
+        handler = type("Handler", (_Handler,), {"workspace": workspace, "latency": latency})
+        self.workspace = workspace
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-dify", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "MockDifyServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,167 @@
+"""Measure plugin cold start: ``python -m benchmarks.startup`` (or ``make bench-startup``)
+
+Each scenario imports a set of modules in a fresh interpreter with
+``python -X importtime`` and reports the import time (interpreter startup
+excluded), the heaviest packages and whether a module that should only load
+on first use was imported. The ``startup`` scenario runs ``main.py`` itself
+up to ``plugin.run()``, with the Dify SDK stubbed out and background threads
+not started, so it measures what the plugin imports before serving.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Scenario module standing for running main.py
+MAIN = "main"
+
+SCENARIOS: Dict[str, Sequence[str]] = {
+    "startup": (MAIN,),
+    "packages": ("endpoint_handlers", "models", "services", "utils"),
+    "first_request": ("endpoint_handlers.repositories", "endpoint_handlers.git_operations", "endpoint_handlers.sync"),
+}
+
+# Loaded on first request, never at startup
+DEFERRED_MODULES = ("fastapi", "starlette", "httpx", "cryptography", "git")
+
+# Import time budget of the startup scenario; override for slow machines
+BUDGET_MS = float(os.getenv("PLUGIN_STARTUP_BUDGET_MS", "500"))
+
+
+@dataclass
+class StartupResult:
+    scenario: str
+    modules: List[str]
+    import_ms: float
+    runs: List[float]
+    heaviest: List[Dict[str, float]] = field(default_factory=list)
+    deferred_loaded: List[str] = field(default_factory=list)
+    loaded: List[str] = field(default_factory=list)
+
+
+# Stands in for the Dify SDK (which main.py would start) and keeps threads
+# from starting, so only the imports made before plugin.run() are measured
+_MAIN_PRELUDE = """
+import sys, threading, types
+class _Plugin:
+    def __init__(self, config): pass
+    def run(self): pass
+for _name in ("dify_plugin", "dify_plugin.config", "dify_plugin.config.config", "dify_plugin.plugin"):
+    sys.modules[_name] = types.ModuleType(_name)
+sys.modules["dify_plugin.config.config"].DifyPluginEnv = dict
+sys.modules["dify_plugin.plugin"].Plugin = _Plugin
+threading.Thread.start = lambda self: None
+import runpy
+"""
+
+
+def _statements(modules: Sequence[str]) -> Tuple[str, str]:
+    """The statement importing ``modules``, and the one whose imports are not counted"""
+    if tuple(modules) == (MAIN,):
+        return _MAIN_PRELUDE + "runpy.run_path('main.py', run_name='__startup__')", _MAIN_PRELUDE
+    return "import " + ", ".join(modules), "pass"
+
+
+def _importtime(statement: str, env: Optional[Dict[str, str]] = None) -> List[tuple]:
+    """(self_us, cumulative_us, depth, name) for each import of ``statement`` in a fresh interpreter"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return entries
+
+
+def measure(scenario: str, modules: Sequence[str], repeat: int = 5) -> StartupResult:
+    """Median import time of ``modules`` over ``repeat`` fresh interpreters"""
+    statement, baseline = _statements(modules)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # main.py looks for orphaned clones; keep it away from real ones
+        env = {**os.environ, "GIT_TEMP_DIR": temp_dir}
+        interpreter = {name for _, _, _, name in _importtime(baseline, env)}
+        runs, packages, loaded = [], Counter(), set()
+        for _ in range(repeat):
+            entries = _importtime(statement, env)
+            # Top-level entries (depth 0) include their dependencies; the interpreter's own are excluded
+            runs.append(
+                sum(cumulative for _, cumulative, depth, name in entries if depth == 0 and name not in interpreter) / 1000
+            )
+            for self_us, _, _, name in entries:
+                if name not in interpreter:
+                    packages[name.split(".")[0]] += self_us / 1000 / repeat
+                    loaded.add(name)
+
+    return StartupResult(
+        scenario=scenario,
+        modules=list(modules),
+        import_ms=round(statistics.median(runs), 1),
+        runs=[round(run, 1) for run in runs],
+        heaviest=[{"package": name, "ms": round(ms, 1)} for name, ms in packages.most_common(8)],
+        deferred_loaded=sorted(m for m in DEFERRED_MODULES if m in {name.split(".")[0] for name in loaded}),
+        loaded=sorted(loaded),
+    )
+
+
+def format_report(results: List[StartupResult], budget_ms: Optional[float] = None) -> str:
+    lines = []
+    for result in results:
+        status = ""
+        if result.scenario == "startup" and budget_ms is not None:
+            status = " (over budget)" if result.import_ms > budget_ms else f" (budget {budget_ms:g} ms)"
+        lines.append(f"{result.scenario}: {result.import_ms:.1f} ms{status}")
+        lines.append("  modules:  " + ", ".join(result.modules))
+        lines.append("  heaviest: " + ", ".join(f"{p['package']} {p['ms']:.1f} ms" for p in result.heaviest))
+        if result.deferred_loaded:
+            lines.append("  loads deferred modules: " + ", ".join(result.deferred_loaded))
+    return "\n".join(lines)
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup", description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per scenario")
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS, help="Fail if startup imports take longer")
+    parser.add_argument("--only", action="append", default=[], help="Run only these scenarios")
+    parser.add_argument("--json", dest="json_path", help="Also write the results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    results = [
+        measure(scenario, modules, args.repeat)
+        for scenario, modules in SCENARIOS.items()
+        if not args.only or scenario in args.only
+    ]
+    print(format_report(results, args.budget_ms))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"budget_ms": args.budget_ms, "results": [asdict(r) for r in results]}, f, indent=2)
+
+    startup = next((r for r in results if r.scenario == "startup"), None)
+    if startup and (startup.import_ms > args.budget_ms or startup.deferred_loaded):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
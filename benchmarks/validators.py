@@ -0,0 +1,160 @@
+"""Compare the validators with their previous implementations: ``python -m benchmarks.validators``
+
+The previous implementations are copied here (they compiled or looked
+up their patterns on every call and checked path containment by string
+prefix) so the speedup stays measurable.
+"""
+
+import argparse
+import json
+import random
+import re
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils import validators  # noqa: E402
+
+
+def _previous_validate_repository_url(url: str) -> bool:
+    if not url:
+        return False
+    patterns = [r"^https?://.+", r"^git@.+:.+", r"^git://.+", r"^file://.+"]
+    for pattern in patterns:
+        if re.match(pattern, url):
+            return True
+    return False
+
+
+def _previous_validate_branch_name(branch: str) -> bool:
+    if not branch:
+        return False
+    invalid_chars = r"[ ~^:?*\[\\@{]"
+    if re.search(invalid_chars, branch):
+        return False
+    if branch.startswith(".") or branch.endswith(".lock"):
+        return False
+    if branch in [".", ".."]:
+        return False
+    return True
+
+
+def _previous_sanitize_filename(filename: str) -> str:
+    invalid_chars = r'[<>:"/\\|?*]'
+    sanitized = re.sub(invalid_chars, "_", filename)
+    sanitized = sanitized.strip(". ")
+    if len(sanitized) > 255:
+        sanitized = sanitized[:255]
+    return sanitized
+
+
+def _previous_validate_file_path(file_path: str, base_dir: Path) -> bool:
+    try:
+        full_path = (base_dir / file_path).resolve()
+        base_resolved = base_dir.resolve()
+        return str(full_path).startswith(str(base_resolved))
+    except Exception:
+        return False
+
+
+def _names(count: int, seed: int = 0) -> Dict[str, List[str]]:
+    rng = random.Random(seed)
+    alphabet = string.ascii_lowercase + string.digits + "-_."
+
+    def word() -> str:
+        return "".join(rng.choice(alphabet) for _ in range(rng.randint(3, 12))).strip(".") or "x"
+
+    hosts = ["https://github.com", "git@gitlab.com:", "git://example.com", "file:///srv/git"]
+    return {
+        "url": [f"{rng.choice(hosts)}/{word()}/{word()}.git" for _ in range(count)],
+        "branch": ["/".join(word() for _ in range(rng.randint(1, 3))) for _ in range(count)],
+        "filename": [f"{word()}: {word()}/{word()}?" for _ in range(count)],
+        "path": [f"workflows/{word()}/{word()}.json" for _ in range(count)],
+    }
+
+
+def _time(operation: Callable[[], object], repeat: int) -> float:
+    """Best wall time of ``repeat`` runs, in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        operation()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def run(count: int, repeat: int) -> List[Dict[str, object]]:
+    names = _names(count)
+    base_dir = Path(tempfile.mkdtemp(prefix="dify-validators-"))
+
+    cases = [
+        (
+            "validate_repository_url",
+            lambda: [_previous_validate_repository_url(url) for url in names["url"]],
+            lambda: [validators.validate_repository_url(url) for url in names["url"]],
+            lambda: validators.validate_many(names["url"], "url"),
+        ),
+        (
+            "validate_branch_name",
+            lambda: [_previous_validate_branch_name(branch) for branch in names["branch"]],
+            lambda: [validators.validate_branch_name(branch) for branch in names["branch"]],
+            lambda: validators.validate_many(names["branch"], "branch"),
+        ),
+        (
+            "sanitize_filename",
+            lambda: [_previous_sanitize_filename(name) for name in names["filename"]],
+            lambda: [validators.sanitize_filename(name) for name in names["filename"]],
+            None,
+        ),
+        (
+            "validate_file_path",
+            lambda: [_previous_validate_file_path(path, base_dir) for path in names["path"]],
+            lambda: [validators.validate_file_path(path, base_dir) for path in names["path"]],
+            lambda: validators.validate_many(names["path"], "path", base_dir),
+        ),
+    ]
+
+    results = []
+    for name, previous, current, many in cases:
+        row = {"name": name, "count": count, "previous_ms": _time(previous, repeat), "current_ms": _time(current, repeat)}
+        row["validate_many_ms"] = _time(many, repeat) if many else None
+        results.append(row)
+    base_dir.rmdir()
+    return results
+
+
+def format_table(results: List[Dict[str, object]]) -> str:
+    header = f"{'validator':<26}{'values':>8}{'previous ms':>14}{'current ms':>13}{'validate_many ms':>19}{'speedup':>10}"
+    lines = [header, "-" * len(header)]
+    for row in results:
+        fastest = min(value for value in (row["current_ms"], row["validate_many_ms"]) if value is not None)
+        many = f"{row['validate_many_ms']:.2f}" if row["validate_many_ms"] is not None else "-"
+        lines.append(
+            f"{row['name']:<26}{row['count']:>8}{row['previous_ms']:>14.2f}{row['current_ms']:>13.2f}"
+            f"{many:>19}{row['previous_ms'] / fastest:>9.1f}x"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.validators", description=__doc__)
+    parser.add_argument("--count", type=int, default=10000, help="Values per validator")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs; the best is reported")
+    parser.add_argument("--json", dest="json_path", help="Also write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args.count, args.repeat)
+    print(format_table(results))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"parameters": vars(args), "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,41 @@
 """HTTP endpoints for Git Integration Plugin"""
 
-from .git_operations import router as git_router
-from .repositories import router as repositories_router
-from .sync import router as sync_router
+from typing import TYPE_CHECKING
+
+from utils.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .bulk import router as bulk_router
+    from .diagnostics import router as diagnostics_router
+    from .git_operations import router as git_router
+    from .jobs import router as jobs_router
+    from .metrics import router as metrics_router
+    from .repositories import router as repositories_router
+    from .sync import router as sync_router
+    from .webhooks import router as webhooks_router
 
 __all__ = [
     "git_router",
     "sync_router",
     "repositories_router",
+    "jobs_router",
+    "webhooks_router",
+    "bulk_router",
+    "metrics_router",
+    "diagnostics_router",
 ]
+
+# Routers are imported on first access; importing any of them loads FastAPI
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "bulk_router": ".bulk:router",
+        "diagnostics_router": ".diagnostics:router",
+        "git_router": ".git_operations:router",
+        "jobs_router": ".jobs:router",
+        "metrics_router": ".metrics:router",
+        "repositories_router": ".repositories:router",
+        "sync_router": ".sync:router",
+        "webhooks_router": ".webhooks:router",
+    },
+)
@@ -0,0 +1,103 @@
+"""Multi-repository endpoints"""
+
+from typing import Any, Dict, List, Literal, Optional
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from models.job import Job
+from models.repository import RepositoryConfig
+from services.bulk_service import get_bulk_service
+from services.job_service import JobProgress, job_handler
+
+from .jobs import submit_job
+from .repositories import repositories
+
+router = APIRouter(prefix="/bulk", tags=["bulk"])
+
+
+class BulkPullRequest(BaseModel):
+    workspace_id: Optional[str] = None
+    repository_ids: Optional[List[str]] = None  # all repositories (of the workspace) when omitted
+    background: bool = False
+
+
+class BulkSyncRequest(BaseModel):
+    workspace_id: Optional[str] = None
+    repository_ids: Optional[List[str]] = None
+    direction: Literal["export", "import", "bidirectional"] = "bidirectional"
+    background: bool = False
+
+
+def _select_repositories(workspace_id: Optional[str], repository_ids: Optional[List[str]]) -> List[RepositoryConfig]:
+    """Get the repositories a bulk operation applies to"""
+    if repository_ids is not None:
+        missing = [repository_id for repository_id in repository_ids if repository_id not in repositories]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Repositories not found: {', '.join(missing)}")
+        configs = [repositories[repository_id] for repository_id in repository_ids]
+    else:
+        configs = list(repositories.values())
+
+    if workspace_id:
+        configs = [config for config in configs if config.workspace_id == workspace_id]
+    return configs
+
+
+def _repositories_missing(job: Job) -> Optional[str]:
+    """Reason a recovered bulk job cannot run: none of its repositories are connected any more"""
+    if any(repository_id in repositories for repository_id in job.params["repository_ids"]):
+        return None
+    return "none of its repositories are connected"
+
+
+@job_handler("bulk", recoverable=_repositories_missing)
+async def _run_bulk_job(job: Job, progress: JobProgress) -> Dict[str, Any]:
+    # Repositories disconnected since the job was submitted are left out
+    configs = [repositories[repository_id] for repository_id in job.params["repository_ids"] if repository_id in repositories]
+    if job.params["operation"] == "sync":
+        return await get_bulk_service().sync_all(configs, job.params.get("direction", "bidirectional"), progress=progress)
+    return await get_bulk_service().pull_all(configs, progress=progress)
+
+
+@router.post("/pull", response_model=Dict[str, Any])
+async def pull_all(request: BulkPullRequest):
+    """Pull every selected repository"""
+    configs = _select_repositories(request.workspace_id, request.repository_ids)
+
+    if request.background:
+        return submit_job("bulk", None, {"operation": "pull", "repository_ids": [config.id for config in configs]})
+
+    try:
+        return await get_bulk_service().pull_all(configs)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/sync", response_model=Dict[str, Any])
+async def sync_all(request: BulkSyncRequest):
+    """Sync every selected repository"""
+    configs = _select_repositories(request.workspace_id, request.repository_ids)
+
+    if request.background:
+        return submit_job(
+            "bulk",
+            None,
+            {"operation": "sync", "direction": request.direction, "repository_ids": [config.id for config in configs]},
+        )
+
+    try:
+        return await get_bulk_service().sync_all(configs, request.direction)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/status", response_model=Dict[str, Any])
+async def status_all(workspace_id: Optional[str] = None):
+    """Get Git status and sync state of every repository"""
+    configs = _select_repositories(workspace_id, None)
+
+    try:
+        return await get_bulk_service().status_all(configs)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
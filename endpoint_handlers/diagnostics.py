@@ -0,0 +1,106 @@
+"""Diagnostics endpoints: on-demand profiles and the slow-request log"""
+
+import hmac
+import json
+import os
+from typing import Awaitable, Callable, Mapping, Optional, Tuple
+
+from fastapi import APIRouter, Request, Response
+
+from utils.profiler import MAX_PROFILE_SECONDS, SamplingProfiler, exclusive_profile, get_slow_request_log
+
+router = APIRouter(prefix="/diagnostics", tags=["diagnostics"])
+
+JSON = "application/json"
+
+
+def diagnostics_enabled() -> bool:
+    return bool(os.getenv("PLUGIN_DIAGNOSTICS_TOKEN"))
+
+
+def _error(status: int, message: str) -> Tuple[int, str, str]:
+    return status, json.dumps({"success": False, "error": message}), JSON
+
+
+def _check_token(headers: Mapping[str, str]) -> Optional[Tuple[int, str, str]]:
+    """Error response unless diagnostics are enabled and the request carries the token"""
+    token = os.getenv("PLUGIN_DIAGNOSTICS_TOKEN")
+    if not token:
+        return _error(404, "Diagnostics are disabled; set PLUGIN_DIAGNOSTICS_TOKEN")
+
+    supplied = headers.get("X-Diagnostics-Token") or ""
+    authorization = headers.get("Authorization") or ""
+    if not supplied and authorization.startswith("Bearer "):
+        supplied = authorization[len("Bearer ") :]
+    if not supplied or not hmac.compare_digest(supplied.encode(), token.encode()):
+        return _error(401, "Invalid or missing diagnostics token")
+    return None
+
+
+def handle_diagnostics_request(path: str, headers: Mapping[str, str], args: Mapping[str, str]) -> Tuple[int, str, str]:
+    """Serve a diagnostics route; returns the HTTP status, body and content type
+
+    ``GET /diagnostics/profile`` samples every thread and asyncio task for
+    ``seconds`` (at most 60) every ``interval_ms`` and returns collapsed stacks
+    (``format=collapsed``, ready for flamegraph tools) or a JSON summary with
+    the hottest frames (``format=json``). ``GET /diagnostics/slow-requests``
+    returns the recent slow requests with their profiles.
+    """
+    error = _check_token(headers)
+    if error:
+        return error
+
+    if path == "/diagnostics/slow-requests":
+        slow_requests = get_slow_request_log()
+        entries = list(slow_requests.entries) if slow_requests else []
+        if args.get("collapsed", "false").lower() != "true":
+            entries = [{key: value for key, value in entry.items() if key != "collapsed"} for entry in entries]
+        body = {"threshold": slow_requests.threshold if slow_requests else None, "requests": entries}
+        return 200, json.dumps(body), JSON
+
+    if path != "/diagnostics/profile":
+        return _error(404, f"Unknown diagnostics route: {path}")
+
+    try:
+        seconds = float(args.get("seconds", "10"))
+        interval = float(args.get("interval_ms", "5")) / 1000
+    except ValueError:
+        return _error(400, "seconds and interval_ms must be numbers")
+    if not 0 < seconds <= MAX_PROFILE_SECONDS or not 0.001 <= interval <= 1:
+        return _error(400, f"seconds must be in (0, {MAX_PROFILE_SECONDS:g}] and interval_ms in [1, 1000]")
+
+    with exclusive_profile() as acquired:
+        if not acquired:
+            return _error(409, "Another profile is being captured")
+        profiler = SamplingProfiler(interval, include_tasks=args.get("tasks", "true").lower() != "false")
+        profiler.run_for(seconds)
+
+    if args.get("format", "collapsed") == "json":
+        return 200, json.dumps({**profiler.summary(), "collapsed": profiler.collapsed()}), JSON
+    return 200, profiler.collapsed(), "text/plain; charset=utf-8"
+
+
+# Plain functions run in the thread pool, so a profile never blocks the event loop
+@router.get("/profile")
+def get_profile(request: Request):
+    """Capture a sampling profile of the plugin process"""
+    status, body, content_type = handle_diagnostics_request("/diagnostics/profile", request.headers, request.query_params)
+    return Response(body, status_code=status, media_type=content_type)
+
+
+@router.get("/slow-requests")
+def get_slow_requests(request: Request):
+    """Recent requests slower than PLUGIN_SLOW_REQUEST_SECONDS, with profiles of their slow part"""
+    status, body, content_type = handle_diagnostics_request(
+        "/diagnostics/slow-requests", request.headers, request.query_params
+    )
+    return Response(body, status_code=status, media_type=content_type)
+
+
+async def log_slow_requests(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+    """HTTP middleware profiling requests that exceed the slow-request threshold"""
+    slow_requests = get_slow_request_log() if diagnostics_enabled() else None
+    if slow_requests is None:
+        return await call_next(request)
+    with slow_requests.watch(request.method, request.url.path):
+        return await call_next(request)
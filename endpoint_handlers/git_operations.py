@@ -8,6 +8,8 @@ from pydantic import BaseModel
 from models.repository import RepositoryConfig
 from services.auth_service import AuthService
 from services.git_service import GitService
+from services.maintenance import get_maintenance_runner
+from utils.validators import validate_branch_name, validate_many
 
 from .repositories import repositories
 
@@ -18,6 +20,8 @@ class CommitRequest(BaseModel):
     repository_id: str
     message: str
     author: Optional[Dict[str, str]] = None
+    paths: Optional[List[str]] = None  # commit only these files, without scanning the working tree
+    removed: Optional[List[str]] = None
 
 
 class PushRequest(BaseModel):
@@ -57,9 +61,20 @@ async def commit_changes(request: CommitRequest):
     git_service = GitService()
     auth_service = AuthService()
 
+    # Paths must stay inside the clone
+    paths = (request.paths or []) + (request.removed or [])
+    invalid = [path for path, valid in zip(paths, validate_many(paths, "path", git_service.temp_dir / config.id)) if not valid]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid paths: {', '.join(invalid)}")
+
     try:
         repo = git_service.get_repo(config)
-        result = git_service.commit(repo, request.message, request.author)
+        if request.paths is not None or request.removed is not None:
+            result = git_service.commit_files(
+                repo, request.message, paths=request.paths, removed=request.removed, author=request.author
+            )
+        else:
+            result = git_service.commit(repo, request.message, request.author)
 
         if not result.get("success"):
             raise HTTPException(status_code=400, detail=result.get("error", "Commit failed"))
@@ -82,12 +97,7 @@ async def push_changes(request: PushRequest):
     try:
         repo = git_service.get_repo(config)
 
-        # Decrypt credentials if needed
-        auth_handler = None
-        if config.auth_type != "none" and config.credentials:
-            auth_handler = auth_service
-
-        result = git_service.push(repo, request.branch, config.auth_type, auth_handler)
+        result = git_service.push(repo, request.branch, auth_service.git_auth(config))
 
         if not result.get("success"):
             raise HTTPException(status_code=400, detail=result.get("error", "Push failed"))
@@ -108,7 +118,7 @@ async def pull_changes(request: PullRequest):
 
     try:
         repo = git_service.get_repo(config)
-        result = git_service.pull(repo, request.branch or config.branch)
+        result = git_service.pull(repo, request.branch or config.branch, AuthService().git_auth(config))
 
         if not result.get("success"):
             raise HTTPException(status_code=400, detail=result.get("error", "Pull failed"))
@@ -141,6 +151,11 @@ async def create_branch(request: CreateBranchRequest):
     if request.repository_id not in repositories:
         raise HTTPException(status_code=404, detail="Repository not found")
 
+    if not validate_branch_name(request.branch_name) or (
+        request.from_branch is not None and not validate_branch_name(request.from_branch)
+    ):
+        raise HTTPException(status_code=400, detail="Invalid branch name")
+
     config = repositories[request.repository_id]
     git_service = GitService()
 
@@ -194,6 +209,42 @@ async def get_commit_history(repository_id: str, limit: int = 20):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/{repository_id}/maintenance", response_model=Dict[str, Any])
+async def get_maintenance_stats(repository_id: str):
+    """Get object and pack counts and the last maintenance run"""
+    if repository_id not in repositories:
+        raise HTTPException(status_code=404, detail="Repository not found")
+
+    config = repositories[repository_id]
+    git_service = GitService()
+
+    try:
+        git_service.get_repo(config)
+        return get_maintenance_runner().stats(repository_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/{repository_id}/maintenance", response_model=Dict[str, Any])
+async def run_maintenance(repository_id: str):
+    """Run Git maintenance (commit-graph, multi-pack-index, repack) now"""
+    if repository_id not in repositories:
+        raise HTTPException(status_code=404, detail="Repository not found")
+
+    config = repositories[repository_id]
+    git_service = GitService()
+
+    try:
+        git_service.get_repo(config)
+        metrics = get_maintenance_runner().run_repository(repository_id, force=True)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if metrics is None:
+        raise HTTPException(status_code=409, detail="Repository is busy, try again later")
+    return {"success": True, **metrics}
+
+
 @router.post("/diff", response_model=Dict[str, Any])
 async def get_diff(request: DiffRequest):
     """Get diff between commits or working directory"""
@@ -2,24 +2,178 @@
 
 import asyncio
 import json
-from typing import Any
+from typing import Any, Callable, Dict, Optional, Tuple
 
 from dify_plugin.core.runtime import Session
 from dify_plugin.interfaces.endpoint import Endpoint
-
-# Create FastAPI app
-from fastapi import FastAPI
 from werkzeug import Request, Response
 
-# Import our routers to ensure they're registered
-from endpoint_handlers.git_operations import router as git_router
-from endpoint_handlers.repositories import router as repositories_router
-from endpoint_handlers.sync import router as sync_router
-
-app = FastAPI(title="Dify Git Integration Plugin")
-app.include_router(repositories_router)
-app.include_router(git_router)
-app.include_router(sync_router)
+_app = None
+
+
+def _create_app():
+    """Create the FastAPI app with every router registered"""
+    from fastapi import FastAPI
+
+    from endpoint_handlers.bulk import router as bulk_router
+    from endpoint_handlers.diagnostics import log_slow_requests
+    from endpoint_handlers.diagnostics import router as diagnostics_router
+    from endpoint_handlers.git_operations import router as git_router
+    from endpoint_handlers.jobs import router as jobs_router
+    from endpoint_handlers.metrics import record_request_metrics
+    from endpoint_handlers.metrics import router as metrics_router
+    from endpoint_handlers.metrics import trace_requests
+    from endpoint_handlers.repositories import router as repositories_router
+    from endpoint_handlers.sync import router as sync_router
+    from endpoint_handlers.webhooks import router as webhooks_router
+
+    app = FastAPI(title="Dify Git Integration Plugin")
+    app.include_router(repositories_router)
+    app.include_router(git_router)
+    app.include_router(sync_router)
+    app.include_router(jobs_router)
+    app.include_router(webhooks_router)
+    app.include_router(bulk_router)
+    app.include_router(metrics_router)
+    app.include_router(diagnostics_router)
+    app.middleware("http")(record_request_metrics)
+    app.middleware("http")(trace_requests)
+    app.middleware("http")(log_slow_requests)
+    return app
+
+
+def __getattr__(name: str) -> Any:
+    # FastAPI and every router (with GitPython, httpx and cryptography) load on first use of ``app``
+    global _app
+    if name != "app":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if _app is None:
+        _app = _create_app()
+    return _app
+
+
+def _json_response(data: Any, status: int = 200) -> Response:
+    return Response(json.dumps(data), status=status, mimetype="application/json")
+
+
+def _create_repository(request: Request, values: dict, settings: dict) -> Response:
+    """POST /repositories - create repository connection"""
+    import uuid
+
+    from endpoint_handlers.repositories import CreateRepositoryRequest, create_repository
+
+    # Parse request body if available
+    request_data = {}
+    body = request.get_data()
+    if body:
+        try:
+            request_data = json.loads(body.decode("utf-8"))
+        except ValueError:
+            pass
+
+    # Merge settings from UI with request data (request data takes precedence)
+    repo_name = request_data.get("name") or f"Repository-{uuid.uuid4().hex[:8]}"
+    repo_url = request_data.get("url") or settings.get("repository_url", "")
+    branch = request_data.get("branch") or settings.get("branch", "main")
+    auth_type = request_data.get("auth_type") or settings.get("auth_type", "none")
+    github_token = request_data.get("github_token") or settings.get("github_token")
+    auto_sync = (
+        request_data.get("auto_sync", False)
+        if "auto_sync" in request_data
+        else (settings.get("auto_sync", False) if isinstance(settings.get("auto_sync"), bool) else False)
+    )
+    sync_interval = (
+        request_data.get("sync_interval", 60)
+        if "sync_interval" in request_data
+        else int(settings.get("sync_interval", 60)) if settings.get("sync_interval") else 60
+    )
+
+    # Get workspace_id from request or use default
+    workspace_id = request_data.get("workspace_id", "default")
+
+    # Prepare credentials
+    credentials = None
+    if auth_type == "token" and github_token:
+        credentials = {"token": github_token}
+    elif request_data.get("credentials"):
+        credentials = request_data.get("credentials")
+
+    # Validate URL is provided
+    if not repo_url:
+        return _json_response(
+            {"error": "Repository URL is required. Please configure it in plugin settings or provide it in the request."},
+            status=400,
+        )
+
+    # Create repository request
+    create_request = CreateRepositoryRequest(
+        name=repo_name,
+        url=repo_url,
+        branch=branch,
+        auth_type=auth_type,
+        credentials=credentials,
+        auto_sync=auto_sync,
+        sync_interval=sync_interval,
+        workspace_id=workspace_id,
+        bare=bool(request_data.get("bare", False)),
+        background=bool(request_data.get("background", False)),
+    )
+
+    # Call the create_repository function
+    return _json_response(asyncio.run(create_repository(create_request)))
+
+
+def _list_repositories(request: Request, values: dict, settings: dict) -> Response:
+    """GET /repositories - list repositories"""
+    from endpoint_handlers.repositories import list_repositories
+
+    workspace_id = request.args.get("workspace_id") if hasattr(request, "args") else None
+    return _json_response(asyncio.run(list_repositories(workspace_id)))
+
+
+def _push_webhook(request: Request, values: dict, settings: dict) -> Response:
+    """POST /webhooks/push - the signature is checked against the raw body"""
+    from endpoint_handlers.webhooks import handle_push_webhook
+
+    status, result = handle_push_webhook(request.headers, request.get_data())
+    return _json_response(result, status=status)
+
+
+def _metrics(request: Request, values: dict, settings: dict) -> Response:
+    """GET /metrics - Prometheus text format"""
+    from utils.metrics import CONTENT_TYPE, REGISTRY
+
+    if not REGISTRY.enabled:
+        return _json_response({"error": "Metrics are disabled; set PLUGIN_METRICS_ENABLED=true"}, status=404)
+    return Response(REGISTRY.render(), status=200, content_type=CONTENT_TYPE)
+
+
+def _diagnostics(request: Request, values: dict, settings: dict) -> Response:
+    """GET /diagnostics/... - token-protected profiles"""
+    from endpoint_handlers.diagnostics import handle_diagnostics_request
+
+    status, content, content_type = handle_diagnostics_request(request.path, request.headers, request.args)
+    return Response(content, status=status, content_type=content_type)
+
+
+# (method, path) -> handler; a path ending in "/" matches every path under it
+_ROUTES: Dict[Tuple[str, str], Callable[[Request, dict, dict], Response]] = {
+    ("POST", "/repositories"): _create_repository,
+    ("GET", "/repositories"): _list_repositories,
+    ("POST", "/webhooks/push"): _push_webhook,
+    ("GET", "/metrics"): _metrics,
+    ("GET", "/diagnostics/"): _diagnostics,
+}
+
+
+def _find_route(method: str, path: str) -> Optional[Callable[[Request, dict, dict], Response]]:
+    handler = _ROUTES.get((method, path))
+    if handler is not None:
+        return handler
+    for (route_method, route_path), handler in _ROUTES.items():
+        if route_method == method and route_path.endswith("/") and path.startswith(route_path):
+            return handler
+    return None
 
 
 class FastAPIEndpoint(Endpoint):
@@ -28,102 +182,23 @@ class FastAPIEndpoint(Endpoint):
     def invoke(self, request: Request, values: dict, settings: dict) -> Response:
         """Invoke FastAPI endpoint using ASGI"""
         try:
-            # Get request body
-            body = request.get_data()
-            path = request.path
-            method = request.method
-
-            # Parse request body if available
-            request_data = {}
-            if body:
-                try:
-                    request_data = json.loads(body.decode("utf-8"))
-                except:
-                    pass
-
-            # Handle POST /repositories - create repository connection
-            if method == "POST" and path == "/repositories":
-                import uuid
-
-                from endpoint_handlers.repositories import CreateRepositoryRequest, create_repository
-
-                # Merge settings from UI with request data (request data takes precedence)
-                repo_name = request_data.get("name") or f"Repository-{uuid.uuid4().hex[:8]}"
-                repo_url = request_data.get("url") or settings.get("repository_url", "")
-                branch = request_data.get("branch") or settings.get("branch", "main")
-                auth_type = request_data.get("auth_type") or settings.get("auth_type", "none")
-                github_token = request_data.get("github_token") or settings.get("github_token")
-                auto_sync = (
-                    request_data.get("auto_sync", False)
-                    if "auto_sync" in request_data
-                    else (settings.get("auto_sync", False) if isinstance(settings.get("auto_sync"), bool) else False)
-                )
-                sync_interval = (
-                    request_data.get("sync_interval", 60)
-                    if "sync_interval" in request_data
-                    else int(settings.get("sync_interval", 60)) if settings.get("sync_interval") else 60
-                )
-
-                # Get workspace_id from request or use default
-                workspace_id = request_data.get("workspace_id", "default")
-
-                # Prepare credentials
-                credentials = None
-                if auth_type == "token" and github_token:
-                    credentials = {"token": github_token}
-                elif request_data.get("credentials"):
-                    credentials = request_data.get("credentials")
-
-                # Validate URL is provided
-                if not repo_url:
-                    return Response(
-                        json.dumps(
-                            {
-                                "error": "Repository URL is required. Please configure it in plugin settings or provide it in the request."
-                            }
-                        ),
-                        status=400,
-                        mimetype="application/json",
-                    )
-
-                # Create repository request
-                create_request = CreateRepositoryRequest(
-                    name=repo_name,
-                    url=repo_url,
-                    branch=branch,
-                    auth_type=auth_type,
-                    credentials=credentials,
-                    auto_sync=auto_sync,
-                    sync_interval=sync_interval,
-                    workspace_id=workspace_id,
-                )
-
-                # Call the create_repository function
-                result = asyncio.run(create_repository(create_request))
-
-                return Response(json.dumps(result), status=200, mimetype="application/json")
-
-            # Handle GET /repositories - list repositories
-            elif method == "GET" and path == "/repositories":
-                from endpoint_handlers.repositories import list_repositories
-
-                workspace_id = request.args.get("workspace_id") if hasattr(request, "args") else None
-                result = asyncio.run(list_repositories(workspace_id))
-                return Response(json.dumps(result), status=200, mimetype="application/json")
+            handler = _find_route(request.method, request.path)
+            if handler is not None:
+                return handler(request, values, settings)
 
             # For other endpoints, return placeholder for now
             response_data = {
                 "message": "Endpoint handler active",
-                "path": path,
-                "method": method,
+                "path": request.path,
+                "method": request.method,
                 "values": values,
                 "settings_available": bool(settings),
                 "note": "Full FastAPI routing will be implemented with proper ASGI conversion",
             }
 
-            return Response(json.dumps(response_data), status=200, mimetype="application/json")
+            return _json_response(response_data)
         except Exception as e:
             import traceback
 
             error_details = {"error": str(e), "traceback": traceback.format_exc()}
-            return Response(json.dumps(error_details), status=500, mimetype="application/json")
+            return _json_response(error_details, status=500)
@@ -0,0 +1,42 @@
+"""Background job endpoints"""
+
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException
+
+from services.job_service import get_job_service
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def submit_job(kind: str, repository_id: Optional[str], params: Dict[str, Any]) -> Dict[str, Any]:
+    """Submit a background job and return the response for the originating request"""
+    job = get_job_service().submit(kind, params, repository_id)
+    return {"success": True, "job_id": job.id, "status": job.status.value, "message": f"Job {job.kind} submitted"}
+
+
+@router.get("", response_model=List[Dict[str, Any]])
+async def list_jobs(repository_id: Optional[str] = None, status: Optional[str] = None, limit: int = 50):
+    """List background jobs, newest first"""
+    jobs = get_job_service().list(repository_id=repository_id, status=status, limit=limit)
+    return [job.dict() for job in jobs]
+
+
+@router.get("/{job_id}", response_model=Dict[str, Any])
+async def get_job(job_id: str):
+    """Get job status, progress and result"""
+    job = get_job_service().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job.dict()
+
+
+@router.post("/{job_id}/cancel", response_model=Dict[str, Any])
+async def cancel_job(job_id: str):
+    """Cancel a pending or running job"""
+    job = get_job_service().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return {"success": True, "job": job.dict()}
@@ -0,0 +1,58 @@
+"""Metrics endpoint and request instrumentation"""
+
+import time
+from typing import Awaitable, Callable
+
+from fastapi import APIRouter, HTTPException, Request, Response
+
+from utils.metrics import CONTENT_TYPE, HTTP_REQUEST_SECONDS, REGISTRY
+from utils.tracing import TRACER
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """Metrics in the Prometheus text exposition format"""
+    if not REGISTRY.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled; set PLUGIN_METRICS_ENABLED=true")
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+async def record_request_metrics(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+    """HTTP middleware observing the latency of every route"""
+    if not REGISTRY.enabled:
+        return await call_next(request)
+
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # The route template (not the concrete path) keeps one series per route
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status,
+        )
+
+
+async def trace_requests(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+    """HTTP middleware running every request in a root span (continuing an incoming ``traceparent``)"""
+    if not TRACER.enabled:
+        return await call_next(request)
+
+    with (
+        TRACER.continue_trace(request.headers.get("traceparent")),
+        TRACER.span(
+            f"HTTP {request.method}", {"http.method": request.method, "http.target": request.url.path}
+        ) as request_span,
+    ):
+        response = await call_next(request)
+        request_span.set_attribute("http.route", getattr(request.scope.get("route"), "path", None))
+        request_span.set_attribute("http.status_code", response.status_code)
+        return response
@@ -1,13 +1,17 @@
 """Repository management endpoints"""
 
+import json
 from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
+from models.job import Job
 from models.repository import Repository, RepositoryConfig
 from services.auth_service import AuthService
+from services.credential_cache import get_credential_cache
 from services.git_service import GitService
+from services.job_service import JobProgress, get_job_service, job_handler
 from utils.validators import validate_branch_name, validate_repository_url
 
 router = APIRouter(prefix="/repositories", tags=["repositories"])
@@ -25,6 +29,9 @@ class CreateRepositoryRequest(BaseModel):
     auto_sync: bool = False
     sync_interval: int = 60
     workspace_id: str
+    bare: bool = False
+    webhook_secret: Optional[str] = None  # secret push webhooks are signed with
+    background: bool = False  # clone in a background job and return its id
 
 
 class UpdateRepositoryRequest(BaseModel):
@@ -33,6 +40,7 @@ class UpdateRepositoryRequest(BaseModel):
     auto_sync: Optional[bool] = None
     sync_interval: Optional[int] = None
     credentials: Optional[Dict[str, Any]] = None
+    webhook_secret: Optional[str] = None
 
 
 class LinkApplicationRequest(BaseModel):
@@ -64,6 +72,9 @@ async def create_repository(request: CreateRepositoryRequest):
     encrypted_credentials = None
     if request.credentials:
         encrypted_credentials = auth_service.encrypt_credentials(request.credentials)
+    encrypted_webhook_secret = None
+    if request.webhook_secret:
+        encrypted_webhook_secret = auth_service.encrypt_credentials({"secret": request.webhook_secret})
 
     # Create repository config
     config = RepositoryConfig(
@@ -76,21 +87,45 @@ async def create_repository(request: CreateRepositoryRequest):
         auto_sync=request.auto_sync,
         sync_interval=request.sync_interval,
         workspace_id=request.workspace_id,
+        bare=request.bare,
+        webhook_secret=encrypted_webhook_secret,
     )
 
+    if request.background:
+        job = get_job_service().submit("clone", {"config": json.loads(config.json())}, repo_id)
+        return {
+            "success": True,
+            "job_id": job.id,
+            "repository": config.dict(),
+            "message": "Repository clone started; it is connected when the job completes",
+        }
+
     # Clone repository
-    git_service = GitService()
     try:
-        auth_handler = AuthService() if request.auth_type != "none" else None
-        repo = git_service.clone_repository(config, auth_handler)
-        config.local_path = str(git_service.temp_dir / config.id)
+        _clone_and_register(config)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to clone repository: {str(e)}")
 
+    return {"success": True, "repository": config.dict(), "message": "Repository connected successfully"}
+
+
+def _clone_and_register(config: RepositoryConfig) -> None:
+    """Clone a repository and add it to the registry"""
+    git_service = GitService()
+    git_service.clone_repository(config, AuthService().git_auth(config))
+    config.local_path = str(git_service.temp_dir / config.id)
+
     # Store repository
-    repositories[repo_id] = config
+    repositories[config.id] = config
 
-    return {"success": True, "repository": config.dict(), "message": "Repository connected successfully"}
+
+@job_handler("clone")
+async def _run_clone_job(job: Job, progress: JobProgress) -> Dict[str, Any]:
+    config = RepositoryConfig(**job.params["config"])
+    progress(0, 1, f"Cloning {config.url}")
+    _clone_and_register(config)
+    progress(1, 1, "Repository connected")
+    return {"success": True, "repository_id": config.id}
 
 
 @router.get("", response_model=List[Dict[str, Any]])
@@ -167,6 +202,13 @@ async def update_repository(repository_id: str, request: UpdateRepositoryRequest
         auth_service = AuthService()
         encrypted_credentials = auth_service.encrypt_credentials(request.credentials)
         config.credentials = {"encrypted": encrypted_credentials}
+    if request.webhook_secret is not None:
+        # An empty secret disables webhooks for the repository
+        config.webhook_secret = (
+            AuthService().encrypt_credentials({"secret": request.webhook_secret}) if request.webhook_secret else None
+        )
+    if request.credentials is not None or request.webhook_secret is not None:
+        _forget_credentials(repository_id)
 
     from datetime import datetime
 
@@ -182,10 +224,49 @@ async def delete_repository(repository_id: str):
         raise HTTPException(status_code=404, detail="Repository not found")
 
     del repositories[repository_id]
+    _forget_credentials(repository_id)
+
+    # Free the clone's disk space
+    GitService().workspace_cache.remove(repository_id)
 
     return {"success": True, "message": "Repository disconnected successfully"}
 
 
+@router.post("/rotate-keys", response_model=Dict[str, Any])
+async def rotate_encryption_keys():
+    """Re-wrap every repository's data keys with the current master key
+
+    Run after moving the old PLUGIN_ENCRYPTION_KEY to
+    PLUGIN_ENCRYPTION_PREVIOUS_KEYS; credentials themselves are not re-encrypted.
+    """
+    auth_service = AuthService()
+    rotated = []
+    for config in repositories.values():
+        encrypted = (config.credentials or {}).get("encrypted")
+        try:
+            rewrapped = auth_service.rewrap(encrypted) if encrypted else None
+            webhook_secret = auth_service.rewrap(config.webhook_secret) if config.webhook_secret else None
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to re-wrap keys of repository {config.id}: {str(e)}")
+        if rewrapped == encrypted and webhook_secret == config.webhook_secret:
+            continue
+
+        if encrypted:
+            config.credentials = {**config.credentials, "encrypted": rewrapped}
+        config.webhook_secret = webhook_secret
+        _forget_credentials(config.id)
+        rotated.append(config.id)
+
+    return {"success": True, "key_id": auth_service.key_id, "rotated": rotated}
+
+
+def _forget_credentials(repository_id: str) -> None:
+    """Drop a repository's decrypted credentials from the cache"""
+    cache = get_credential_cache()
+    if cache is not None:
+        cache.invalidate(repository_id)
+
+
 # Application-to-Repository linking
 # Store application-repository mappings
 application_repositories: Dict[str, str] = {}  # app_id -> repository_id
@@ -1,16 +1,21 @@
 """Synchronization endpoints"""
 
-from typing import Any, Dict, Optional
+import json
+from typing import Any, AsyncIterator, Dict, Optional
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from models.job import Job
 from models.repository import RepositoryConfig
 from services.auth_service import AuthService
 from services.dify_api import DifyAPIClient
 from services.git_service import GitService
+from services.job_service import JobProgress, get_job_service, job_handler
 from services.sync_service import SyncService
 
+from .jobs import submit_job
 from .repositories import repositories
 
 router = APIRouter(prefix="/sync", tags=["sync"])
@@ -20,6 +25,7 @@ class ExportWorkflowRequest(BaseModel):
     repository_id: str
     workflow_id: str
     file_naming: Optional[str] = "id-name"
+    layout: Optional[str] = "file"  # file, exploded
 
 
 class ExportApplicationRequest(BaseModel):
@@ -31,6 +37,15 @@ class ExportApplicationRequest(BaseModel):
 class ExportAllRequest(BaseModel):
     repository_id: str
     file_naming: Optional[str] = "id-name"
+    layout: Optional[str] = "file"  # file, exploded
+    incremental: bool = False  # only export objects updated since the last export
+    background: bool = False  # run as a background job and return its id
+
+
+class PruneExportsRequest(BaseModel):
+    repository_id: str
+    dry_run: bool = False  # list the files that would be removed without removing them
+    background: bool = False
 
 
 class ImportWorkflowRequest(BaseModel):
@@ -48,11 +63,113 @@ class ImportApplicationRequest(BaseModel):
 class ImportAllRequest(BaseModel):
     repository_id: str
     auto_merge: bool = True
+    rev: Optional[str] = None  # import the tree of this commit instead of the working tree
+    force: bool = False  # re-import objects whose content was already synced
+    background: bool = False
 
 
 class SyncRequest(BaseModel):
     repository_id: str
     direction: Optional[str] = "bidirectional"  # export, import, bidirectional
+    incremental: bool = False  # only export objects updated since the last export
+    background: bool = False
+
+
+class StreamSyncRequest(BaseModel):
+    repository_id: str
+    direction: Optional[str] = "bidirectional"  # export, import, bidirectional
+    file_naming: Optional[str] = "id-name"
+    auto_merge: bool = True
+    incremental: bool = False  # only export objects updated since the last export
+    format: Optional[str] = "ndjson"  # ndjson, sse
+    stats_interval: float = 5.0
+
+
+# Job kinds whose progress describes a repository's sync state
+SYNC_JOB_KINDS = ("sync", "export_all", "import_all", "import_paths")
+
+
+def _get_job_config(job: Job) -> RepositoryConfig:
+    if job.repository_id not in repositories:
+        raise Exception(f"Repository not found: {job.repository_id}")
+    return repositories[job.repository_id]
+
+
+def _repository_missing(job: Job) -> Optional[str]:
+    """Reason a recovered job cannot run: repositories are only registered in memory"""
+    if job.repository_id not in repositories:
+        return f"repository {job.repository_id} is not connected"
+    return None
+
+
+@job_handler("sync", recoverable=_repository_missing)
+async def _run_sync_job(job: Job, progress: JobProgress) -> Dict[str, Any]:
+    sync_service = SyncService(GitService(), DifyAPIClient())
+    results = await sync_service.sync(
+        _get_job_config(job),
+        job.params.get("direction", "bidirectional"),
+        progress=progress,
+        incremental=job.params.get("incremental", False),
+    )
+    # Failed stages (or a failed pull) fail the job
+    return {"success": bool(results) and all(stage.get("success", False) for stage in results.values()), "results": results}
+
+
+@job_handler("export_all", recoverable=_repository_missing)
+async def _run_export_all_job(job: Job, progress: JobProgress) -> Dict[str, Any]:
+    sync_service = SyncService(GitService(), DifyAPIClient())
+    return await sync_service.export_all(
+        _get_job_config(job),
+        job.params.get("file_naming", "id-name"),
+        job.params.get("layout", "file"),
+        progress=progress,
+        incremental=job.params.get("incremental", False),
+    )
+
+
+@job_handler("prune_exports", recoverable=_repository_missing)
+async def _run_prune_exports_job(job: Job, progress: JobProgress) -> Dict[str, Any]:
+    sync_service = SyncService(GitService(), DifyAPIClient())
+    return await sync_service.prune_exports(_get_job_config(job), dry_run=job.params.get("dry_run", False))
+
+
+def _pull_for_job(sync_service: SyncService, config: RepositoryConfig) -> Dict[str, Any]:
+    """Bring the clone up to date with the push that triggered a job"""
+    repo = sync_service.git_service.get_repo(config)
+    return sync_service.git_service.pull(repo, config.branch, AuthService().git_auth(config))
+
+
+@job_handler("import_all", recoverable=_repository_missing)
+async def _run_import_all_job(job: Job, progress: JobProgress) -> Dict[str, Any]:
+    config = _get_job_config(job)
+    sync_service = SyncService(GitService(), DifyAPIClient())
+
+    if job.params.get("pull"):
+        pull_result = _pull_for_job(sync_service, config)
+        if not pull_result["success"]:
+            return pull_result
+
+    return await sync_service.import_all(
+        config,
+        job.params.get("auto_merge", True),
+        job.params.get("rev"),
+        progress=progress,
+        force=job.params.get("force", False),
+    )
+
+
+@job_handler("import_paths", recoverable=_repository_missing)
+async def _run_import_paths_job(job: Job, progress: JobProgress) -> Dict[str, Any]:
+    config = _get_job_config(job)
+    sync_service = SyncService(GitService(), DifyAPIClient())
+
+    pull_result = _pull_for_job(sync_service, config)
+    if not pull_result["success"]:
+        return pull_result
+
+    return await sync_service.import_paths(
+        config, job.params.get("paths", []), job.params.get("auto_merge", True), progress=progress
+    )
 
 
 @router.post("/export/workflow", response_model=Dict[str, Any])
@@ -67,7 +184,7 @@ async def export_workflow(request: ExportWorkflowRequest):
     sync_service = SyncService(git_service, dify_client)
 
     try:
-        result = await sync_service.export_workflow(config, request.workflow_id, request.file_naming)
+        result = await sync_service.export_workflow(config, request.workflow_id, request.file_naming, request.layout)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -97,18 +214,50 @@ async def export_all(request: ExportAllRequest):
     if request.repository_id not in repositories:
         raise HTTPException(status_code=404, detail="Repository not found")
 
+    if request.background:
+        return submit_job(
+            "export_all",
+            request.repository_id,
+            {
+                "file_naming": request.file_naming,
+                "layout": request.layout,
+                "incremental": request.incremental,
+            },
+        )
+
     config = repositories[request.repository_id]
     git_service = GitService()
     dify_client = DifyAPIClient()
     sync_service = SyncService(git_service, dify_client)
 
     try:
-        result = await sync_service.export_all(config, request.file_naming)
+        result = await sync_service.export_all(
+            config,
+            request.file_naming,
+            request.layout,
+            incremental=request.incremental,
+        )
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/export/prune", response_model=Dict[str, Any])
+async def prune_exports(request: PruneExportsRequest):
+    """Remove the files of exported objects that were deleted in Dify"""
+    if request.repository_id not in repositories:
+        raise HTTPException(status_code=404, detail="Repository not found")
+
+    if request.background:
+        return submit_job("prune_exports", request.repository_id, {"dry_run": request.dry_run})
+
+    sync_service = SyncService(GitService(), DifyAPIClient())
+    try:
+        return await sync_service.prune_exports(repositories[request.repository_id], dry_run=request.dry_run)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/import/workflow", response_model=Dict[str, Any])
 async def import_workflow(request: ImportWorkflowRequest):
     """Import a workflow from Git"""
@@ -151,13 +300,18 @@ async def import_all(request: ImportAllRequest):
     if request.repository_id not in repositories:
         raise HTTPException(status_code=404, detail="Repository not found")
 
+    if request.background:
+        return submit_job(
+            "import_all", request.repository_id, {"auto_merge": request.auto_merge, "rev": request.rev, "force": request.force}
+        )
+
     config = repositories[request.repository_id]
     git_service = GitService()
     dify_client = DifyAPIClient()
     sync_service = SyncService(git_service, dify_client)
 
     try:
-        result = await sync_service.import_all(config, request.auto_merge)
+        result = await sync_service.import_all(config, request.auto_merge, request.rev, force=request.force)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -169,31 +323,51 @@ async def sync_repository(request: SyncRequest):
     if request.repository_id not in repositories:
         raise HTTPException(status_code=404, detail="Repository not found")
 
+    if request.background:
+        return submit_job("sync", request.repository_id, {"direction": request.direction, "incremental": request.incremental})
+
     config = repositories[request.repository_id]
     git_service = GitService()
     dify_client = DifyAPIClient()
     sync_service = SyncService(git_service, dify_client)
 
     try:
-        results = {}
+        results = await sync_service.sync(config, request.direction, incremental=request.incremental)
+        return {"success": True, "results": results}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        if request.direction in ["export", "bidirectional"]:
-            # Pull latest from Git first
-            repo = git_service.get_repo(config)
-            git_service.pull(repo, config.branch)
 
-            # Export all
-            export_result = await sync_service.export_all(config)
-            results["export"] = export_result
+async def _encode_events(events: AsyncIterator[Dict[str, Any]], fmt: str) -> AsyncIterator[str]:
+    """Encode sync events as NDJSON lines or server-sent events"""
+    try:
+        async for event in events:
+            payload = json.dumps(event, default=str)
+            yield f"event: {event['event']}\ndata: {payload}\n\n" if fmt == "sse" else f"{payload}\n"
+    except Exception as e:
+        payload = json.dumps({"event": "error", "error": str(e)})
+        yield f"event: error\ndata: {payload}\n\n" if fmt == "sse" else f"{payload}\n"
 
-        if request.direction in ["import", "bidirectional"]:
-            # Import all
-            import_result = await sync_service.import_all(config, auto_merge=True)
-            results["import"] = import_result
 
-        return {"success": True, "results": results}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+@router.post("/stream")
+async def stream_sync(request: StreamSyncRequest):
+    """Sync with progress streamed as NDJSON or server-sent events"""
+    if request.repository_id not in repositories:
+        raise HTTPException(status_code=404, detail="Repository not found")
+
+    config = repositories[request.repository_id]
+    sync_service = SyncService(GitService(), DifyAPIClient())
+    events = sync_service.stream_sync(
+        config,
+        request.direction,
+        request.file_naming,
+        request.auto_merge,
+        stats_interval=request.stats_interval,
+        incremental=request.incremental,
+    )
+
+    media_type = "text/event-stream" if request.format == "sse" else "application/x-ndjson"
+    return StreamingResponse(_encode_events(events, request.format), media_type=media_type)
 
 
 @router.get("/{repository_id}/status", response_model=Dict[str, Any])
@@ -205,7 +379,8 @@ async def get_sync_status(repository_id: str):
     git_service = GitService()
     sync_service = SyncService(git_service, DifyAPIClient())
 
-    sync_state = sync_service.get_sync_state(repository_id)
+    jobs = [job for job in get_job_service().list(repository_id=repository_id) if job.kind in SYNC_JOB_KINDS]
+    sync_state = sync_service.current_sync_state(repository_id, jobs)
 
     if sync_state:
         return sync_state.dict()
@@ -0,0 +1,105 @@
+"""Git push webhook endpoints"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Request
+
+from models.repository import RepositoryConfig
+from models.webhook import PushEvent
+from services.auth_service import AuthService
+from services.webhook_service import WebhookError, WebhookService
+
+from .jobs import submit_job
+from .repositories import repositories
+
+logger = logging.getLogger("dify_git_plugin.webhooks")
+
+router = APIRouter(prefix="/webhooks", tags=["webhooks"])
+
+
+def _webhook_secret(config: RepositoryConfig) -> Optional[str]:
+    """Get a repository's webhook secret, falling back to the plugin-wide one"""
+    if config.webhook_secret:
+        return AuthService().decrypt_credentials(config.webhook_secret, config.id)["secret"]
+    return os.getenv("PLUGIN_WEBHOOK_SECRET") or None
+
+
+def _parse_push(
+    webhook_service: WebhookService, headers: Mapping[str, str], body: bytes
+) -> Tuple[Optional[str], Optional[PushEvent], Optional[Tuple[int, Dict[str, Any]]]]:
+    """Get (provider, push event, None), or a response for requests that are not pushes to sync"""
+    provider = webhook_service.detect_provider(headers)
+    if provider is None:
+        return None, None, (400, {"success": False, "error": "Unsupported webhook provider"})
+
+    event_type = webhook_service.event_type(provider, headers)
+    if event_type == "ping":
+        return provider, None, (200, {"success": True, "message": "pong"})
+    if event_type != "push":
+        return provider, None, (200, {"success": True, "ignored": True, "message": f"Ignoring {event_type} event"})
+
+    try:
+        event = webhook_service.parse_push(provider, json.loads(body))
+    except (ValueError, WebhookError) as e:
+        return provider, None, (400, {"success": False, "error": f"Invalid push payload: {e}"})
+
+    if event.branch is None or event.deleted:
+        return provider, None, (200, {"success": True, "ignored": True, "message": f"Ignoring push to {event.ref}"})
+    return provider, event, None
+
+
+def _queue_imports(event: PushEvent, configs: List[RepositoryConfig], paths: List[str]) -> List[Dict[str, Any]]:
+    """Queue an import job per repository for the paths a push changed"""
+    jobs = []
+    for config in configs:
+        if not event.complete:
+            # The payload does not list every change; pull and import everything
+            job = submit_job("import_all", config.id, {"auto_merge": True, "pull": True})
+        elif paths:
+            # The job imports the pulled HEAD, so jobs finishing out of order never import older content
+            job = submit_job("import_paths", config.id, {"paths": paths, "auto_merge": True})
+        else:
+            continue
+        jobs.append({"repository_id": config.id, "job_id": job["job_id"], "paths": paths if event.complete else None})
+        logger.info("Push to %s %s queued %s", event.provider, event.ref, job["job_id"])
+    return jobs
+
+
+def handle_push_webhook(headers: Mapping[str, str], body: bytes) -> Tuple[int, Dict[str, Any]]:
+    """Verify a push webhook and queue imports of the changed paths
+
+    Returns the HTTP status and response body. Only repositories whose URL and
+    branch match the push and whose secret verifies the request are synced;
+    without one the request is rejected as unsigned.
+    """
+    webhook_service = WebhookService()
+    provider, event, response = _parse_push(webhook_service, headers, body)
+    if response is not None:
+        return response
+
+    verified = []
+    for config in webhook_service.match_repositories(event, repositories.values()):
+        secret = _webhook_secret(config)
+        if secret and webhook_service.verify_signature(provider, headers, body, secret):
+            verified.append(config)
+    if not verified:
+        # The same answer whether or not a repository tracks the branch, so callers
+        # without a valid signature learn nothing about the connected repositories
+        return 401, {"success": False, "error": "Invalid webhook signature"}
+
+    jobs = _queue_imports(event, verified, webhook_service.sync_paths(event.changed_paths))
+    message = f"Queued {len(jobs)} import job(s)" if jobs else "No workflow or application changes"
+    return 200, {"success": True, "jobs": jobs, "message": message}
+
+
+@router.post("/push", response_model=Dict[str, Any])
+async def push_webhook(request: Request):
+    """Receive a GitHub, GitLab or Gitea push webhook"""
+    status, result = handle_push_webhook(request.headers, await request.body())
+    if status >= 400:
+        raise HTTPException(status_code=status, detail=result["error"])
+
+    return result
@@ -5,12 +5,15 @@ Main entry point for the plugin
 
 import os
 import sys
+import threading
 from typing import Any, Dict
 
 from dify_plugin.config.config import DifyPluginEnv
 from dify_plugin.plugin import Plugin
 from dotenv import load_dotenv
 
+from services.workspace_cache import get_workspace_cache
+
 # Load environment variables
 load_dotenv()
 
@@ -20,6 +23,29 @@ config = DifyPluginEnv()
 # Initialize plugin
 plugin = Plugin(config)
 
+# Remove clones left behind by interrupted clones or crashes, in the background
+# since it loads GitPython. Heavy modules (GitPython, FastAPI, httpx,
+# cryptography, the sync services) are imported on first use.
+threading.Thread(target=get_workspace_cache().cleanup_orphans, name="workspace-cleanup", daemon=True).start()
+
+# Start the auto-sync scheduler for repositories with auto_sync enabled
+if os.getenv("PLUGIN_AUTO_SYNC_ENABLED", "true").lower() == "true":
+    from services.scheduler import create_scheduler
+
+    def connected_repositories():
+        from endpoint_handlers.repositories import repositories
+
+        return list(repositories.values())
+
+    scheduler = create_scheduler(connected_repositories)
+    scheduler.start_in_thread()
+
+# Keep long-lived clones fast with commit-graph, multi-pack-index and repacks
+if os.getenv("PLUGIN_MAINTENANCE_ENABLED", "true").lower() == "true":
+    from services.maintenance import get_maintenance_runner
+
+    get_maintenance_runner().start_in_thread()
+
 # Start the plugin - this will start all threads and keep running
 # This is a blocking call that keeps the plugin alive
 plugin.run()
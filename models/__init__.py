@@ -1,8 +1,15 @@
 """Data models for Git Integration Plugin"""
 
-from .repository import Repository, RepositoryConfig
-from .sync import SyncState, SyncStatus
-from .workflow import ApplicationExport, WorkflowExport
+from typing import TYPE_CHECKING
+
+from utils.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .job import Job, JobStatus
+    from .repository import Repository, RepositoryConfig
+    from .sync import SyncState, SyncStatus
+    from .webhook import PushEvent
+    from .workflow import ApplicationExport, WorkflowExport
 
 __all__ = [
     "Repository",
@@ -11,4 +18,23 @@ __all__ = [
     "ApplicationExport",
     "SyncState",
     "SyncStatus",
+    "Job",
+    "JobStatus",
+    "PushEvent",
 ]
+
+# Models are imported on first access
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "Repository": ".repository",
+        "RepositoryConfig": ".repository",
+        "WorkflowExport": ".workflow",
+        "ApplicationExport": ".workflow",
+        "SyncState": ".sync",
+        "SyncStatus": ".sync",
+        "Job": ".job",
+        "JobStatus": ".job",
+        "PushEvent": ".webhook",
+    },
+)
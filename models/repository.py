@@ -18,6 +18,8 @@ class RepositoryConfig(BaseModel):
     auto_sync: bool = Field(default=False, description="Enable auto-sync (opt-in)")
     sync_interval: int = Field(default=60, description="Sync interval in minutes")
     workspace_id: str
+    bare: bool = Field(default=False, description="Keep a bare clone and commit exports without a working tree")
+    webhook_secret: Optional[str] = Field(default=None, description="Encrypted secret for push webhooks")
     local_path: Optional[str] = Field(default=None, description="Local repository path")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -27,4 +27,8 @@ class SyncState(BaseModel):
     pending_changes: List[str] = Field(default_factory=list)
     conflicts: List[Dict[str, Any]] = Field(default_factory=list)
     error_message: Optional[str] = None
+    errors: List[str] = Field(default_factory=list)  # every error of the last sync; error_message is the first
+    last_commit: Optional[str] = None
     sync_direction: Literal["export", "import", "bidirectional"] = "bidirectional"
+    job_id: Optional[str] = None  # background job the status and progress come from, while one is active
+    progress: Optional[Dict[str, Any]] = None  # completed, total and message of that job
@@ -0,0 +1,24 @@
+"""Webhook models"""
+
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class PushEvent(BaseModel):
+    """Provider-independent view of a Git push webhook"""
+
+    provider: Literal["github", "gitlab", "gitea"]
+    ref: str
+    before: Optional[str] = None
+    after: Optional[str] = None
+    repository_urls: List[str] = Field(default_factory=list, description="Clone, web and SSH URLs of the pushed repository")
+    changed_paths: List[str] = Field(default_factory=list, description="Paths added, modified or removed by the push")
+    complete: bool = Field(default=True, description="False when the payload does not list every pushed commit")
+    deleted: bool = Field(default=False, description="The pushed ref was deleted")
+
+    @property
+    def branch(self) -> Optional[str]:
+        if self.ref.startswith("refs/heads/"):
+            return self.ref[len("refs/heads/") :]
+        return None
@@ -1,9 +1,14 @@
 """Services for Git Integration Plugin"""
 
-from .auth_service import AuthService
-from .dify_api import DifyAPIClient
-from .git_service import GitService
-from .sync_service import SyncService
+from typing import TYPE_CHECKING
+
+from utils.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .auth_service import AuthService
+    from .dify_api import DifyAPIClient
+    from .git_service import GitService
+    from .sync_service import SyncService
 
 __all__ = [
     "GitService",
@@ -11,3 +16,14 @@ __all__ = [
     "SyncService",
     "AuthService",
 ]
+
+# Services are imported on first access; each pulls in GitPython, httpx or cryptography
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "AuthService": ".auth_service",
+        "DifyAPIClient": ".dify_api",
+        "GitService": ".git_service",
+        "SyncService": ".sync_service",
+    },
+)
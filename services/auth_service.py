@@ -1,18 +1,49 @@
-"""Authentication service for Git credentials"""
+"""Authentication service for Git credentials
+
+Credentials are stored as envelopes: ``v2.<key id>.<wrapped data key>.<ciphertext>``.
+Each envelope has its own random data key that encrypts the credentials; the
+data key is wrapped (encrypted) by the master key named by the key id. The
+parts are Fernet tokens, which are already URL-safe base64. Rotating the master
+key only re-wraps data keys (``rewrap``); envelopes wrapped by a previous key
+still decrypt while that key is listed in PLUGIN_ENCRYPTION_PREVIOUS_KEYS.
+Envelopes written before this format (base64 of a token encrypted directly by
+the master key) are still read.
+"""
 
 import base64
+import hashlib
+import json
 import os
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
 
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from services.credential_cache import get_credential_cache
+from services.git_credentials import DEFAULT_TOKEN_USERNAME, GitAuth, GitAuthError, remote_environment
+from utils.metrics import CRYPTO_SECONDS, timed
+
+ENVELOPE_VERSION = "v2"
+
+
+@lru_cache(maxsize=16)
+@timed(CRYPTO_SECONDS, operation="derive_key")
+def _pbkdf2(secret: bytes) -> bytes:
+    """Fernet key for ``secret``; cached because the KDF is deliberately slow and services are created per request"""
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+    kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=b"dify_git_plugin_salt", iterations=100000)
+    return base64.urlsafe_b64encode(kdf.derive(secret))
+
+
+def _key_id(fernet_key: bytes) -> str:
+    """Short public identifier of a master key"""
+    return hashlib.sha256(fernet_key).hexdigest()[:8]
 
 
 class AuthService:
     """Service for handling Git authentication and credential encryption"""
 
-    def __init__(self, encryption_key: Optional[str] = None):
+    def __init__(self, encryption_key: Optional[str] = None, previous_keys: Optional[List[str]] = None):
         # Generate or use provided encryption key
         if encryption_key:
             self.key = encryption_key.encode()
@@ -25,52 +56,146 @@ class AuthService:
                 # Generate a key from a default (should be set in production)
                 self.key = self._generate_key("default-workspace-key")
 
-        self.cipher = Fernet(self._derive_key(self.key))
+        # Master keys that still decrypt after a rotation
+        if previous_keys is None:
+            previous_keys = [key for key in os.getenv("PLUGIN_ENCRYPTION_PREVIOUS_KEYS", "").split(",") if key.strip()]
+        self.previous_keys = [key.strip().encode() for key in previous_keys]
+
+        self._cipher = None
+        self._keyring = None
+
+    @property
+    def cipher(self):
+        """Fernet cipher, created (and the key derived) on first encrypt or decrypt"""
+        if self._cipher is None:
+            from cryptography.fernet import Fernet
+
+            self._cipher = Fernet(self._derive_key(self.key))
+        return self._cipher
+
+    @property
+    def key_id(self) -> str:
+        return _key_id(self._derive_key(self.key))
+
+    @property
+    def keyring(self) -> Dict[str, Any]:
+        """Master key ciphers by key id, the current key first"""
+        if self._keyring is None:
+            from cryptography.fernet import Fernet
+
+            self._keyring = {self.key_id: self.cipher}
+            for key in self.previous_keys:
+                derived = self._derive_key(key)
+                self._keyring.setdefault(_key_id(derived), Fernet(derived))
+        return self._keyring
 
     def _generate_key(self, password: str) -> bytes:
         """Generate encryption key from password"""
-        kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=b"dify_git_plugin_salt", iterations=100000)
-        return base64.urlsafe_b64encode(kdf.derive(password.encode()))
+        return _pbkdf2(password.encode())
 
     def _derive_key(self, key: bytes) -> bytes:
         """Derive Fernet key from input key"""
-        kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=b"dify_git_plugin_salt", iterations=100000)
-        return base64.urlsafe_b64encode(kdf.derive(key))
+        return _pbkdf2(key)
 
+    @timed(CRYPTO_SECONDS, operation="encrypt")
     def encrypt_credentials(self, credentials: Dict[str, Any]) -> str:
-        """Encrypt credentials dictionary"""
-        import json
-
-        credentials_json = json.dumps(credentials)
-        encrypted = self.cipher.encrypt(credentials_json.encode())
-        return base64.urlsafe_b64encode(encrypted).decode()
-
-    def decrypt_credentials(self, encrypted_data: str) -> Dict[str, Any]:
-        """Decrypt credentials"""
-        import json
-
-        encrypted_bytes = base64.urlsafe_b64decode(encrypted_data.encode())
-        decrypted = self.cipher.decrypt(encrypted_bytes)
-        return json.loads(decrypted.decode())
-
-    def add_token_to_url(self, url: str) -> str:
-        """Add authentication token to Git URL"""
-        # This would be called with decrypted credentials
-        # For now, return URL as-is (should be implemented with actual token)
-        return url
-
-    def get_ssh_environment(self):
-        """Get SSH environment context manager"""
-        # This would set up SSH key environment
-        # For now, return a no-op context manager
-        from contextlib import contextmanager
-
-        @contextmanager
-        def ssh_env():
-            # Set SSH environment variables if needed
-            yield
-
-        return ssh_env()
+        """Encrypt credentials dictionary into an envelope with a new data key"""
+        from cryptography.fernet import Fernet
+
+        data_key = Fernet.generate_key()
+        wrapped_key = self.cipher.encrypt(data_key).decode()
+        ciphertext = Fernet(data_key).encrypt(json.dumps(credentials).encode()).decode()
+        return f"{ENVELOPE_VERSION}.{self.key_id}.{wrapped_key}.{ciphertext}"
+
+    def decrypt_credentials(self, encrypted_data: str, repository_id: Optional[str] = None) -> Dict[str, Any]:
+        """Decrypt credentials; with ``repository_id`` the plaintext is cached for repeated use"""
+        cache = get_credential_cache() if repository_id else None
+        if cache is not None:
+            cached = cache.get(repository_id, encrypted_data)
+            if cached is not None:
+                return cached
+
+        plaintext = self._open(encrypted_data)
+        if cache is not None:
+            cache.put(repository_id, encrypted_data, plaintext)
+        return json.loads(plaintext)
+
+    def repository_credentials(self, config) -> Optional[Dict[str, Any]]:
+        """Decrypted credentials of a repository (cached), or None if it has none"""
+        encrypted = (config.credentials or {}).get("encrypted")
+        return self.decrypt_credentials(encrypted, config.id) if encrypted else None
+
+    @timed(CRYPTO_SECONDS, operation="decrypt")
+    def _open(self, encrypted_data: str) -> bytes:
+        """Plaintext of an envelope (or of a legacy token)"""
+        if not encrypted_data.startswith(ENVELOPE_VERSION + "."):
+            return self._open_legacy(encrypted_data)
+
+        from cryptography.fernet import Fernet
+
+        return Fernet(self._unwrap(encrypted_data)).decrypt(encrypted_data.split(".", 3)[3].encode())
+
+    def _unwrap(self, envelope: str) -> bytes:
+        """Data key of an envelope"""
+        _, key_id, wrapped_key, _ = envelope.split(".", 3)
+        master = self.keyring.get(key_id)
+        if master is None:
+            raise ValueError(f"Credentials are encrypted with unknown master key {key_id}")
+        return master.decrypt(wrapped_key.encode())
+
+    def _open_legacy(self, encrypted_data: str) -> bytes:
+        from cryptography.fernet import InvalidToken
+
+        token = base64.urlsafe_b64decode(encrypted_data.encode())
+        for master in self.keyring.values():
+            try:
+                return master.decrypt(token)
+            except InvalidToken:
+                continue
+        raise InvalidToken()
+
+    def rewrap(self, encrypted_data: str) -> str:
+        """The envelope with its data key wrapped by the current master key
+
+        The credentials ciphertext is kept as is; only legacy values are
+        re-encrypted, into an envelope.
+        """
+        if not encrypted_data.startswith(ENVELOPE_VERSION + "."):
+            return self.encrypt_credentials(json.loads(self._open_legacy(encrypted_data)))
+
+        _, key_id, _, ciphertext = encrypted_data.split(".", 3)
+        if key_id == self.key_id:
+            return encrypted_data
+        wrapped_key = self.cipher.encrypt(self._unwrap(encrypted_data)).decode()
+        return f"{ENVELOPE_VERSION}.{self.key_id}.{wrapped_key}.{ciphertext}"
+
+    def git_auth(self, config) -> Optional[GitAuth]:
+        """Credentials for a repository's remote operations, or None for public repositories"""
+        if config.auth_type == "none":
+            return None
+        credentials = self.repository_credentials(config)
+        return GitAuth(config.auth_type, credentials) if credentials else None
+
+    def add_token_to_url(self, url: str, token: str, username: Optional[str] = None) -> str:
+        """Git URL with a token as its user info
+
+        Git operations pass tokens through ``git_auth`` instead: a URL with a
+        token ends up in the clone's config, process lists and error messages.
+        """
+        from urllib.parse import quote, urlsplit, urlunsplit
+
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            return url
+        userinfo = f"{quote(username or DEFAULT_TOKEN_USERNAME, safe='')}:{quote(token, safe='')}"
+        return urlunsplit(parts._replace(netloc=f"{userinfo}@{parts.hostname}" + (f":{parts.port}" if parts.port else "")))
+
+    def get_ssh_environment(self, config):
+        """Context manager yielding the environment for SSH remote operations of ``config``"""
+        auth = self.git_auth(config)
+        if auth is not None and auth.auth_type != "ssh":
+            raise GitAuthError(f"Repository {config.id} does not use SSH authentication")
+        return remote_environment(auth)
 
     def validate_ssh_key(self, key_path: str, passphrase: Optional[str] = None) -> bool:
         """Validate SSH key"""
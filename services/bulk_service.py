@@ -0,0 +1,153 @@
+"""Fleet-wide operations across connected repositories"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from models.repository import RepositoryConfig
+from services.auth_service import AuthService
+from services.dify_api import DifyAPIClient
+from services.git_service import GitService
+from services.state_store import get_state_store
+from services.sync_service import ProgressCallback, SyncService
+from utils.tracing import propagate
+from utils.validators import repository_host
+
+# Runs one repository's operation in a worker thread
+RepositoryOperation = Callable[[RepositoryConfig], Dict[str, Any]]
+
+# How often a repository waiting for a free slot of its host checks again
+HOST_LIMIT_POLL_SECONDS = 0.02
+
+
+class BulkService:
+    """Fans an operation out over many repositories
+
+    Git operations block, so each repository is handled on a worker pool shared
+    by every bulk request; the pool size is the global concurrency limit. At most
+    ``per_host`` repositories of the same Git host are worked on at once across
+    all requests and background jobs, so a fleet hosted on one server does not
+    flood it with connections.
+    """
+
+    def __init__(self, max_workers: int = 8, per_host: int = 4):
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bulk-worker")
+        # Background jobs each run on their own event loop, so host limits are thread semaphores
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_limits_lock = threading.Lock()
+
+    def _host_limit(self, host: str) -> threading.BoundedSemaphore:
+        """Semaphore shared by every request and job working on ``host``"""
+        with self._host_limits_lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_limits[host]
+
+    async def _acquire_host(self, host: str) -> threading.BoundedSemaphore:
+        """Take a slot of ``host`` without blocking the event loop
+
+        The slot is polled for rather than waited on in a thread, which would
+        tie up a thread per queued repository and could not be cancelled.
+        """
+        limit = self._host_limit(host)
+        while not limit.acquire(blocking=False):
+            await asyncio.sleep(HOST_LIMIT_POLL_SECONDS)
+        return limit
+
+    async def run(
+        self,
+        operation: str,
+        configs: List[RepositoryConfig],
+        func: RepositoryOperation,
+        progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, Any]:
+        """Run ``func`` for every repository and aggregate results and timings"""
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        finished = 0
+
+        async def run_one(config: RepositoryConfig) -> Dict[str, Any]:
+            nonlocal finished
+            limit = await self._acquire_host(repository_host(config.url))
+            item_started = time.monotonic()
+            try:
+                result = await loop.run_in_executor(self._executor, propagate(func), config)
+                item = {"repository_id": config.id, "success": result.get("success", True), "result": result}
+            except Exception as e:
+                item = {"repository_id": config.id, "success": False, "error": str(e)}
+            finally:
+                limit.release()
+            item["elapsed"] = round(time.monotonic() - item_started, 3)
+
+            finished += 1
+            if progress:
+                progress(finished, len(configs), f"{operation} {config.id}")
+            return item
+
+        results = await asyncio.gather(*(run_one(config) for config in configs))
+        failed = sum(1 for item in results if not item["success"])
+        elapsed = [item["elapsed"] for item in results]
+        return {
+            "success": failed == 0,
+            "operation": operation,
+            "total": len(results),
+            "succeeded": len(results) - failed,
+            "failed": failed,
+            "elapsed": round(time.monotonic() - started, 3),
+            "slowest": max(elapsed) if elapsed else None,
+            "results": results,
+        }
+
+    @staticmethod
+    def _pull(config: RepositoryConfig) -> Dict[str, Any]:
+        git_service = GitService()
+        return git_service.pull(git_service.get_repo(config), config.branch, AuthService().git_auth(config))
+
+    @staticmethod
+    def _status(config: RepositoryConfig) -> Dict[str, Any]:
+        git_service = GitService()
+        status = git_service.get_repository_status(git_service.get_repo(config))
+        state = get_state_store().get(config.id)
+        return {"success": True, "status": status, "sync_state": state.dict() if state else None}
+
+    @staticmethod
+    def _sync(config: RepositoryConfig, direction: str) -> Dict[str, Any]:
+        # Each worker thread drives its sync on its own event loop
+        sync_service = SyncService(GitService(), DifyAPIClient())
+        results = asyncio.run(sync_service.sync(config, direction))
+        return {"success": all(stage.get("success", False) for stage in results.values()), **results}
+
+    async def pull_all(self, configs: List[RepositoryConfig], progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """Pull every repository"""
+        return await self.run("pull", configs, self._pull, progress)
+
+    async def sync_all(
+        self, configs: List[RepositoryConfig], direction: str = "bidirectional", progress: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
+        """Sync every repository"""
+        return await self.run("sync", configs, lambda config: self._sync(config, direction), progress)
+
+    async def status_all(self, configs: List[RepositoryConfig]) -> Dict[str, Any]:
+        """Get the Git status and sync state of every repository"""
+        return await self.run("status", configs, self._status)
+
+
+_bulk_service: Optional[BulkService] = None
+_bulk_service_lock = threading.Lock()
+
+
+def get_bulk_service() -> BulkService:
+    """Get the process-wide bulk service"""
+    global _bulk_service
+    with _bulk_service_lock:
+        if _bulk_service is None:
+            _bulk_service = BulkService(
+                max_workers=int(os.getenv("PLUGIN_BULK_CONCURRENCY", "8")),
+                per_host=int(os.getenv("PLUGIN_BULK_PER_HOST", "4")),
+            )
+        return _bulk_service
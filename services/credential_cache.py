@@ -0,0 +1,92 @@
+"""In-memory cache of decrypted repository credentials"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+def _zeroize(buffer: bytearray) -> None:
+    buffer[:] = bytes(len(buffer))
+
+
+class CredentialCache:
+    """Decrypted credentials per repository for ``ttl`` seconds
+
+    Entries are keyed by repository id and the encrypted envelope, so new
+    credentials never hit an old entry. Plaintext is held in a ``bytearray``
+    that is overwritten with zeros when the entry expires, is evicted (least
+    recently used beyond ``max_entries``) or is invalidated. Dicts handed to
+    callers are fresh copies parsed from it.
+    """
+
+    def __init__(self, ttl: float = 300, max_entries: int = 256, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, bytearray]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, repository_id: str, envelope: str) -> Optional[Dict[str, Any]]:
+        key = (repository_id, envelope)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, plaintext = entry
+            if self.clock() >= expires:
+                self._evict(key)
+                return None
+            self._entries.move_to_end(key)
+            return json.loads(plaintext)
+
+    def put(self, repository_id: str, envelope: str, plaintext: bytes) -> None:
+        key = (repository_id, envelope)
+        with self._lock:
+            if key in self._entries:
+                self._evict(key)
+            self._entries[key] = (self.clock() + self.ttl, bytearray(plaintext))
+            self._purge()
+
+    def invalidate(self, repository_id: str) -> None:
+        """Forget every cached credential of a repository"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == repository_id]:
+                self._evict(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._evict(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _purge(self) -> None:
+        now = self.clock()
+        for key in [key for key, (expires, _) in self._entries.items() if now >= expires]:
+            self._evict(key)
+        while len(self._entries) > self.max_entries:
+            self._evict(next(iter(self._entries)))
+
+    def _evict(self, key: Tuple[str, str]) -> None:
+        _, plaintext = self._entries.pop(key)
+        _zeroize(plaintext)
+
+
+_cache: Optional[CredentialCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_credential_cache() -> Optional[CredentialCache]:
+    """The process-wide credential cache, or None when PLUGIN_CREDENTIAL_CACHE_SECONDS is 0"""
+    global _cache
+    ttl = float(os.getenv("PLUGIN_CREDENTIAL_CACHE_SECONDS", "300"))
+    if ttl <= 0:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = CredentialCache(ttl)
+        return _cache
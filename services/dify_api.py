@@ -5,6 +5,15 @@ from typing import Any, Dict, List, Optional
 
 import httpx
 
+from utils.metrics import DIFY_API_ERRORS, DIFY_API_REQUEST_SECONDS
+from utils.tracing import span, traceparent
+
+
+def _endpoint_label(endpoint: str) -> str:
+    """Endpoint with object ids replaced, so metrics have one series per route"""
+    parts = endpoint.strip("/").split("/")
+    return "/" + "/".join([parts[0]] + ["{id}"] * (len(parts) > 1))
+
 
 class DifyAPIClient:
     """Client for interacting with Dify API"""
@@ -18,11 +27,28 @@ class DifyAPIClient:
     async def _request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
         """Make HTTP request to Dify API"""
         url = f"{self.base_url}{endpoint}"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.request(method, url, headers=self.headers, **kwargs)
-            response.raise_for_status()
-            return response.json()
+        label = _endpoint_label(endpoint)
+
+        with (
+            DIFY_API_REQUEST_SECONDS.time(method=method, endpoint=label),
+            span("dify.request", {"http.method": method, "http.route": label}) as request_span,
+        ):
+            headers = self.headers
+            parent = traceparent()
+            if parent:
+                headers = {**headers, "traceparent": parent}
+            try:
+                async with httpx.AsyncClient() as client:
+                    response = await client.request(method, url, headers=headers, **kwargs)
+                    request_span.set_attribute("http.status_code", response.status_code)
+                    response.raise_for_status()
+                    return response.json()
+            except httpx.HTTPStatusError as e:
+                DIFY_API_ERRORS.inc(method=method, endpoint=label, status=e.response.status_code)
+                raise
+            except Exception:
+                DIFY_API_ERRORS.inc(method=method, endpoint=label, status="error")
+                raise
 
     async def list_workflows(self, page: int = 1, limit: int = 20) -> Dict[str, Any]:
         """List workflows"""
@@ -0,0 +1,227 @@
+"""Credentials for git remotes, served from memory through the environment
+
+Git subprocesses get their credentials from environment variables set for
+that one command, never from the remote URL (which git stores in the clone's
+config and shows in process lists and errors):
+
+- token auth configures an inline ``credential.helper`` (via
+  ``GIT_CONFIG_COUNT``) that answers with the username and token from the
+  command's environment;
+- SSH auth loads the private key into an ssh-agent owned by the plugin (over
+  stdin, so the key is never written to disk) and sets ``GIT_SSH_COMMAND`` to
+  use only that key, with ControlMaster multiplexing so repeated fetches and
+  pushes to a host reuse one SSH connection for ``PLUGIN_SSH_CONTROL_PERSIST``
+  seconds.
+"""
+
+import atexit
+import hashlib
+import os
+import shlex
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Set
+
+# Answers git's "get" requests from the command environment; other actions (store/erase) are ignored
+CREDENTIAL_HELPER = (
+    '!f() { test "$1" = get && printf "username=%s\\npassword=%s\\n" "$DIFY_GIT_USERNAME" "$DIFY_GIT_PASSWORD"; }; f'
+)
+
+# Username sent with tokens when none is configured (accepted by GitHub, GitLab and Gitea)
+DEFAULT_TOKEN_USERNAME = "x-access-token"
+
+
+class GitAuthError(Exception):
+    """Credentials cannot be used for git"""
+
+
+def token_environment(token: str, username: Optional[str] = None) -> Dict[str, str]:
+    """Environment authenticating HTTP(S) remotes with ``token``"""
+    return {
+        # Fail instead of prompting when the token is rejected
+        "GIT_TERMINAL_PROMPT": "0",
+        "GIT_ASKPASS": "",
+        # An empty helper first resets helpers from the user's and system git config
+        "GIT_CONFIG_COUNT": "2",
+        "GIT_CONFIG_KEY_0": "credential.helper",
+        "GIT_CONFIG_VALUE_0": "",
+        "GIT_CONFIG_KEY_1": "credential.helper",
+        "GIT_CONFIG_VALUE_1": CREDENTIAL_HELPER,
+        "DIFY_GIT_USERNAME": username or DEFAULT_TOKEN_USERNAME,
+        "DIFY_GIT_PASSWORD": token,
+    }
+
+
+def _load_private_key(private_key: str, passphrase: Optional[str]):
+    from cryptography.exceptions import UnsupportedAlgorithm
+    from cryptography.hazmat.primitives import serialization
+
+    data = private_key.encode()
+    password = passphrase.encode() if passphrase else None
+    try:
+        if b"BEGIN OPENSSH PRIVATE KEY" in data:
+            return serialization.load_ssh_private_key(data, password)
+        return serialization.load_pem_private_key(data, password)
+    except (ValueError, TypeError) as e:
+        raise GitAuthError(f"Invalid SSH private key: {e}")
+    except UnsupportedAlgorithm as e:
+        # Passphrase-protected OpenSSH-format keys need the optional bcrypt package
+        raise GitAuthError(f"Unsupported SSH private key: {e}")
+
+
+class SSHAgent:
+    """An ssh-agent holding the keys of SSH-authenticated repositories
+
+    The agent, its socket, the public key files that select a key and the
+    ControlMaster sockets live in a private temporary directory that is
+    removed when the process exits.
+    """
+
+    def __init__(self, control_persist: int = 300):
+        self.control_persist = control_persist
+        self.directory: Optional[Path] = None
+        self._process: Optional[subprocess.Popen] = None
+        self._loaded: Set[str] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def socket(self) -> Path:
+        return self.directory / "agent.sock"
+
+    def _start(self) -> None:
+        if self._process is not None and self._process.poll() is None:
+            return
+        if shutil.which("ssh-agent") is None:
+            raise GitAuthError("ssh-agent is required for SSH authentication")
+        # Short path: ControlMaster socket paths are limited to ~100 bytes
+        self.directory = Path(tempfile.mkdtemp(prefix="dify-ssh-"))
+        self._process = subprocess.Popen(
+            ["ssh-agent", "-D", "-a", str(self.socket)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        self._loaded.clear()
+        for _ in range(100):
+            if self.socket.exists():
+                return
+            if self._process.poll() is not None:
+                break
+            time.sleep(0.02)
+        raise GitAuthError("ssh-agent did not start")
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._process is not None:
+                self._process.terminate()
+                self._process.wait()
+                self._process = None
+            if self.directory is not None:
+                shutil.rmtree(self.directory, ignore_errors=True)
+                self.directory = None
+
+    def add_key(self, private_key: str, passphrase: Optional[str] = None) -> str:
+        """Load a key into the agent (once) and return its fingerprint"""
+        from cryptography.hazmat.primitives import serialization
+
+        key = _load_private_key(private_key, passphrase)
+        public_key = key.public_key().public_bytes(serialization.Encoding.OpenSSH, serialization.PublicFormat.OpenSSH)
+        fingerprint = hashlib.sha256(public_key).hexdigest()[:16]
+
+        with self._lock:
+            self._start()
+            if fingerprint in self._loaded:
+                return fingerprint
+            # Decrypted and re-encoded without a passphrase, so ssh-add never prompts
+            unencrypted = key.private_bytes(
+                serialization.Encoding.PEM, serialization.PrivateFormat.OpenSSH, serialization.NoEncryption()
+            )
+            result = subprocess.run(
+                ["ssh-add", "-q", "-"],
+                input=unencrypted,
+                capture_output=True,
+                env={**os.environ, "SSH_AUTH_SOCK": str(self.socket)},
+            )
+            if result.returncode != 0:
+                raise GitAuthError(f"ssh-add failed: {result.stderr.decode(errors='replace').strip()}")
+            (self.directory / f"{fingerprint}.pub").write_bytes(public_key + b"\n")
+            self._loaded.add(fingerprint)
+        return fingerprint
+
+    def ssh_command(self, fingerprint: str, known_hosts: Optional[str] = None) -> str:
+        """``GIT_SSH_COMMAND`` using only the key with ``fingerprint``"""
+        strict = "accept-new"
+        known_hosts_file = self.directory / "known_hosts"
+        if known_hosts:
+            strict = "yes"
+            known_hosts_file = self.directory / f"{fingerprint}.known_hosts"
+            known_hosts_file.write_text(known_hosts.strip() + "\n")
+
+        options = {
+            "BatchMode": "yes",
+            "IdentityAgent": self.socket,
+            "IdentitiesOnly": "yes",
+            "IdentityFile": self.directory / f"{fingerprint}.pub",
+            "StrictHostKeyChecking": strict,
+            "UserKnownHostsFile": known_hosts_file,
+            # Connections are shared per key as well as per host: deploy keys differ per repository
+            "ControlMaster": "auto",
+            "ControlPath": self.directory / f"{fingerprint[:12]}-%C",
+            "ControlPersist": self.control_persist,
+        }
+        return shlex.join(["ssh", *(arg for name, value in options.items() for arg in ("-o", f"{name}={value}"))])
+
+
+_agent: Optional[SSHAgent] = None
+_agent_lock = threading.Lock()
+
+
+def get_ssh_agent() -> SSHAgent:
+    """The process-wide agent for SSH-authenticated repositories"""
+    global _agent
+    with _agent_lock:
+        if _agent is None:
+            _agent = SSHAgent(control_persist=int(os.getenv("PLUGIN_SSH_CONTROL_PERSIST", "300")))
+            atexit.register(_agent.stop)
+        return _agent
+
+
+class GitAuth:
+    """Credentials of one repository, handed to GitService for remote operations"""
+
+    def __init__(self, auth_type: str, credentials: Dict[str, Any]):
+        self.auth_type = auth_type
+        self.credentials = credentials
+
+    @contextmanager
+    def environment(self) -> Iterator[Dict[str, str]]:
+        """Environment variables for a git command talking to the remote"""
+        if self.auth_type == "token":
+            token = self.credentials.get("token")
+            if not token:
+                raise GitAuthError("Token authentication requires a token")
+            yield token_environment(token, self.credentials.get("username"))
+        elif self.auth_type == "ssh":
+            private_key = self.credentials.get("private_key")
+            if not private_key:
+                raise GitAuthError("SSH authentication requires a private_key")
+            agent = get_ssh_agent()
+            fingerprint = agent.add_key(private_key, self.credentials.get("passphrase"))
+            yield {
+                "GIT_TERMINAL_PROMPT": "0",
+                "GIT_SSH_COMMAND": agent.ssh_command(fingerprint, self.credentials.get("known_hosts")),
+            }
+        else:
+            yield {}
+
+
+@contextmanager
+def remote_environment(auth: Optional[GitAuth]) -> Iterator[Dict[str, str]]:
+    """``auth``'s environment, or an empty one for public remotes"""
+    if auth is None:
+        yield {}
+        return
+    with auth.environment() as env:
+        yield env
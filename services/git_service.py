@@ -1,72 +1,214 @@
 """Git operations service"""
 
+import functools
 import json
 import os
+import subprocess
+import tempfile
+import weakref
 from datetime import datetime
+from io import BytesIO
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
 
-from git import GitCommandError, InvalidGitRepositoryError, Repo
+from git import Actor, Git, GitCommandError, InvalidGitRepositoryError, Repo
 from git.exc import GitError
+from gitdb import IStream
 
 from models.repository import RepositoryConfig
 from models.workflow import ApplicationExport, WorkflowExport
+from services.git_credentials import GitAuth, remote_environment
+from services.workspace_cache import get_workspace_cache
+from utils.export_manifest import MANIFEST_FILE, ExportManifest, export_stem, object_key
+from utils.locks import repository_lock
+from utils.metrics import GIT_BYTES_WRITTEN, GIT_OPEN_REPOSITORIES, GIT_OPERATION_ERRORS, GIT_OPERATION_SECONDS, timed
+from utils.serialization import VOLATILE_EXPORT_FIELDS, canonical_export, canonical_json
+from utils.tracing import TRACER
+from utils.tracing import span as trace_span
+from utils.workflow_layout import NODES_DIR, SKELETON_FILE, assemble_workflow, explode_workflow, node_references
+
+EMPTY_SHA = "0" * 40
+
+
+def _git_subcommand(command: Any) -> str:
+    """The git subcommand of a command line, skipping global options (and never URLs or credentials)"""
+    if isinstance(command, str):
+        return command.split()[1] if len(command.split()) > 1 else command
+    argv = [str(arg) for arg in command[1:]]
+    skip_next = False
+    for arg in argv:
+        if skip_next:
+            skip_next = False
+        elif arg in ("-c", "-C", "--git-dir", "--work-tree"):
+            skip_next = True
+        elif not arg.startswith("-"):
+            return arg
+    return "git"
+
+
+class UnreadableExport(NamedTuple):
+    """Yielded by ``iter_exported_objects`` in place of an object that could not be read"""
+
+    error: str
+
+
+def _loaded(load: Callable[..., Any], *args: Any) -> Any:
+    """Result of ``load(*args)``, or an ``UnreadableExport`` with the error it raised"""
+    try:
+        return load(*args)
+    except Exception as e:
+        return UnreadableExport(str(e))
+
+
+class _TracedGit(Git):
+    """Git command wrapper running every git subprocess in a tracing span"""
+
+    def execute(self, command, *args, **kwargs):
+        if not TRACER.enabled:
+            return super().execute(command, *args, **kwargs)
+        # Commands run as a process (clones, cat-file) are traced until they are started
+        with trace_span(f"git {_git_subcommand(command)}", {"git.as_process": bool(kwargs.get("as_process"))}):
+            return super().execute(command, *args, **kwargs)
+
+
+class _TracedRepo(Repo):
+    GitCommandWrapperType = _TracedGit
+    # The id of the repository config the clone belongs to, which keys its lock
+    repository_id: Optional[str] = None
+
+
+def _open_repo(path, repository_id: str) -> Repo:
+    """Open a Repo handle, counted as open until it is garbage collected"""
+    repo = _TracedRepo(path)
+    repo.repository_id = repository_id
+    if GIT_OPEN_REPOSITORIES.registry.enabled:
+        GIT_OPEN_REPOSITORIES.inc()
+        weakref.finalize(repo, GIT_OPEN_REPOSITORIES.dec)
+    return repo
+
+
+# Content staged for bare repositories (path -> data, None deletes) and the
+# export manifests loaded so far, keyed by git dir. Endpoints create a
+# GitService per request, so these outlive the instances; they are only used
+# holding the repository lock.
+_staged_exports: Dict[str, Dict[str, Optional[bytes]]] = {}
+_export_manifests: Dict[str, ExportManifest] = {}
+
+
+def _repository_id(repo: Repo) -> str:
+    """The id keying a repository's lock: its config id, or else its clone directory"""
+    return getattr(repo, "repository_id", None) or Path(repo.working_tree_dir or repo.git_dir).name
+
+
+def _locked(method: Callable[..., Any]) -> Callable[..., Any]:
+    """Run a GitService method holding the lock of the repository it is given
+
+    The lock is keyed by the config id the handle was opened for (see
+    ``get_repo``), the same key maintenance, gc and eviction use, so they skip
+    the repository instead of running in the middle of a write. Handles opened
+    elsewhere fall back to the clone directory, which is named after that id.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, repo: Repo, *args: Any, **kwargs: Any) -> Any:
+        with repository_lock(_repository_id(repo)):
+            return method(self, repo, *args, **kwargs)
+
+    return wrapper
+
+
+def commit_failed(result: Dict[str, Any]) -> bool:
+    # Having nothing to commit is reported as a failure but is not an error
+    return result.get("success") is False and result.get("error") != "No changes to commit"
 
 
 class GitService:
     """Service for Git operations"""
 
-    def __init__(self, temp_dir: str = "./temp/git"):
-        self.temp_dir = Path(temp_dir)
+    def __init__(self, temp_dir: Optional[str] = None):
+        self.temp_dir = Path(temp_dir or os.getenv("GIT_TEMP_DIR", "./temp/git"))
         self.temp_dir.mkdir(parents=True, exist_ok=True)
+        self.workspace_cache = get_workspace_cache(self.temp_dir)
 
-    def clone_repository(self, config: RepositoryConfig, auth_handler=None) -> Repo:
+    @timed(GIT_OPERATION_SECONDS, GIT_OPERATION_ERRORS, operation="clone")
+    def clone_repository(self, config: RepositoryConfig, auth_handler: Optional[GitAuth] = None) -> Repo:
         """Clone a Git repository"""
         repo_path = self.temp_dir / config.id
 
-        if repo_path.exists():
-            # Repository already exists, try to open it
-            try:
-                return Repo(repo_path)
-            except InvalidGitRepositoryError:
-                # Remove invalid repository
+        with repository_lock(config.id):
+            if repo_path.exists():
+                # Repository already exists, try to open it
+                try:
+                    repo = _open_repo(repo_path, config.id)
+                    self.workspace_cache.touch(config.id)
+                    return repo
+                except InvalidGitRepositoryError:
+                    # Remove invalid repository
+                    import shutil
+
+                    shutil.rmtree(repo_path)
+
+            # Clone next to the final path so an interrupted clone is never mistaken for a repository
+            partial_path = self.workspace_cache.partial_path(config.id)
+            if partial_path.exists():
                 import shutil
 
-                shutil.rmtree(repo_path)
+                shutil.rmtree(partial_path)
 
-        # Clone repository
-        try:
-            if config.auth_type == "ssh" and auth_handler:
-                with auth_handler.get_ssh_environment():
-                    repo = Repo.clone_from(config.url, repo_path)
-            elif config.auth_type == "token" and auth_handler:
-                # Use token in URL
-                url_with_token = auth_handler.add_token_to_url(config.url)
-                repo = Repo.clone_from(url_with_token, repo_path)
-            else:
-                repo = Repo.clone_from(config.url, repo_path)
+            try:
+                # Credentials reach git through the environment, so the remote URL stays clean
+                with remote_environment(auth_handler) as env:
+                    _TracedRepo.clone_from(config.url, partial_path, bare=config.bare, env=env)
+                os.replace(partial_path, repo_path)
+                repo = _open_repo(repo_path, config.id)
+                # Nothing staged for or loaded from an evicted clone at this path applies any more
+                _staged_exports.pop(repo.git_dir, None)
+                _export_manifests.pop(repo.git_dir, None)
+                if repo.bare:
+                    self._track_remote_branches(repo, seed=True)
 
-            # Checkout default branch
-            if config.branch:
-                repo.git.checkout(config.branch)
+                # Checkout default branch
+                if config.branch:
+                    self.checkout_branch(repo, config.branch)
 
-            return repo
-        except GitCommandError as e:
-            raise Exception(f"Failed to clone repository: {str(e)}")
+                self.workspace_cache.touch(config.id)
+                return repo
+            except GitCommandError as e:
+                raise Exception(f"Failed to clone repository: {str(e)}")
 
+    @timed(GIT_OPERATION_SECONDS, GIT_OPERATION_ERRORS, operation="open")
     def get_repo(self, config: RepositoryConfig) -> Repo:
-        """Get existing repository instance"""
+        """Get existing repository instance, cloning it again if it was evicted"""
         repo_path = self.temp_dir / config.id
         if not repo_path.exists():
-            raise Exception(f"Repository not found at {repo_path}")
+            if not config.local_path:
+                raise Exception(f"Repository not found at {repo_path}")
+
+            # Connected before but evicted from the workspace cache
+            from services.auth_service import AuthService
+
+            return self.clone_repository(config, AuthService().git_auth(config))
 
         try:
-            return Repo(repo_path)
+            repo = _open_repo(repo_path, config.id)
         except InvalidGitRepositoryError:
             raise Exception(f"Invalid Git repository at {repo_path}")
 
-    def pull(self, repo: Repo, branch: Optional[str] = None) -> Dict[str, Any]:
+        self.workspace_cache.touch(config.id)
+        return repo
+
+    @timed(GIT_OPERATION_SECONDS, GIT_OPERATION_ERRORS, operation="pull")
+    @_locked
+    def pull(self, repo: Repo, branch: Optional[str] = None, auth_handler: Optional[GitAuth] = None) -> Dict[str, Any]:
         """Pull latest changes from remote"""
+        # The manifest may change with the pulled commits
+        _export_manifests.pop(repo.git_dir, None)
+        with remote_environment(auth_handler) as env, repo.git.custom_environment(**env):
+            if repo.bare:
+                return self._fetch_bare(repo, branch)
+            return self._pull(repo, branch)
+
+    def _pull(self, repo: Repo, branch: Optional[str] = None) -> Dict[str, Any]:
         try:
             if branch:
                 repo.git.checkout(branch)
@@ -86,8 +228,51 @@ class GitService:
         except GitCommandError as e:
             return {"success": False, "error": str(e)}
 
+    @staticmethod
+    def _track_remote_branches(repo: Repo, seed: bool = False) -> None:
+        """Keep remote-tracking branches in a bare clone, which ``git clone --bare`` does not
+
+        With a fetch refspec configured, fetches and pushes update
+        ``refs/remotes/origin/*``, so the commits that were never pushed can be
+        told apart (see ``WorkspaceCache.is_evictable``). A fresh clone is
+        ``seed``ed from its branches, which are the remote's at that point.
+        """
+        if repo.git.config("--get-all", "remote.origin.fetch", with_exceptions=False):
+            return
+        repo.git.config("remote.origin.fetch", "+refs/heads/*:refs/remotes/origin/*")
+        if seed:
+            repo.git.fetch(".", "+refs/heads/*:refs/remotes/origin/*")
+
+    def _fetch_bare(self, repo: Repo, branch: Optional[str] = None) -> Dict[str, Any]:
+        """Fast-forward a bare repository's branch from the remote"""
+        try:
+            if branch:
+                self.checkout_branch(repo, branch)
+            ref = repo.git.symbolic_ref("HEAD")
+            before_commit = repo.head.commit.hexsha if repo.head.is_valid() else None
+            self._track_remote_branches(repo)
+
+            # A non-forced refspec refuses to drop local export commits that were not pushed
+            repo.git.fetch("origin", f"{ref}:{ref}")
+            after_commit = repo.head.commit.hexsha
+
+            return {
+                "success": True,
+                "updated": before_commit != after_commit,
+                "before_commit": before_commit,
+                "after_commit": after_commit,
+            }
+        except GitCommandError as e:
+            return {"success": False, "error": str(e)}
+
+    @timed(GIT_OPERATION_SECONDS, GIT_OPERATION_ERRORS, is_error=commit_failed, operation="commit")
+    @_locked
     def commit(self, repo: Repo, message: str, author: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         """Commit changes to repository"""
+        self.save_export_manifest(repo)
+        if repo.bare:
+            return self.commit_staged(repo, message, author)
+
         try:
             # Check if there are changes
             if repo.is_dirty() or repo.untracked_files:
@@ -108,21 +293,215 @@ class GitService:
         except GitCommandError as e:
             return {"success": False, "error": str(e)}
 
-    def push(self, repo: Repo, branch: Optional[str] = None, auth_type: str = "none", auth_handler=None) -> Dict[str, Any]:
+    @timed(GIT_OPERATION_SECONDS, GIT_OPERATION_ERRORS, is_error=commit_failed, operation="commit_files")
+    @_locked
+    def commit_files(
+        self,
+        repo: Repo,
+        message: str,
+        paths: Optional[List[str]] = None,
+        blobs: Optional[Dict[str, bytes]] = None,
+        removed: Optional[List[str]] = None,
+        author: Optional[Dict[str, str]] = None,
+        branch: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Commit an explicit set of files without scanning the working tree
+
+        ``paths`` are files relative to the working tree, ``blobs`` map repository
+        paths to in-memory content and ``removed`` lists paths to delete. The tree
+        is built with index plumbing on a temporary index seeded from the branch
+        head, so the cost scales with the number of changed files. Commits to
+        the checked-out branch also update the checkout's index and working tree.
+        """
+        try:
+            ref = f"refs/heads/{branch}" if branch else repo.git.symbolic_ref("HEAD")
+            try:
+                parent = self._git(repo, "rev-parse", "--verify", "-q", f"{ref}^{{commit}}")
+            except GitCommandError:
+                parent = None
+
+            if removed and parent:
+                # A removed directory takes every file below it
+                listed = self._git(repo, "ls-tree", "-r", "-z", "--name-only", parent, "--", *removed)
+                removed = sorted(set(removed) | {name for name in listed.split("\0") if name})
+            entries = self._index_entries(repo, paths, blobs, removed)
+            index_info = "".join(f"{entry}\n" for entry in entries)
+            tree = self._write_tree(repo, parent, index_info)
+
+            if parent and tree == self._git(repo, "rev-parse", f"{parent}^{{tree}}"):
+                return {"success": False, "error": "No changes to commit"}
+
+            commit_hash = self._commit_tree(repo, tree, parent, message, author)
+            self._git(repo, "update-ref", ref, commit_hash, parent or EMPTY_SHA)
+
+            if not repo.bare and ref == repo.git.symbolic_ref("HEAD"):
+                self._sync_checkout(repo, index_info, blobs, removed)
+
+            return {"success": True, "commit_hash": commit_hash, "message": message, "files": len(entries)}
+        except GitCommandError as e:
+            return {"success": False, "error": str(e)}
+
+    def _index_entries(
+        self,
+        repo: Repo,
+        paths: Optional[List[str]],
+        blobs: Optional[Dict[str, bytes]],
+        removed: Optional[List[str]],
+    ) -> List[str]:
+        """``update-index --index-info`` lines for changed and removed files"""
+        entries = []
+
+        # Hash working tree files with a single hash-object process
+        if paths:
+            hashes = self._git(repo, "hash-object", "-w", "--stdin-paths", input="\n".join(paths) + "\n").split()
+            for path, sha in zip(paths, hashes):
+                mode = "100755" if os.access(Path(repo.working_tree_dir) / path, os.X_OK) else "100644"
+                entries.append(f"{mode} {sha}\t{path}")
+
+        # Store in-memory blobs directly in the object database
+        for path, data in (blobs or {}).items():
+            sha = repo.odb.store(IStream("blob", len(data), BytesIO(data))).hexsha.decode()
+            entries.append(f"100644 {sha}\t{path}")
+
+        for path in removed or []:
+            entries.append(f"0 {EMPTY_SHA}\t{path}")
+
+        return entries
+
+    def _write_tree(self, repo: Repo, parent: Optional[str], index_info: str) -> str:
+        """Tree of ``parent`` with ``index_info`` applied, built on a temporary index"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            env = {"GIT_INDEX_FILE": os.path.join(tmp_dir, "index")}
+            if parent:
+                self._git(repo, "read-tree", parent, env=env)
+            self._git(repo, "update-index", "--add", "--remove", "--index-info", input=index_info, env=env)
+            return self._git(repo, "write-tree", env=env)
+
+    def _commit_tree(
+        self, repo: Repo, tree: str, parent: Optional[str], message: str, author: Optional[Dict[str, str]]
+    ) -> str:
+        """Create a commit object for ``tree``"""
+        commit_author = Actor.author(repo.config_reader())
+        commit_committer = Actor.committer(repo.config_reader())
+        if author:
+            commit_author = Actor(author.get("name", "Dify"), author.get("email", "dify@example.com"))
+        env = {
+            "GIT_AUTHOR_NAME": commit_author.name,
+            "GIT_AUTHOR_EMAIL": commit_author.email,
+            "GIT_COMMITTER_NAME": commit_committer.name,
+            "GIT_COMMITTER_EMAIL": commit_committer.email,
+        }
+
+        commit_args = ["commit-tree", tree, "-F", "-"]
+        if parent:
+            commit_args += ["-p", parent]
+        return self._git(repo, *commit_args, input=message, env=env)
+
+    def _sync_checkout(
+        self, repo: Repo, index_info: str, blobs: Optional[Dict[str, bytes]], removed: Optional[List[str]]
+    ) -> None:
+        """Bring a checkout's index and working tree in line with a commit made by commit_files
+
+        Otherwise committed blobs would show as deleted and removed files as
+        untracked, and the next ``commit()`` would undo both.
+        """
+        root = Path(repo.working_tree_dir)
+        for path, data in (blobs or {}).items():
+            (root / path).parent.mkdir(parents=True, exist_ok=True)
+            (root / path).write_bytes(data)
+        for path in removed or []:
+            self._remove_checkout_path(root, path)
+        self._git(repo, "update-index", "--add", "--remove", "--index-info", input=index_info)
+
+    @staticmethod
+    def _remove_checkout_path(root: Path, path: str) -> None:
+        """Delete a removed file or directory from a working tree, then the directories it leaves empty"""
+        import shutil
+
+        root = root.resolve()
+        target = root / path
+        parent = target.parent.resolve()
+        # Only ever delete below the working tree, and never the repository itself
+        if target.name in ("", ".", "..") or (parent != root and root not in parent.parents):
+            return
+        target = parent / target.name
+        if target == root / ".git" or root / ".git" in target.parents:
+            return
+
+        if target.is_file() or target.is_symlink():
+            target.unlink()
+        elif target.is_dir():
+            shutil.rmtree(target)
+        else:
+            return
+
+        for directory in target.parents:
+            if directory == root:
+                break
+            try:
+                directory.rmdir()
+            except OSError:
+                # Not empty
+                break
+
+    def resolve_commit(self, repo: Repo, rev: Optional[str] = None) -> Optional[str]:
+        """Commit id of ``rev`` (HEAD by default), or None if it does not name a commit"""
+        try:
+            return self._git(repo, "rev-parse", "--verify", "-q", f"{rev or 'HEAD'}^{{commit}}")
+        except GitCommandError:
+            return None
+
+    @timed(GIT_OPERATION_SECONDS, GIT_OPERATION_ERRORS, is_error=commit_failed, operation="commit_staged")
+    @_locked
+    def commit_staged(self, repo: Repo, message: str, author: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Commit content staged by exports into a bare repository"""
+        staged = _staged_exports.get(repo.git_dir, {})
+        if not staged:
+            return {"success": False, "error": "No changes to commit"}
+
+        result = self.commit_files(
+            repo,
+            message,
+            blobs={path: data for path, data in staged.items() if data is not None},
+            removed=[path for path, data in staged.items() if data is None],
+            author=author,
+        )
+        if result.get("success") or result.get("error") == "No changes to commit":
+            _staged_exports.pop(repo.git_dir, None)
+        return result
+
+    def _git(self, repo: Repo, *args: str, input: Optional[str] = None, env: Optional[Dict[str, str]] = None) -> str:
+        """Run a git plumbing command against the repository and return its stripped output"""
+        command = ["git", "--git-dir", repo.git_dir, *args]
+        with trace_span(f"git {args[0]}"):
+            result = subprocess.run(
+                command,
+                input=input.encode("utf-8") if input is not None else None,
+                capture_output=True,
+                cwd=repo.working_tree_dir or repo.git_dir,
+                env={**os.environ, **(env or {})},
+            )
+        if result.returncode != 0:
+            raise GitCommandError(command, result.returncode, result.stderr)
+        return result.stdout.decode("utf-8").strip()
+
+    @timed(GIT_OPERATION_SECONDS, GIT_OPERATION_ERRORS, operation="push")
+    @_locked
+    def push(self, repo: Repo, branch: Optional[str] = None, auth_handler: Optional[GitAuth] = None) -> Dict[str, Any]:
         """Push changes to remote"""
         try:
             branch = branch or repo.active_branch.name
+            if repo.bare:
+                self._track_remote_branches(repo)
 
-            if auth_type == "ssh" and auth_handler:
-                with auth_handler.get_ssh_environment():
-                    repo.remotes.origin.push(branch)
-            else:
+            with remote_environment(auth_handler) as env, repo.git.custom_environment(**env):
                 repo.remotes.origin.push(branch)
 
             return {"success": True, "branch": branch}
         except GitCommandError as e:
             return {"success": False, "error": str(e)}
 
+    @timed(GIT_OPERATION_SECONDS, GIT_OPERATION_ERRORS, operation="get_branches")
     def get_branches(self, repo: Repo) -> List[Dict[str, Any]]:
         """Get list of branches"""
         try:
@@ -155,27 +534,43 @@ class GitService:
         except Exception as e:
             raise Exception(f"Failed to get branches: {str(e)}")
 
+    @timed(GIT_OPERATION_SECONDS, GIT_OPERATION_ERRORS, operation="create_branch")
+    @_locked
     def create_branch(self, repo: Repo, branch_name: str, from_branch: Optional[str] = None) -> Dict[str, Any]:
         """Create a new branch"""
         try:
             if from_branch:
-                repo.git.checkout(from_branch)
+                self.checkout_branch(repo, from_branch)
 
-            new_branch = repo.create_head(branch_name)
-            new_branch.checkout()
+            if repo.bare:
+                new_branch = repo.create_head(branch_name, repo.head.commit)
+                self.checkout_branch(repo, branch_name)
+            else:
+                new_branch = repo.create_head(branch_name)
+                new_branch.checkout()
 
             return {"success": True, "branch": branch_name}
         except GitCommandError as e:
             return {"success": False, "error": str(e)}
 
+    @timed(GIT_OPERATION_SECONDS, GIT_OPERATION_ERRORS, operation="checkout")
+    @_locked
     def checkout_branch(self, repo: Repo, branch_name: str) -> Dict[str, Any]:
         """Checkout a branch"""
+        _export_manifests.pop(repo.git_dir, None)
         try:
-            repo.git.checkout(branch_name)
+            if repo.bare:
+                # Bare repositories have no working tree; switching branch only moves HEAD
+                if _staged_exports.get(repo.git_dir):
+                    raise GitCommandError(["checkout", branch_name], 1, "Uncommitted exports staged")
+                repo.git.symbolic_ref("HEAD", f"refs/heads/{branch_name}")
+            else:
+                repo.git.checkout(branch_name)
             return {"success": True, "branch": branch_name}
         except GitCommandError as e:
             return {"success": False, "error": str(e)}
 
+    @timed(GIT_OPERATION_SECONDS, GIT_OPERATION_ERRORS, operation="log")
     def get_commit_history(self, repo: Repo, limit: int = 20) -> List[Dict[str, Any]]:
         """Get commit history"""
         try:
@@ -194,6 +589,7 @@ class GitService:
         except Exception as e:
             raise Exception(f"Failed to get commit history: {str(e)}")
 
+    @timed(GIT_OPERATION_SECONDS, GIT_OPERATION_ERRORS, operation="diff")
     def get_diff(self, repo: Repo, commit1: Optional[str] = None, commit2: Optional[str] = None) -> str:
         """Get diff between commits or working directory"""
         try:
@@ -206,94 +602,476 @@ class GitService:
         except GitCommandError as e:
             raise Exception(f"Failed to get diff: {str(e)}")
 
-    def export_workflow(self, repo: Repo, workflow: WorkflowExport, file_naming: str = "id-name") -> str:
-        """Export workflow to Git repository"""
-        workflows_dir = Path(repo.working_dir) / "workflows"
-        workflows_dir.mkdir(exist_ok=True)
+    @timed(GIT_OPERATION_SECONDS, GIT_OPERATION_ERRORS, operation="export_workflow")
+    @_locked
+    def export_workflow(self, repo: Repo, workflow: WorkflowExport, file_naming: str = "id-name", layout: str = "file") -> str:
+        """Export workflow to Git repository
+
+        With layout="exploded" the workflow is written as a directory holding the
+        graph skeleton plus one file per node, so small edits touch small blobs.
+        """
+        basename = self._claim_export(repo, "workflow", workflow.id, workflow.name, file_naming, layout == "exploded")
 
-        # Determine filename
-        if file_naming == "id":
-            filename = f"workflow-{workflow.id}.json"
-        elif file_naming == "name":
-            # Sanitize name for filename
-            safe_name = "".join(c for c in workflow.name if c.isalnum() or c in (" ", "-", "_")).strip()
-            filename = f"workflow-{safe_name}.json"
-        else:  # id-name
-            safe_name = "".join(c for c in workflow.name if c.isalnum() or c in (" ", "-", "_")).strip()
-            filename = f"workflow-{workflow.id}-{safe_name}.json"
+        if layout == "exploded":
+            return self._export_workflow_exploded(repo, basename, workflow)
 
-        file_path = workflows_dir / filename
+        file_path = f"{basename}.json"
 
         # Write workflow data
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(workflow.dict(), f, indent=2, default=str)
+        self._write_file(repo, file_path, canonical_export(workflow))
+
+        # Drop the exploded form if the workflow was previously stored that way
+        self._remove_path(repo, basename)
+
+        return file_path
+
+    def workflow_path(self, repo: Repo, workflow: WorkflowExport, file_naming: str = "id-name", layout: str = "file") -> str:
+        """Repository path export_workflow writes a workflow to"""
+        basename = self._export_stem(repo, "workflow", workflow.id, workflow.name, file_naming)
+        return basename if layout == "exploded" else f"{basename}.json"
+
+    def _export_workflow_exploded(self, repo: Repo, workflow_dir: str, workflow: WorkflowExport) -> str:
+        """Write a workflow as a skeleton file plus one file per node"""
+        files = explode_workflow(workflow.dict(exclude=VOLATILE_EXPORT_FIELDS))
+
+        for relative_path, content in files.items():
+            self._write_file(repo, f"{workflow_dir}/{relative_path}", canonical_json(content))
+
+        # Remove files of nodes that no longer exist
+        for node_file in self._list_files(repo, f"{workflow_dir}/{NODES_DIR}"):
+            if node_file[len(workflow_dir) + 1 :] not in files:
+                self._remove_path(repo, node_file)
+
+        # Drop the single-file form if the workflow was previously stored that way
+        self._remove_path(repo, f"{workflow_dir}.json")
 
-        return str(file_path.relative_to(repo.working_dir))
+        return workflow_dir
 
+    def application_path(self, repo: Repo, application: ApplicationExport, file_naming: str = "id-name") -> str:
+        """Repository path export_application writes an application to"""
+        return f"{self._export_stem(repo, 'application', application.id, application.name, file_naming)}.json"
+
+    @timed(GIT_OPERATION_SECONDS, GIT_OPERATION_ERRORS, operation="export_application")
+    @_locked
     def export_application(self, repo: Repo, application: ApplicationExport, file_naming: str = "id-name") -> str:
         """Export application to Git repository"""
-        applications_dir = Path(repo.working_dir) / "applications"
-        applications_dir.mkdir(exist_ok=True)
+        file_path = f"{self._claim_export(repo, 'application', application.id, application.name, file_naming)}.json"
 
-        # Determine filename
-        if file_naming == "id":
-            filename = f"app-{application.id}.json"
-        elif file_naming == "name":
-            safe_name = "".join(c for c in application.name if c.isalnum() or c in (" ", "-", "_")).strip()
-            filename = f"app-{safe_name}.json"
-        else:  # id-name
-            safe_name = "".join(c for c in application.name if c.isalnum() or c in (" ", "-", "_")).strip()
-            filename = f"app-{application.id}-{safe_name}.json"
+        # Write application data
+        self._write_file(repo, file_path, canonical_export(application))
 
-        file_path = applications_dir / filename
+        return file_path
 
-        # Write application data
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(application.dict(), f, indent=2, default=str)
+    # Export paths. The manifest maps every exported object to its path; it is
+    # loaded once per repository and written back by save_export_manifest (and
+    # before every commit).
+
+    def export_manifest(self, repo: Repo) -> ExportManifest:
+        """The export manifest of a repository, indexing existing exports the first time"""
+        with repository_lock(_repository_id(repo)):
+            manifest = _export_manifests.get(repo.git_dir)
+            if manifest is None:
+                data = self._read_file(repo, MANIFEST_FILE)
+                manifest = ExportManifest.from_json(data) if data is not None else self._index_exports(repo)
+                _export_manifests[repo.git_dir] = manifest
+            return manifest
+
+    def _index_exports(self, repo: Repo) -> ExportManifest:
+        """Build a manifest from the ids in exports written before there was one"""
+        manifest = ExportManifest()
+        files = self.list_exported_files(repo)
+        for kind, paths in (("workflow", files["workflows"]), ("application", files["applications"])):
+            for path in paths:
+                object_id = self._export_id(repo, path)
+                if object_id and object_key(kind, object_id) not in manifest:
+                    manifest.assign(object_key(kind, object_id), path)
+        return manifest
+
+    def _export_id(self, repo: Repo, path: str) -> Optional[str]:
+        """Id recorded in an export file or exploded workflow directory"""
+        try:
+            document = self._read_json(repo, path if path.endswith(".json") else f"{path}/{SKELETON_FILE}")
+        except Exception:
+            return None
+        return document.get("id") if isinstance(document, dict) else None
+
+    @_locked
+    def save_export_manifest(self, repo: Repo) -> bool:
+        """Write the export manifest if exports changed it"""
+        manifest = _export_manifests.get(repo.git_dir)
+        if manifest is None or not manifest.dirty:
+            return False
+        self._write_file(repo, MANIFEST_FILE, canonical_json(manifest.to_document()))
+        manifest.dirty = False
+        return True
+
+    def _export_stem(self, repo: Repo, kind: str, object_id: str, name: str, file_naming: str) -> str:
+        """Path (without extension) an object is exported to, avoiding paths held by other objects"""
+        key = object_key(kind, object_id)
+
+        def is_free(stem: str) -> bool:
+            # Files the manifest does not know about are taken unless they hold this object
+            for path in (f"{stem}.json", stem) if kind == "workflow" else (f"{stem}.json",):
+                if self._path_type(repo, path) is not None:
+                    return self._export_id(repo, path) == object_id
+            return True
+
+        return self.export_manifest(repo).resolve(key, export_stem(kind, object_id, name, file_naming), is_free)
+
+    def _claim_export(
+        self, repo: Repo, kind: str, object_id: str, name: str, file_naming: str, directory: bool = False
+    ) -> str:
+        """Reserve an object's export path, moving its previous export out of the way"""
+        stem = self._export_stem(repo, kind, object_id, name, file_naming)
+        previous = self.export_manifest(repo).assign(object_key(kind, object_id), stem if directory else f"{stem}.json")
+        if previous is not None:
+            # Renamed (or renaming scheme changed): remove the old file before the new one is written
+            self._remove_path(repo, previous)
+        return stem
+
+    # Repository content access. Checkouts are read and written through the
+    # working tree; bare repositories stage blobs in memory until the next
+    # commit and read committed content from the object database.
+
+    def _write_file(self, repo: Repo, file_path: str, content: str) -> bool:
+        """Write file content, leaving the file untouched if it is already identical"""
+        data = content.encode("utf-8")
+
+        if repo.bare:
+            with repository_lock(_repository_id(repo)):
+                if self._read_file(repo, file_path) == data:
+                    _staged_exports.get(repo.git_dir, {}).pop(file_path, None)
+                    return False
+                _staged_exports.setdefault(repo.git_dir, {})[file_path] = data
+            GIT_BYTES_WRITTEN.inc(len(data))
+            return True
+
+        full_path = Path(repo.working_dir) / file_path
+        if full_path.exists() and full_path.read_bytes() == data:
+            return False
+
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        full_path.write_bytes(data)
+        GIT_BYTES_WRITTEN.inc(len(data))
+        return True
+
+    def _remove_path(self, repo: Repo, path: str) -> None:
+        """Remove a file or directory if it exists"""
+        if repo.bare:
+            with repository_lock(_repository_id(repo)):
+                staged = _staged_exports.setdefault(repo.git_dir, {})
+                for file_path in self._list_files(repo, path):
+                    staged[file_path] = None
+            return
 
-        return str(file_path.relative_to(repo.working_dir))
+        full_path = Path(repo.working_dir) / path
+        if full_path.is_dir():
+            import shutil
 
+            shutil.rmtree(full_path)
+        elif full_path.exists():
+            full_path.unlink()
+
+    @_locked
+    def remove_export(self, repo: Repo, file_path: str) -> bool:
+        """Remove an exported workflow or application, returning whether it existed"""
+        manifest = self.export_manifest(repo)
+        owner = manifest.owner_of(file_path)
+        if owner is not None:
+            manifest.forget(owner)
+        if not self.path_exists(repo, file_path):
+            return False
+        self._remove_path(repo, file_path)
+        return True
+
+    @timed(GIT_OPERATION_SECONDS, GIT_OPERATION_ERRORS, operation="prune_exports")
+    @_locked
+    def prune_exports(self, repo: Repo, listed: Iterable[str], dry_run: bool = False) -> Dict[str, str]:
+        """Remove the exports of objects not in ``listed``, returning object key -> removed path
+
+        Orphans are found from the export manifest alone, without reading any
+        export. A checkout drops them with one ``git rm`` (files that were never
+        committed are deleted directly); a bare repository stages their
+        deletion for the next commit. With ``dry_run`` nothing is removed.
+        """
+        manifest = self.export_manifest(repo)
+        listed = set(listed)
+        orphans = {key: path for key, path in manifest.items() if key not in listed}
+        if dry_run or not orphans:
+            return orphans
+
+        paths = sorted(orphans.values())
+        if repo.bare:
+            # Exports are files or directories directly below workflows/ and applications/
+            removed = set(paths)
+            staged = _staged_exports.setdefault(repo.git_dir, {})
+            for directory in ("workflows", "applications"):
+                for file_path in self._list_files(repo, directory):
+                    if file_path in removed or "/".join(file_path.split("/", 2)[:2]) in removed:
+                        staged[file_path] = None
+        else:
+            self._git(
+                repo,
+                "rm",
+                "-r",
+                "-f",
+                "-q",
+                "--ignore-unmatch",
+                "--pathspec-from-file=-",
+                "--pathspec-file-nul",
+                input="\0".join(paths),
+                env={"GIT_LITERAL_PATHSPECS": "1"},
+            )
+            for path in paths:
+                self._remove_path(repo, path)
+
+        for key in orphans:
+            manifest.forget(key)
+        return orphans
+
+    def path_exists(self, repo: Repo, path: str) -> bool:
+        """Check whether a file or directory exists in the repository"""
+        return self._path_type(repo, path) is not None
+
+    def _tree_entry(self, repo: Repo, path: str):
+        """Get the committed tree or blob at path, or None"""
+        try:
+            return repo.head.commit.tree / path
+        except (KeyError, ValueError):
+            return None
+
+    def _path_type(self, repo: Repo, path: str) -> Optional[str]:
+        """Return "file", "dir" or None for a repository path"""
+        if repo.bare:
+            with repository_lock(_repository_id(repo)):
+                staged = _staged_exports.get(repo.git_dir, {})
+                if staged.get(path) is not None:
+                    return "file"
+                # Staged files below the path make it a directory; staged deletions may empty a committed one
+                below = [data is not None for file_path, data in staged.items() if file_path.startswith(f"{path}/")]
+                if any(below):
+                    return "dir"
+                entry = self._tree_entry(repo, path)
+                if entry is None or path in staged:
+                    return None
+                if entry.type != "tree":
+                    return "file"
+                return "dir" if not below or self._list_files(repo, path) else None
+
+        full_path = Path(repo.working_dir) / path
+        if full_path.is_dir():
+            return "dir"
+        return "file" if full_path.exists() else None
+
+    def _read_file(self, repo: Repo, path: str) -> Optional[bytes]:
+        """Read file content, or None if the file does not exist"""
+        if repo.bare:
+            with repository_lock(_repository_id(repo)):
+                staged = _staged_exports.get(repo.git_dir, {})
+                if path in staged:
+                    return staged[path]
+            entry = self._tree_entry(repo, path)
+            if entry is None or entry.type != "blob":
+                return None
+            return entry.data_stream.read()
+
+        full_path = Path(repo.working_dir) / path
+        return full_path.read_bytes() if full_path.is_file() else None
+
+    def _read_json(self, repo: Repo, path: str) -> Any:
+        """Read and parse a JSON file"""
+        data = self._read_file(repo, path)
+        if data is None:
+            raise Exception(f"File not found: {path}")
+        return json.loads(data)
+
+    def _list_files(self, repo: Repo, path: str) -> List[str]:
+        """List files at or below a repository path"""
+        if repo.bare:
+            files = set()
+            if repo.head.is_valid():
+                output = self._git(repo, "ls-tree", "-r", "-z", "--name-only", "HEAD", "--", path)
+                files = {name for name in output.split("\0") if name}
+            with repository_lock(_repository_id(repo)):
+                for file_path, data in _staged_exports.get(repo.git_dir, {}).items():
+                    if file_path == path or file_path.startswith(f"{path}/"):
+                        if data is None:
+                            files.discard(file_path)
+                        else:
+                            files.add(file_path)
+            return sorted(files)
+
+        full_path = Path(repo.working_dir) / path
+        if full_path.is_file():
+            return [path]
+        return sorted(str(f.relative_to(repo.working_dir)) for f in full_path.rglob("*") if f.is_file())
+
+    @timed(GIT_OPERATION_SECONDS, GIT_OPERATION_ERRORS, operation="import_workflow")
     def import_workflow(self, repo: Repo, file_path: str) -> Dict[str, Any]:
         """Import workflow from Git repository"""
-        full_path = Path(repo.working_dir) / file_path
-        if not full_path.exists():
+        path_type = self._path_type(repo, file_path)
+        if path_type is None:
             raise Exception(f"Workflow file not found: {file_path}")
 
-        with open(full_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        # Exploded layout: reassemble from the skeleton and node files
+        if file_path.endswith(f"/{SKELETON_FILE}"):
+            return self._import_workflow_exploded(repo, file_path[: -len(SKELETON_FILE) - 1])
+        if path_type == "dir":
+            return self._import_workflow_exploded(repo, file_path)
+
+        return self._read_json(repo, file_path)
+
+    def _import_workflow_exploded(self, repo: Repo, workflow_dir: str) -> Dict[str, Any]:
+        """Reassemble a workflow stored in the exploded layout"""
+        skeleton = self._read_json(repo, f"{workflow_dir}/{SKELETON_FILE}")
 
-        return data
+        node_files = {}
+        for _, relative_path in node_references(skeleton):
+            node_files[relative_path] = self._read_json(repo, f"{workflow_dir}/{relative_path}")
 
+        return assemble_workflow(skeleton, node_files)
+
+    @timed(GIT_OPERATION_SECONDS, GIT_OPERATION_ERRORS, operation="import_application")
     def import_application(self, repo: Repo, file_path: str) -> Dict[str, Any]:
         """Import application from Git repository"""
-        full_path = Path(repo.working_dir) / file_path
-        if not full_path.exists():
+        if self._path_type(repo, file_path) != "file":
             raise Exception(f"Application file not found: {file_path}")
 
-        with open(full_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        return data
+        return self._read_json(repo, file_path)
 
+    @timed(GIT_OPERATION_SECONDS, GIT_OPERATION_ERRORS, operation="list_exported_files")
     def list_exported_files(self, repo: Repo) -> Dict[str, List[str]]:
         """List all exported workflows and applications"""
-        workflows_dir = Path(repo.working_dir) / "workflows"
-        applications_dir = Path(repo.working_dir) / "applications"
-
         workflows = []
         applications = []
 
-        if workflows_dir.exists():
-            workflows = [str(f.relative_to(repo.working_dir)) for f in workflows_dir.glob("*.json")]
+        for path in self._list_files(repo, "workflows"):
+            parts = path.split("/")
+            if len(parts) == 2 and parts[1].endswith(".json"):
+                workflows.append(path)
+            elif len(parts) == 3 and parts[2] == SKELETON_FILE:
+                # Exploded workflows are directories with a skeleton file
+                workflows.append(f"{parts[0]}/{parts[1]}")
 
-        if applications_dir.exists():
-            applications = [str(f.relative_to(repo.working_dir)) for f in applications_dir.glob("*.json")]
+        for path in self._list_files(repo, "applications"):
+            parts = path.split("/")
+            if len(parts) == 2 and parts[1].endswith(".json"):
+                applications.append(path)
 
         return {"workflows": workflows, "applications": applications}
 
+    def iter_exported_objects(
+        self, repo: Repo, rev: Optional[str] = None
+    ) -> Iterator[Tuple[str, str, Union[Dict[str, Any], UnreadableExport]]]:
+        """Lazily yield (kind, path, data) for every exported workflow and application
+
+        With a ``rev`` (or in a bare repository, where HEAD is used) the objects are
+        enumerated from the committed tree with a streamed ``ls-tree`` and their
+        blobs are read one at a time through the repository's long-lived
+        ``cat-file --batch`` process, so memory use does not grow with the number
+        of files. Without a ``rev`` a checkout's working tree is read instead.
+
+        An object that cannot be read (invalid JSON, a workflow directory without
+        its skeleton) yields an ``UnreadableExport`` in place of its data, so one
+        broken file does not end the listing. Failing to list the objects raises.
+        """
+        if rev is None and not repo.bare:
+            files = self.list_exported_files(repo)
+            for path in files["workflows"]:
+                yield "workflow", path, _loaded(self.import_workflow, repo, path)
+            for path in files["applications"]:
+                yield "application", path, _loaded(self.import_application, repo, path)
+            return
+
+        if not repo.head.is_valid() and rev is None:
+            return
+
+        # Exploded workflow directories are collected (as blob ids only) until the listing moves past them
+        exploded_dir = None
+        exploded_blobs: Dict[str, str] = {}
+
+        for entry in self._iter_git_output(
+            repo, "ls-tree", "-r", "-z", "--full-tree", rev or "HEAD", "--", "workflows", "applications"
+        ):
+            info, path = entry.split("\t", 1)
+            sha = info.split()[2]
+            parts = path.split("/")
+
+            if exploded_dir and not path.startswith(f"{exploded_dir}/"):
+                yield "workflow", exploded_dir, _loaded(self._assemble_from_blobs, repo, exploded_blobs)
+                exploded_dir, exploded_blobs = None, {}
+
+            if len(parts) == 2 and parts[1].endswith(".json"):
+                kind = "workflow" if parts[0] == "workflows" else "application"
+                yield kind, path, _loaded(self._read_blob_json, repo, sha)
+            elif parts[0] == "workflows" and len(parts) > 2:
+                exploded_dir = f"{parts[0]}/{parts[1]}"
+                exploded_blobs["/".join(parts[2:])] = sha
+
+        if exploded_dir:
+            yield "workflow", exploded_dir, _loaded(self._assemble_from_blobs, repo, exploded_blobs)
+
+    def _read_blob_json(self, repo: Repo, sha: str) -> Any:
+        """Read and parse a blob through the persistent cat-file process"""
+        _, _, _, stream = repo.git.stream_object_data(sha)
+        return json.loads(stream.read())
+
+    def _assemble_from_blobs(self, repo: Repo, blobs: Dict[str, str]) -> Dict[str, Any]:
+        """Reassemble an exploded workflow from blob ids keyed by path within its directory"""
+        if SKELETON_FILE not in blobs:
+            raise Exception("Workflow skeleton not found")
+
+        skeleton = self._read_blob_json(repo, blobs[SKELETON_FILE])
+        node_files = {path: self._read_blob_json(repo, blobs[path]) for _, path in node_references(skeleton) if path in blobs}
+        return assemble_workflow(skeleton, node_files)
+
+    def _iter_git_output(self, repo: Repo, *args: str) -> Iterator[str]:
+        """Stream NUL-separated records from a git command without buffering its whole output"""
+        command = ["git", "--git-dir", repo.git_dir, *args]
+        # Not made current: the consumer runs between records
+        # stderr goes to a file: a full stderr pipe would block git while stdout is being read
+        with trace_span(f"git {args[0]}", activate=False), tempfile.TemporaryFile() as stderr_file:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr_file)
+            completed = False
+            try:
+                pending = b""
+                for chunk in iter(lambda: process.stdout.read(65536), b""):
+                    *records, pending = (pending + chunk).split(b"\0")
+                    for record in records:
+                        yield record.decode("utf-8")
+                if pending:
+                    yield pending.decode("utf-8")
+                completed = True
+            finally:
+                if not completed:
+                    # The consumer stopped early
+                    process.kill()
+                process.stdout.close()
+                if process.wait() != 0 and completed:
+                    stderr_file.seek(0)
+                    raise GitCommandError(command, process.returncode, stderr_file.read())
+
+    @timed(GIT_OPERATION_SECONDS, GIT_OPERATION_ERRORS, operation="status")
     def get_repository_status(self, repo: Repo) -> Dict[str, Any]:
         """Get repository status"""
         try:
+            if repo.bare:
+                with repository_lock(_repository_id(repo)):
+                    staged = sorted(_staged_exports.get(repo.git_dir, {}))
+                return {
+                    "branch": repo.active_branch.name,
+                    "bare": True,
+                    "is_dirty": bool(staged),
+                    "untracked_files": [],
+                    "modified_files": [],
+                    "staged_files": staged,
+                    "last_commit": {
+                        "hash": repo.head.commit.hexsha,
+                        "message": repo.head.commit.message.split("\n")[0],
+                        "date": datetime.fromtimestamp(repo.head.commit.committed_date).isoformat(),
+                    },
+                }
+
             return {
                 "branch": repo.active_branch.name,
                 "is_dirty": repo.is_dirty(),
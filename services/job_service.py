@@ -0,0 +1,262 @@
+"""Background job service"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from models.job import Job, JobStatus
+from utils.storage import connect_sqlite, get_storage_dir
+from utils.tracing import propagate
+
+logger = logging.getLogger("dify_git_plugin.jobs")
+
+# Job kind -> coroutine function(job, progress) returning the job result
+JobHandler = Callable[[Job, "JobProgress"], Awaitable[Dict[str, Any]]]
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+# Job kind -> function(job) returning why a recovered job cannot run, or None
+RecoveryCheck = Callable[[Job], Optional[str]]
+RECOVERY_CHECKS: Dict[str, RecoveryCheck] = {}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    repository_id TEXT,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    total INTEGER,
+    message TEXT,
+    result TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_repository ON jobs (repository_id, created_at);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+"""
+
+
+def job_handler(kind: str, recoverable: Optional[RecoveryCheck] = None):
+    """Register a coroutine function as the handler for a job kind
+
+    Jobs still pending after a restart are queued again unless
+    ``recoverable(job)`` names a reason they cannot run, for example state
+    that only lived in the previous process.
+    """
+
+    def decorator(func: JobHandler) -> JobHandler:
+        JOB_HANDLERS[kind] = func
+        if recoverable is not None:
+            RECOVERY_CHECKS[kind] = recoverable
+        return func
+
+    return decorator
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested"""
+
+
+class JobProgress:
+    """Progress reporter handed to job handlers
+
+    Calling the reporter records progress and raises JobCancelled once the job
+    has been cancelled, so long-running handlers stop at the next item.
+    """
+
+    def __init__(self, service: "JobService", job_id: str, min_interval: float = 0.5):
+        self.service = service
+        self.job_id = job_id
+        self.min_interval = min_interval
+        self._last_write = 0.0
+
+    @property
+    def cancelled(self) -> bool:
+        return self.service.is_cancel_requested(self.job_id)
+
+    def __call__(self, completed: int, total: Optional[int] = None, message: Optional[str] = None) -> None:
+        if self.cancelled:
+            raise JobCancelled(f"Job {self.job_id} was cancelled")
+
+        # Throttle database writes; the last update is always written when the job finishes
+        now = time.monotonic()
+        if now - self._last_write >= self.min_interval or (total is not None and completed >= total):
+            self._last_write = now
+            self.service._update(self.job_id, completed=completed, total=total, message=message)
+
+
+class JobService:
+    """Runs jobs on a worker pool and persists them in SQLite"""
+
+    def __init__(self, db_path: Optional[Path] = None, max_workers: int = 2):
+        self.db_path = Path(db_path) if db_path else get_storage_dir() / "jobs.db"
+        self._connection = connect_sqlite(self.db_path)
+        self._connection.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._cancelled: set = set()
+        self._listeners: List[Callable[[Job], None]] = []
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job-worker")
+
+    def _execute(self, sql: str, params: tuple = ()) -> List[Any]:
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    def _row_to_job(self, row) -> Job:
+        data = dict(row)
+        data["params"] = json.loads(data["params"])
+        data["result"] = json.loads(data["result"]) if data["result"] else None
+        data["cancel_requested"] = bool(data["cancel_requested"])
+        return Job(**data)
+
+    def _update(self, job_id: str, **fields: Any) -> None:
+        for key in ("result", "params"):
+            if key in fields and fields[key] is not None:
+                fields[key] = json.dumps(fields[key], default=str)
+        for key, value in list(fields.items()):
+            if isinstance(value, datetime):
+                fields[key] = value.isoformat()
+            elif isinstance(value, JobStatus):
+                fields[key] = value.value
+
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        self._execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+        job = self.get(job_id)
+        for listener in self._listeners:
+            try:
+                listener(job)
+            except Exception:
+                logger.exception("Job listener failed")
+
+    def add_listener(self, listener: Callable[[Job], None]) -> None:
+        """Call listener with the job after every status or progress change"""
+        self._listeners.append(listener)
+
+    def submit(self, kind: str, params: Optional[Dict[str, Any]] = None, repository_id: Optional[str] = None) -> Job:
+        """Persist a new job and queue it for execution"""
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        job = Job(id=str(uuid.uuid4()), kind=kind, repository_id=repository_id, params=params or {})
+        self._execute(
+            "INSERT INTO jobs (id, kind, repository_id, status, params, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                job.id,
+                job.kind,
+                job.repository_id,
+                job.status.value,
+                json.dumps(job.params, default=str),
+                job.created_at.isoformat(),
+            ),
+        )
+        # The job's spans join the trace of the request that submitted it
+        self._executor.submit(propagate(self._run), job.id)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a job by id"""
+        rows = self._execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return self._row_to_job(rows[0]) if rows else None
+
+    def list(self, repository_id: Optional[str] = None, status: Optional[str] = None, limit: int = 50) -> List[Job]:
+        """List jobs, newest first"""
+        clauses, params = [], []
+        if repository_id:
+            clauses.append("repository_id = ?")
+            params.append(repository_id)
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._execute(f"SELECT * FROM jobs {where} ORDER BY created_at DESC LIMIT ?", (*params, limit))
+        return [self._row_to_job(row) for row in rows]
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a pending job or ask a running job to stop"""
+        job = self.get(job_id)
+        if job is None or job.is_finished:
+            return job
+
+        self._cancelled.add(job_id)
+        if job.status == JobStatus.PENDING:
+            self._update(job_id, status=JobStatus.CANCELLED, cancel_requested=1, finished_at=datetime.utcnow())
+        else:
+            self._update(job_id, cancel_requested=1)
+        return self.get(job_id)
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        return job_id in self._cancelled
+
+    def _run(self, job_id: str) -> None:
+        job = self.get(job_id)
+        if job is None or job.status != JobStatus.PENDING:
+            # Cancelled while queued
+            self._cancelled.discard(job_id)
+            return
+
+        self._update(job_id, status=JobStatus.RUNNING, started_at=datetime.utcnow())
+        progress = JobProgress(self, job_id)
+        try:
+            handler = JOB_HANDLERS[job.kind]
+            result = asyncio.run(handler(job, progress))
+            # Handlers may swallow JobCancelled into an error result
+            status = JobStatus.CANCELLED if progress.cancelled else JobStatus.COMPLETED
+            self._update(job_id, status=status, result=result, finished_at=datetime.utcnow())
+        except JobCancelled:
+            self._update(job_id, status=JobStatus.CANCELLED, finished_at=datetime.utcnow())
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job_id, job.kind)
+            self._update(job_id, status=JobStatus.FAILED, error=str(e), finished_at=datetime.utcnow())
+        finally:
+            self._cancelled.discard(job_id)
+
+    def recover(self) -> None:
+        """Requeue pending jobs and fail jobs interrupted by a restart or unable to run after it"""
+        for row in self._execute("SELECT id FROM jobs WHERE status = ?", (JobStatus.RUNNING.value,)):
+            self._update(
+                row["id"], status=JobStatus.FAILED, error="Interrupted by plugin restart", finished_at=datetime.utcnow()
+            )
+        for row in self._execute("SELECT * FROM jobs WHERE status = ? ORDER BY created_at", (JobStatus.PENDING.value,)):
+            job = self._row_to_job(row)
+            check = RECOVERY_CHECKS.get(job.kind)
+            reason = check(job) if check else None
+            if reason:
+                self._update(
+                    job.id,
+                    status=JobStatus.FAILED,
+                    error=f"Not resumed after plugin restart: {reason}",
+                    finished_at=datetime.utcnow(),
+                )
+            else:
+                self._executor.submit(self._run, job.id)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker pool"""
+        self._executor.shutdown(wait=wait)
+        self._connection.close()
+
+
+_job_service: Optional[JobService] = None
+_job_service_lock = threading.Lock()
+
+
+def get_job_service() -> JobService:
+    """Get the process-wide job service, recovering persisted jobs on first use"""
+    global _job_service
+    with _job_service_lock:
+        if _job_service is None:
+            _job_service = JobService(max_workers=int(os.getenv("PLUGIN_JOB_WORKERS", "2")))
+            _job_service.recover()
+        return _job_service
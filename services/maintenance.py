@@ -0,0 +1,218 @@
+"""Background Git maintenance of managed clones"""
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from services.workspace_cache import WorkspaceCache, get_workspace_cache
+from utils.locks import try_repository_lock
+
+if TYPE_CHECKING:
+    from git import Repo
+
+logger = logging.getLogger("dify_git_plugin.maintenance")
+
+# File in a clone's git dir whose mtime records the last maintenance run
+MAINTENANCE_MARKER = "dify-last-maintenance"
+
+
+def repack_batch_size(repo: "Repo") -> int:
+    """Batch size of an incremental repack, picked as ``git maintenance`` does
+
+    Just over the second largest pack, so the largest pack is left alone and
+    the smaller ones are combined into a pack of about its size.
+    """
+    pack_dir = Path(repo.git_dir) / "objects" / "pack"
+    sizes = sorted(path.stat().st_size for path in pack_dir.glob("*.pack"))
+    return (sizes[-2] if len(sizes) > 1 else sizes[0] if sizes else 0) + 1
+
+
+def count_objects(repo: "Repo") -> Dict[str, int]:
+    """Object and pack statistics from ``git count-objects -v`` (sizes in KiB)"""
+    stats = {}
+    for line in repo.git.count_objects("-v").splitlines():
+        key, _, value = line.partition(":")
+        try:
+            stats[key.strip().replace("-", "_")] = int(value.strip())
+        except ValueError:
+            continue
+    return stats
+
+
+class MaintenanceRunner:
+    """Keeps long-lived clones fast to query
+
+    For each clone that has been idle for ``idle_seconds`` it writes split
+    commit-graph files (used by history and branch walks), maintains a
+    multi-pack-index over the packs, folds packs together once there are
+    ``max_packs`` of them, and packs loose objects once there are
+    ``loose_objects_threshold``. Clones are maintained at most every
+    ``interval`` seconds unless they need repacking sooner. A clone that is
+    locked by another operation is skipped until the next pass; GitService
+    holds the lock for clones, pulls, commits, pushes and exports, so
+    maintenance never repacks under a live operation on the same repository.
+    """
+
+    def __init__(
+        self,
+        workspace_cache: WorkspaceCache,
+        interval: float = 6 * 3600,
+        idle_seconds: float = 300,
+        tick_seconds: float = 300,
+        max_packs: int = 10,
+        loose_objects_threshold: int = 100,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.workspace_cache = workspace_cache
+        self.interval = interval
+        self.idle_seconds = idle_seconds
+        self.tick_seconds = tick_seconds
+        self.max_packs = max_packs
+        self.loose_objects_threshold = loose_objects_threshold
+        self.clock = clock
+
+        self.metrics: Dict[str, Dict[str, Any]] = {}
+        self._stop_event = threading.Event()
+
+    def _marker(self, repo: "Repo") -> str:
+        return os.path.join(repo.git_dir, MAINTENANCE_MARKER)
+
+    def last_run(self, repo: "Repo") -> Optional[float]:
+        try:
+            return os.stat(self._marker(repo)).st_mtime
+        except OSError:
+            return None
+
+    def needs_maintenance(self, repo: "Repo", stats: Dict[str, int], now: float) -> bool:
+        last_run = self.last_run(repo)
+        if last_run is None or now - last_run >= self.interval:
+            return True
+        return stats.get("packs", 0) >= self.max_packs or stats.get("count", 0) >= self.loose_objects_threshold
+
+    def maintain(self, repo: "Repo") -> List[str]:
+        """Run the maintenance tasks on a clone, returning the tasks that ran"""
+        tasks = []
+        stats = count_objects(repo)
+
+        if stats.get("count", 0) >= self.loose_objects_threshold:
+            # Packs only the loose objects; existing packs are left alone
+            repo.git.repack("-d", "-q")
+            tasks.append("loose-objects")
+            stats = count_objects(repo)
+
+        if stats.get("packs", 0) > 0:
+            repo.git.multi_pack_index("write")
+            # Drop packs whose objects were all moved into newer packs by an earlier repack
+            repo.git.multi_pack_index("expire")
+            if stats["packs"] >= self.max_packs:
+                repo.git.multi_pack_index("repack", f"--batch-size={repack_batch_size(repo)}")
+                tasks.append("incremental-repack")
+            tasks.append("multi-pack-index")
+
+        if repo.head.is_valid():
+            repo.git.commit_graph("write", "--reachable", "--split", "--changed-paths")
+            tasks.append("commit-graph")
+
+        Path(self._marker(repo)).touch()
+        return tasks
+
+    def run_repository(self, repository_id: str, force: bool = False) -> Optional[Dict[str, Any]]:
+        """Maintain one clone if it is idle and due (or ``force``); returns its metrics"""
+        now = self.clock()
+        try:
+            if not force and now - self.workspace_cache.last_access(repository_id) < self.idle_seconds:
+                return None
+        except OSError:
+            # Evicted in the meantime
+            return None
+
+        # GitPython is imported on first use to keep it out of plugin startup
+        from git import GitCommandError, InvalidGitRepositoryError, NoSuchPathError, Repo
+
+        with try_repository_lock(repository_id) as acquired:
+            if not acquired:
+                return None
+            try:
+                repo = Repo(self.workspace_cache.clone_path(repository_id))
+                before = count_objects(repo)
+                if not force and not self.needs_maintenance(repo, before, now):
+                    return None
+
+                started = time.monotonic()
+                tasks = self.maintain(repo)
+                metrics = {
+                    "repository_id": repository_id,
+                    "tasks": tasks,
+                    "duration": round(time.monotonic() - started, 3),
+                    "before": before,
+                    "after": count_objects(repo),
+                    "finished_at": self.clock(),
+                }
+            except (GitCommandError, InvalidGitRepositoryError, NoSuchPathError) as e:
+                logger.warning("Maintenance of repository %s failed: %s", repository_id, e)
+                return None
+
+        self.metrics[repository_id] = metrics
+        logger.info("Maintained repository %s: %s", repository_id, ", ".join(tasks) or "nothing to do")
+        return metrics
+
+    def run_once(self) -> List[Dict[str, Any]]:
+        """One pass over every clone"""
+        results = []
+        for repository_id in self.workspace_cache.repository_ids():
+            if self._stop_event.is_set():
+                break
+            metrics = self.run_repository(repository_id)
+            if metrics:
+                results.append(metrics)
+        return results
+
+    def stats(self, repository_id: str) -> Dict[str, Any]:
+        """Current object counts and the last maintenance run of a clone"""
+        from git import Repo
+
+        repo = Repo(self.workspace_cache.clone_path(repository_id))
+        return {
+            "repository_id": repository_id,
+            "objects": count_objects(repo),
+            "last_maintenance": self.last_run(repo),
+            "last_run": self.metrics.get(repository_id),
+        }
+
+    def run(self) -> None:
+        """Maintenance loop; runs until stop() is called"""
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Maintenance pass failed")
+            self._stop_event.wait(self.tick_seconds)
+
+    def start_in_thread(self) -> threading.Thread:
+        """Run the maintenance loop in a daemon thread"""
+        thread = threading.Thread(target=self.run, name="git-maintenance", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+
+_runner: Optional[MaintenanceRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_maintenance_runner() -> MaintenanceRunner:
+    """Get the process-wide maintenance runner for the clones under GIT_TEMP_DIR"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = MaintenanceRunner(
+                get_workspace_cache(),
+                interval=float(os.getenv("PLUGIN_MAINTENANCE_HOURS", "6")) * 3600,
+                tick_seconds=float(os.getenv("PLUGIN_MAINTENANCE_TICK_SECONDS", "300")),
+            )
+        return _runner
@@ -0,0 +1,188 @@
+"""Auto-sync scheduler"""
+
+import asyncio
+import heapq
+import logging
+import os
+import random
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from models.repository import RepositoryConfig
+
+logger = logging.getLogger("dify_git_plugin.scheduler")
+
+
+async def run_repository_sync(config: RepositoryConfig) -> None:
+    """Default sync job: bidirectional sync of one repository"""
+    from services.dify_api import DifyAPIClient
+    from services.git_service import GitService
+    from services.sync_service import SyncService
+
+    sync_service = SyncService(GitService(), DifyAPIClient())
+    await sync_service.sync(config, "bidirectional")
+
+
+class SyncScheduler:
+    """Runs periodic syncs for repositories with ``auto_sync`` enabled
+
+    Each repository's next run time is tracked in a heap. First runs are spread
+    over one interval and every run gets a small random jitter so repositories
+    do not sync in lockstep. A global semaphore caps concurrent syncs, a
+    repository that is still syncing when it comes due is skipped, and runs
+    missed while the process was busy or asleep are coalesced into one.
+    """
+
+    def __init__(
+        self,
+        get_repositories: Callable[[], Iterable[RepositoryConfig]],
+        run_sync: Callable[[RepositoryConfig], Awaitable[None]] = run_repository_sync,
+        max_concurrency: int = 4,
+        tick_seconds: float = 30.0,
+        jitter: float = 0.1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.get_repositories = get_repositories
+        self.run_sync = run_sync
+        self.max_concurrency = max_concurrency
+        self.tick_seconds = tick_seconds
+        self.jitter = jitter
+        self.clock = clock
+
+        self._heap: List[Tuple[float, str]] = []
+        self._next_run: Dict[str, float] = {}
+        self._intervals: Dict[str, float] = {}
+        self._configs: Dict[str, RepositoryConfig] = {}
+        self._running: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {"started": 0, "completed": 0, "failed": 0, "skipped": 0, "coalesced": 0}
+
+    def _jittered(self, interval: float) -> float:
+        return interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def _schedule(self, repository_id: str, when: float) -> None:
+        self._next_run[repository_id] = when
+        heapq.heappush(self._heap, (when, repository_id))
+
+    def refresh(self, now: Optional[float] = None) -> None:
+        """Reconcile the schedule with the current repository configuration"""
+        now = self.clock() if now is None else now
+        configs = {config.id: config for config in self.get_repositories() if config.auto_sync}
+
+        for repository_id in list(self._next_run):
+            if repository_id not in configs:
+                # Heap entries of removed repositories are dropped lazily when popped
+                del self._next_run[repository_id]
+                self._intervals.pop(repository_id, None)
+
+        for repository_id, config in configs.items():
+            interval = max(config.sync_interval, 1) * 60.0
+            if repository_id not in self._next_run:
+                # Spread first runs over one interval
+                self._schedule(repository_id, now + random.uniform(0, interval))
+            elif self._intervals.get(repository_id) != interval:
+                self._schedule(repository_id, min(self._next_run[repository_id], now + self._jittered(interval)))
+            self._intervals[repository_id] = interval
+
+        self._configs = configs
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """Pop repositories that are due and reschedule them"""
+        now = self.clock() if now is None else now
+        due = []
+
+        while self._heap and self._heap[0][0] <= now:
+            when, repository_id = heapq.heappop(self._heap)
+            if self._next_run.get(repository_id) != when:
+                # Stale entry from a reschedule or removal
+                continue
+
+            interval = self._intervals[repository_id]
+            if now - when >= interval:
+                # Several runs were missed; run once and restart the cadence from now
+                self.stats["coalesced"] += 1
+                self._schedule(repository_id, now + self._jittered(interval))
+            else:
+                self._schedule(repository_id, when + self._jittered(interval))
+
+            if repository_id in self._running:
+                self.stats["skipped"] += 1
+                continue
+            due.append(repository_id)
+
+        return due
+
+    async def _run_one(self, config: RepositoryConfig) -> None:
+        async with self._semaphore:
+            self.stats["started"] += 1
+            try:
+                await self.run_sync(config)
+                self.stats["completed"] += 1
+            except Exception:
+                self.stats["failed"] += 1
+                logger.exception("Auto-sync failed for repository %s", config.id)
+            finally:
+                self._running.discard(config.id)
+
+    def run_due(self, now: Optional[float] = None) -> List[asyncio.Task]:
+        """Start sync tasks for every due repository"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        self.refresh(now)
+        tasks = []
+        for repository_id in self.due(now):
+            self._running.add(repository_id)
+            task = asyncio.ensure_future(self._run_one(self._configs[repository_id]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            tasks.append(task)
+        return tasks
+
+    async def run(self) -> None:
+        """Scheduler loop; runs until stop() is called"""
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        while not self._stop_event.is_set():
+            try:
+                self.run_due()
+            except Exception:
+                logger.exception("Auto-sync scheduling failed")
+
+            # Sleep until the next run is due, but re-read configuration at least every tick
+            delay = self.tick_seconds
+            if self._heap:
+                delay = min(delay, max(self._heap[0][0] - self.clock(), 0.0))
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+        for task in list(self._tasks):
+            task.cancel()
+
+    def start_in_thread(self) -> threading.Thread:
+        """Run the scheduler on its own event loop in a daemon thread"""
+        thread = threading.Thread(target=asyncio.run, args=(self.run(),), name="sync-scheduler", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        """Stop the scheduler loop"""
+        if self._loop and self._stop_event:
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+
+
+def create_scheduler(get_repositories: Callable[[], Iterable[RepositoryConfig]]) -> SyncScheduler:
+    """Create a scheduler configured from environment variables"""
+    return SyncScheduler(
+        get_repositories,
+        max_concurrency=int(os.getenv("PLUGIN_SYNC_CONCURRENCY", "4")),
+        tick_seconds=float(os.getenv("PLUGIN_SYNC_TICK_SECONDS", "30")),
+    )
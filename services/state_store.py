@@ -0,0 +1,188 @@
+"""Persistent sync state store"""
+
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from models.sync import SyncState
+from utils.storage import connect_sqlite, get_storage_dir
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sync_states (
+    repository_id TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS synced_objects (
+    repository_id TEXT NOT NULL,
+    object_key TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    path TEXT,
+    commit_hash TEXT,
+    synced_at TEXT NOT NULL,
+    PRIMARY KEY (repository_id, object_key)
+);
+CREATE TABLE IF NOT EXISTS export_marks (
+    repository_id TEXT NOT NULL,
+    workspace_id TEXT NOT NULL,
+    high_water REAL,
+    reconciled_at TEXT,
+    PRIMARY KEY (repository_id, workspace_id)
+);
+"""
+
+
+class SyncStateStore:
+    """SQLite-backed sync state shared by every request, job and process
+
+    Besides each repository's SyncState it remembers, per exported object
+    (keyed like ``workflow:<id>``), the content hash and commit it was last
+    synced at, so unchanged objects can be skipped by later syncs, and per
+    workspace the newest ``updated_at`` exported so far (the export mark).
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = Path(db_path) if db_path else get_storage_dir() / "sync_state.db"
+        self._connection = connect_sqlite(self.db_path)
+        self._connection.executescript(SCHEMA)
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[Any]:
+        """Serialize writers across threads and processes"""
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._connection
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+
+    def get(self, repository_id: str) -> Optional[SyncState]:
+        """Get sync state for repository"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT state FROM sync_states WHERE repository_id = ?", (repository_id,)
+            ).fetchone()
+        return SyncState.parse_raw(row["state"]) if row else None
+
+    def save(self, state: SyncState) -> None:
+        """Replace sync state for repository"""
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO sync_states (repository_id, state) VALUES (?, ?)",
+                (state.repository_id, state.json()),
+            )
+
+    def update(self, repository_id: str, **changes: Any) -> SyncState:
+        """Atomically apply changes to a repository's sync state"""
+        with self._transaction() as connection:
+            row = connection.execute("SELECT state FROM sync_states WHERE repository_id = ?", (repository_id,)).fetchone()
+            state = SyncState.parse_raw(row["state"]) if row else SyncState(repository_id=repository_id)
+            state = state.copy(update=changes)
+            connection.execute(
+                "INSERT OR REPLACE INTO sync_states (repository_id, state) VALUES (?, ?)", (repository_id, state.json())
+            )
+        return state
+
+    def get_object_hashes(self, repository_id: str) -> Dict[str, Tuple[str, Optional[str]]]:
+        """Get object key -> (content hash, path) for everything synced in a repository"""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT object_key, content_hash, path FROM synced_objects WHERE repository_id = ?", (repository_id,)
+            ).fetchall()
+        return {row["object_key"]: (row["content_hash"], row["path"]) for row in rows}
+
+    def get_object_hash(self, repository_id: str, object_key: str) -> Optional[Tuple[str, Optional[str]]]:
+        """Get (content hash, path) an object was last synced with"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT content_hash, path FROM synced_objects WHERE repository_id = ? AND object_key = ?",
+                (repository_id, object_key),
+            ).fetchone()
+        return (row["content_hash"], row["path"]) if row else None
+
+    def record_object(
+        self,
+        repository_id: str,
+        object_key: str,
+        content_hash: str,
+        path: Optional[str] = None,
+        commit_hash: Optional[str] = None,
+    ) -> None:
+        """Remember the content hash (and commit, once it is in one) an object was last synced with"""
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO synced_objects "
+                "(repository_id, object_key, content_hash, path, commit_hash, synced_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (repository_id, object_key, content_hash, path, commit_hash, datetime.utcnow().isoformat()),
+            )
+
+    def record_commit(self, repository_id: str, object_keys: List[str], commit_hash: str) -> None:
+        """Set the commit of objects recorded before they were committed"""
+        with self._transaction() as connection:
+            connection.executemany(
+                "UPDATE synced_objects SET commit_hash = ? WHERE repository_id = ? AND object_key = ?",
+                [(commit_hash, repository_id, object_key) for object_key in object_keys],
+            )
+
+    def get_object_commit(self, repository_id: str, object_key: str) -> Optional[str]:
+        """Get the commit an object was last synced at, if it was committed"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT commit_hash FROM synced_objects WHERE repository_id = ? AND object_key = ?",
+                (repository_id, object_key),
+            ).fetchone()
+        return row["commit_hash"] if row else None
+
+    def forget_objects(self, repository_id: str, object_key: Optional[str] = None) -> None:
+        """Drop recorded object hashes (all of a repository's when no key is given)"""
+        with self._transaction() as connection:
+            if object_key:
+                connection.execute(
+                    "DELETE FROM synced_objects WHERE repository_id = ? AND object_key = ?", (repository_id, object_key)
+                )
+            else:
+                connection.execute("DELETE FROM synced_objects WHERE repository_id = ?", (repository_id,))
+
+    def get_export_mark(self, repository_id: str, workspace_id: str) -> Tuple[Optional[float], Optional[datetime]]:
+        """Get (newest exported updated_at, time of the last full export) for a workspace"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT high_water, reconciled_at FROM export_marks WHERE repository_id = ? AND workspace_id = ?",
+                (repository_id, workspace_id),
+            ).fetchone()
+        if row is None:
+            return None, None
+        reconciled_at = datetime.fromisoformat(row["reconciled_at"]) if row["reconciled_at"] else None
+        return row["high_water"], reconciled_at
+
+    def save_export_mark(
+        self, repository_id: str, workspace_id: str, high_water: Optional[float], reconciled_at: Optional[datetime] = None
+    ) -> None:
+        """Advance a workspace's export mark, keeping the last full export time unless a new one is given"""
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT INTO export_marks (repository_id, workspace_id, high_water, reconciled_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (repository_id, workspace_id) DO UPDATE SET high_water = excluded.high_water, "
+                "reconciled_at = COALESCE(excluded.reconciled_at, export_marks.reconciled_at)",
+                (repository_id, workspace_id, high_water, reconciled_at.isoformat() if reconciled_at else None),
+            )
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+_state_store: Optional[SyncStateStore] = None
+_state_store_lock = threading.Lock()
+
+
+def get_state_store() -> SyncStateStore:
+    """Get the process-wide sync state store"""
+    global _state_store
+    with _state_store_lock:
+        if _state_store is None:
+            _state_store = SyncStateStore()
+        return _state_store
@@ -1,28 +1,153 @@
 """Synchronization service"""
 
 import asyncio
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
 
+from models.job import Job, JobStatus
 from models.repository import RepositoryConfig
 from models.sync import SyncState, SyncStatus
 from models.workflow import ApplicationExport, WorkflowExport
+from services.auth_service import AuthService
 from services.dify_api import DifyAPIClient
-from services.git_service import GitService
+from services.git_service import GitService, UnreadableExport, commit_failed
+from services.state_store import SyncStateStore, get_state_store
+from utils.metrics import SYNC_OBJECTS, SYNCS_IN_FLIGHT
+from utils.serialization import VOLATILE_EXPORT_FIELDS, content_hash
+from utils.single_flight import SingleFlight
+from utils.tracing import span, traced
+
+# Progress callback: (items done, total items if known, message)
+ProgressCallback = Callable[[int, Optional[int], str], None]
+
+# Number of error messages kept in a streamed summary
+SUMMARY_MAX_ERRORS = 20
+
+# Incremental exports fall back to a full export this often
+FULL_EXPORT_INTERVAL = timedelta(hours=float(os.getenv("PLUGIN_FULL_EXPORT_HOURS", "24")))
+
+# Identical syncs share one run; a result is reused for requests arriving shortly after it
+_sync_flight = SingleFlight(reuse_window=float(os.getenv("PLUGIN_SYNC_REUSE_SECONDS", "2")))
+
+
+def _updated_at(item: Dict[str, Any]) -> Optional[float]:
+    """Get an object's ``updated_at`` as a Unix timestamp, if it has one"""
+    value = item.get("updated_at")
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        # Millisecond timestamps
+        return value / 1000 if value > 1e11 else float(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _collect_item(results: Dict[str, Any], event: Dict[str, Any]) -> None:
+    """Add an item event to a bulk operation's result dict"""
+    result = {key: value for key, value in event.items() if key not in ("event", "kind", "id")}
+    label = "Workflow" if event["kind"] == "workflow" else "Application"
+    results["workflows" if event["kind"] == "workflow" else "applications"].append(result)
+    if not result.get("success"):
+        results["errors"].append(f"{label} {event['id']}: {result.get('error', 'Unknown error')}")
+
+
+def _count_object(operation: str, event: Dict[str, Any]) -> Dict[str, Any]:
+    """Record an item event in the sync object metrics and return it"""
+    if not event.get("success"):
+        result = "failed"
+    elif event.get("skipped"):
+        result = "skipped"
+    else:
+        result = event.get("action") or ("exported" if operation == "export" else "imported")
+    SYNC_OBJECTS.inc(operation=operation, kind=event["kind"], result=result)
+    return event
+
+
+async def _with_stats(events: AsyncIterator[Dict[str, Any]], stats_interval: float) -> AsyncIterator[Dict[str, Any]]:
+    """Pass item events through, adding periodic throughput stats and a compact summary"""
+    started = last_stats = time.monotonic()
+    summary = {"event": "summary", "operation": None, "processed": 0, "succeeded": 0, "failed": 0, "skipped": 0, "errors": []}
+    total = None
+
+    async for event in events:
+        if event["event"] == "start":
+            summary["operation"] = event["operation"]
+            total = event["total"]
+        elif event["event"] == "item":
+            summary["processed"] += 1
+            if not event.get("success"):
+                summary["failed"] += 1
+                if len(summary["errors"]) < SUMMARY_MAX_ERRORS:
+                    summary["errors"].append(f"{event['kind']} {event['id']}: {event.get('error', 'Unknown error')}")
+            elif event.get("skipped") or event.get("action") == "unchanged":
+                summary["skipped"] += 1
+            else:
+                summary["succeeded"] += 1
+        elif event["event"] == "commit":
+            summary["commit_hash"] = event["commit_hash"]
+            if not event["success"]:
+                summary["commit_error"] = event["error"]
+        yield event
+
+        now = time.monotonic()
+        if now - last_stats >= stats_interval:
+            last_stats = now
+            elapsed = now - started
+            yield {
+                "event": "stats",
+                "operation": summary["operation"],
+                "processed": summary["processed"],
+                "total": total,
+                "elapsed": round(elapsed, 3),
+                "items_per_second": round(summary["processed"] / elapsed, 2) if elapsed else None,
+            }
+
+    summary["elapsed"] = round(time.monotonic() - started, 3)
+    summary["success"] = summary["failed"] == 0 and "commit_error" not in summary
+    yield summary
 
 
 class SyncService:
     """Service for synchronizing Dify workflows/applications with Git"""
 
-    def __init__(self, git_service: GitService, dify_client: DifyAPIClient):
+    def __init__(self, git_service: GitService, dify_client: DifyAPIClient, state_store: Optional[SyncStateStore] = None):
         self.git_service = git_service
         self.dify_client = dify_client
-        self.sync_states: Dict[str, SyncState] = {}
+        # Shared by every request so state and per-object hashes survive between syncs
+        self.state_store = state_store or get_state_store()
 
+    def _is_unchanged(self, config: RepositoryConfig, object_key: str, digest: str, path: Optional[str] = None) -> bool:
+        """Check whether an object was last synced with the same content (and path)"""
+        recorded = self.state_store.get_object_hash(config.id, object_key)
+        if recorded is None or recorded[0] != digest:
+            return False
+        return path is None or recorded[1] == path
+
+    @traced("sync.export_workflow")
     async def export_workflow(
-        self, config: RepositoryConfig, workflow_id: str, file_naming: str = "id-name"
+        self,
+        config: RepositoryConfig,
+        workflow_id: str,
+        file_naming: str = "id-name",
+        layout: str = "file",
+        commit: bool = True,
     ) -> Dict[str, Any]:
-        """Export a workflow to Git"""
+        """Export a workflow to Git
+
+        Bare repositories have no working tree, so the export is committed right
+        away unless ``commit`` is False (bulk exports commit once at the end).
+        """
         try:
             # Get workflow from Dify
             workflow_data = await self.dify_client.get_workflow(workflow_id)
@@ -38,8 +163,24 @@ class SyncService:
             # Get repository
             repo = self.git_service.get_repo(config)
 
+            # Skip objects whose content and location are unchanged since the last sync
+            object_key = f"workflow:{workflow_export.id}"
+            digest = content_hash(workflow_export.dict(exclude=VOLATILE_EXPORT_FIELDS))
+            file_path = self.git_service.workflow_path(repo, workflow_export, file_naming, layout)
+            if self._is_unchanged(config, object_key, digest, file_path) and self.git_service.path_exists(repo, file_path):
+                return {"success": True, "skipped": True, "workflow_id": workflow_id, "file_path": file_path}
+
             # Export to Git
-            file_path = self.git_service.export_workflow(repo, workflow_export, file_naming)
+            file_path = self.git_service.export_workflow(repo, workflow_export, file_naming, layout)
+            if commit:
+                self.git_service.save_export_manifest(repo)
+            commit_hash = None
+            if repo.bare and commit:
+                commit_result = self.git_service.commit(repo, f"Export workflow {workflow_export.name}")
+                if commit_failed(commit_result):
+                    return {"success": False, "workflow_id": workflow_id, "error": commit_result.get("error")}
+                commit_hash = commit_result.get("commit_hash") or self.git_service.resolve_commit(repo)
+            self.state_store.record_object(config.id, object_key, digest, file_path, commit_hash)
 
             return {
                 "success": True,
@@ -50,8 +191,11 @@ class SyncService:
         except Exception as e:
             return {"success": False, "error": str(e)}
 
-    async def export_application(self, config: RepositoryConfig, app_id: str, file_naming: str = "id-name") -> Dict[str, Any]:
-        """Export an application to Git"""
+    @traced("sync.export_application")
+    async def export_application(
+        self, config: RepositoryConfig, app_id: str, file_naming: str = "id-name", commit: bool = True
+    ) -> Dict[str, Any]:
+        """Export an application to Git (committed right away in bare repositories unless ``commit`` is False)"""
         try:
             # Get application from Dify
             app_data = await self.dify_client.get_application(app_id)
@@ -67,8 +211,24 @@ class SyncService:
             # Get repository
             repo = self.git_service.get_repo(config)
 
+            # Skip objects whose content and location are unchanged since the last sync
+            object_key = f"application:{app_export.id}"
+            digest = content_hash(app_export.dict(exclude=VOLATILE_EXPORT_FIELDS))
+            file_path = self.git_service.application_path(repo, app_export, file_naming)
+            if self._is_unchanged(config, object_key, digest, file_path) and self.git_service.path_exists(repo, file_path):
+                return {"success": True, "skipped": True, "app_id": app_id, "file_path": file_path}
+
             # Export to Git
             file_path = self.git_service.export_application(repo, app_export, file_naming)
+            if commit:
+                self.git_service.save_export_manifest(repo)
+            commit_hash = None
+            if repo.bare and commit:
+                commit_result = self.git_service.commit(repo, f"Export application {app_export.name}")
+                if commit_failed(commit_result):
+                    return {"success": False, "app_id": app_id, "error": commit_result.get("error")}
+                commit_hash = commit_result.get("commit_hash") or self.git_service.resolve_commit(repo)
+            self.state_store.record_object(config.id, object_key, digest, file_path, commit_hash)
 
             return {
                 "success": True,
@@ -79,36 +239,183 @@ class SyncService:
         except Exception as e:
             return {"success": False, "error": str(e)}
 
-    async def export_all(self, config: RepositoryConfig, file_naming: str = "id-name") -> Dict[str, Any]:
-        """Export all workflows and applications"""
+    @traced("sync.export_all")
+    async def export_all(
+        self,
+        config: RepositoryConfig,
+        file_naming: str = "id-name",
+        layout: str = "file",
+        progress: Optional[ProgressCallback] = None,
+        incremental: bool = False,
+    ) -> Dict[str, Any]:
+        """Export all workflows and applications (only those changed since the last export if ``incremental``)"""
         results = {"workflows": [], "applications": [], "errors": []}
 
         try:
-            # Export all workflows
-            workflows = await self.dify_client.get_all_workflows()
-            for workflow in workflows:
-                workflow_id = workflow.get("id")
-                if workflow_id:
-                    result = await self.export_workflow(config, workflow_id, file_naming)
-                    results["workflows"].append(result)
-                    if not result.get("success"):
-                        results["errors"].append(f"Workflow {workflow_id}: {result.get('error')}")
-
-            # Export all applications
-            applications = await self.dify_client.get_all_applications()
-            for app in applications:
-                app_id = app.get("id")
-                if app_id:
-                    result = await self.export_application(config, app_id, file_naming)
-                    results["applications"].append(result)
-                    if not result.get("success"):
-                        results["errors"].append(f"Application {app_id}: {result.get('error')}")
+            async for event in self.iter_export_all(config, file_naming, layout, incremental):
+                if event["event"] == "start":
+                    total = event["total"]
+                    results["mode"] = event["mode"]
+                elif event["event"] == "item":
+                    _collect_item(results, event)
+                    if progress:
+                        done = len(results["workflows"]) + len(results["applications"])
+                        progress(done, total, f"Exported {event['kind']} {event['id']}")
+                elif event["event"] == "commit":
+                    results["commit_hash"] = event["commit_hash"]
+                    if not event["success"]:
+                        results["errors"].append(f"Commit failed: {event['error']}")
+
+            results["success"] = len(results["errors"]) == 0
+            return results
+        except Exception as e:
+            return {"success": False, "error": str(e), "results": results}
+
+    async def iter_export_all(
+        self,
+        config: RepositoryConfig,
+        file_naming: str = "id-name",
+        layout: str = "file",
+        incremental: bool = False,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Export all workflows and applications, yielding an event per item
+
+        With ``incremental`` only objects updated since the workspace's export
+        mark are fetched and exported. Every ``PLUGIN_FULL_EXPORT_HOURS`` (and
+        when there is no mark yet) a full export runs instead.
+
+        Files of objects deleted in Dify are left alone; ``prune_exports``
+        removes them.
+        """
+        workflows = await self.dify_client.get_all_workflows()
+        applications = await self.dify_client.get_all_applications()
+        listed = [("workflow", item) for item in workflows] + [("application", item) for item in applications]
+
+        pending, full, newest = self._pending_exports(config, listed, incremental)
+
+        mode = "full" if full else "incremental"
+        yield {"event": "start", "operation": "export", "total": len(pending), "mode": mode}
+
+        failed, exported = False, []
+        for kind, object_id in pending:
+            if kind == "workflow":
+                result = await self.export_workflow(config, object_id, file_naming, layout, commit=False)
+            else:
+                result = await self.export_application(config, object_id, file_naming, commit=False)
+            failed = failed or not result.get("success")
+            if result.get("success") and not result.get("skipped"):
+                exported.append((kind, object_id))
+            yield _count_object("export", {"event": "item", "kind": kind, "id": object_id, **result})
+
+        repo = self.git_service.get_repo(config)
+        self.git_service.save_export_manifest(repo)
+
+        # Bare repositories get all exports in a single commit
+        if config.bare:
+            commit_result = self.git_service.commit(repo, "Export workflows and applications")
+            if commit_failed(commit_result):
+                # Nothing was committed: forget the hashes so the objects are exported again
+                failed = True
+                for kind, object_id in exported:
+                    self.state_store.forget_objects(config.id, f"{kind}:{object_id}")
+            else:
+                commit_hash = commit_result.get("commit_hash") or self.git_service.resolve_commit(repo)
+                self.state_store.record_commit(config.id, [f"{kind}:{object_id}" for kind, object_id in exported], commit_hash)
+            yield {
+                "event": "commit",
+                "commit_hash": commit_result.get("commit_hash"),
+                "success": not commit_failed(commit_result),
+                "error": commit_result.get("error") if commit_failed(commit_result) else None,
+            }
+
+        # Keep the old mark after failures so the failed objects are retried
+        if incremental and not failed:
+            self.state_store.save_export_mark(config.id, config.workspace_id, newest, datetime.utcnow() if full else None)
+
+    @traced("sync.prune_exports")
+    async def prune_exports(self, config: RepositoryConfig, dry_run: bool = False) -> Dict[str, Any]:
+        """Remove the files of exported objects that were deleted in Dify
+
+        Orphans are found by comparing the ids Dify lists with the export
+        manifest. Only objects this plugin has synced are removed: files added
+        in Git and not imported yet have no sync record and are kept. With
+        ``dry_run`` they are listed as ``would_delete`` and nothing is changed.
+        Bare repositories get the removals in one commit; checkouts have them
+        staged for the next commit.
+        """
+        results = {"workflows": [], "applications": [], "errors": [], "dry_run": dry_run}
+
+        try:
+            listed = await self._listed_keys()
+            synced = self.state_store.get_object_hashes(config.id)
+            repo = self.git_service.get_repo(config)
+            unsynced = {key for key, _ in self.git_service.export_manifest(repo).items() if key not in synced}
+            orphans = self.git_service.prune_exports(repo, listed | unsynced, dry_run)
+
+            for object_key, file_path in sorted(orphans.items()):
+                kind, _, object_id = object_key.partition(":")
+                event = {"event": "item", "kind": kind, "id": object_id, "success": True, "file_path": file_path}
+                if dry_run:
+                    _collect_item(results, {**event, "action": "would_delete"})
+                else:
+                    _collect_item(results, _count_object("export", {**event, "action": "deleted"}))
+
+            if not dry_run:
+                for object_key in synced.keys() - listed:
+                    self._forget_deleted(config, object_key)
+                if orphans:
+                    error = self._save_prune(config, repo)
+                    if error:
+                        results["errors"].append(f"Commit failed: {error}")
 
             results["success"] = len(results["errors"]) == 0
             return results
         except Exception as e:
             return {"success": False, "error": str(e), "results": results}
 
+    def _forget_deleted(self, config: RepositoryConfig, object_key: str) -> None:
+        """Drop the sync record of an object Dify no longer lists, whether or not it had a file"""
+        if object_key.partition(":")[0] in ("workflow", "application"):
+            self.state_store.forget_objects(config.id, object_key)
+
+    def _save_prune(self, config: RepositoryConfig, repo) -> Optional[str]:
+        """Commit pruned exports of a bare repository (a checkout keeps them staged); returns the commit error"""
+        if not config.bare:
+            self.git_service.save_export_manifest(repo)
+            return None
+        commit_result = self.git_service.commit(repo, "Remove exports of objects deleted in Dify")
+        return commit_result.get("error") if commit_failed(commit_result) else None
+
+    async def _listed_keys(self) -> Set[str]:
+        """Object keys of every workflow and application Dify lists"""
+        workflows = await self.dify_client.get_all_workflows()
+        applications = await self.dify_client.get_all_applications()
+        return {f"workflow:{item.get('id')}" for item in workflows} | {
+            f"application:{item.get('id')}" for item in applications
+        }
+
+    def _pending_exports(
+        self, config: RepositoryConfig, listed: List[Tuple[str, Dict[str, Any]]], incremental: bool
+    ) -> Tuple[List[Tuple[str, str]], bool, Optional[float]]:
+        """Objects to export, whether this is a full export, and the new export mark"""
+        full, high_water = True, None
+        if incremental:
+            high_water, reconciled_at = self.state_store.get_export_mark(config.id, config.workspace_id)
+            full = high_water is None or reconciled_at is None or datetime.utcnow() - reconciled_at >= FULL_EXPORT_INTERVAL
+
+        pending, newest = [], high_water
+        for kind, item in listed:
+            object_id = item.get("id")
+            if not object_id:
+                continue
+            updated_at = _updated_at(item)
+            if updated_at is not None:
+                newest = updated_at if newest is None else max(newest, updated_at)
+            # Objects updated in the same second as the mark are exported again; unchanged content is skipped
+            if full or updated_at is None or updated_at >= high_water:
+                pending.append((kind, object_id))
+        return pending, full, newest
+
     async def import_workflow(self, config: RepositoryConfig, file_path: str, auto_merge: bool = True) -> Dict[str, Any]:
         """Import a workflow from Git"""
         try:
@@ -118,8 +425,33 @@ class SyncService:
             # Import from Git
             workflow_data = self.git_service.import_workflow(repo, file_path)
 
-            # Check if workflow exists in Dify
+            return await self._apply_workflow(
+                config, workflow_data, file_path, auto_merge, force=True, commit_hash=self.git_service.resolve_commit(repo)
+            )
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    @traced("sync.import_workflow")
+    async def _apply_workflow(
+        self,
+        config: RepositoryConfig,
+        workflow_data: Dict[str, Any],
+        file_path: str,
+        auto_merge: bool,
+        force: bool = False,
+        commit_hash: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Create or update a Dify workflow from exported data read at ``commit_hash``"""
+        try:
             workflow_id = workflow_data.get("id")
+
+            # Content already synced (exported from or imported into Dify) needs no API calls
+            object_key = f"workflow:{workflow_id}"
+            digest = content_hash(workflow_data)
+            if not force and workflow_id and self._is_unchanged(config, object_key, digest):
+                return {"success": True, "action": "unchanged", "workflow_id": workflow_id, "file_path": file_path}
+
+            # Check if workflow exists in Dify
             existing_workflow = None
 
             if workflow_id:
@@ -149,6 +481,9 @@ class SyncService:
                 result = await self.dify_client.create_workflow(workflow_payload)
                 action = "created"
 
+            if workflow_id:
+                self.state_store.record_object(config.id, object_key, digest, file_path, commit_hash)
+
             return {"success": True, "action": action, "workflow_id": result.get("id", workflow_id), "file_path": file_path}
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -162,8 +497,33 @@ class SyncService:
             # Import from Git
             app_data = self.git_service.import_application(repo, file_path)
 
-            # Check if application exists in Dify
+            return await self._apply_application(
+                config, app_data, file_path, auto_merge, force=True, commit_hash=self.git_service.resolve_commit(repo)
+            )
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    @traced("sync.import_application")
+    async def _apply_application(
+        self,
+        config: RepositoryConfig,
+        app_data: Dict[str, Any],
+        file_path: str,
+        auto_merge: bool,
+        force: bool = False,
+        commit_hash: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Create or update a Dify application from exported data read at ``commit_hash``"""
+        try:
             app_id = app_data.get("id")
+
+            # Content already synced (exported from or imported into Dify) needs no API calls
+            object_key = f"application:{app_id}"
+            digest = content_hash(app_data)
+            if not force and app_id and self._is_unchanged(config, object_key, digest):
+                return {"success": True, "action": "unchanged", "app_id": app_id, "file_path": file_path}
+
+            # Check if application exists in Dify
             existing_app = None
 
             if app_id:
@@ -193,44 +553,336 @@ class SyncService:
                 result = await self.dify_client.create_application(app_payload)
                 action = "created"
 
+            if app_id:
+                self.state_store.record_object(config.id, object_key, digest, file_path, commit_hash)
+
             return {"success": True, "action": action, "app_id": result.get("id", app_id), "file_path": file_path}
         except Exception as e:
             return {"success": False, "error": str(e)}
 
-    async def import_all(self, config: RepositoryConfig, auto_merge: bool = True) -> Dict[str, Any]:
-        """Import all workflows and applications from Git"""
+    @traced("sync.import_all")
+    async def import_all(
+        self,
+        config: RepositoryConfig,
+        auto_merge: bool = True,
+        rev: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None,
+        force: bool = False,
+    ) -> Dict[str, Any]:
+        """Import all workflows and applications from Git
+
+        Objects are read lazily one at a time; pass ``rev`` to import the tree of
+        a specific commit instead of the working tree. Objects whose content
+        matches what was last synced are skipped unless ``force`` is set.
+        """
         results = {"workflows": [], "applications": [], "errors": []}
 
         try:
-            # Get repository
-            repo = self.git_service.get_repo(config)
+            async for event in self.iter_import_all(config, auto_merge, rev, force):
+                if event["event"] == "item":
+                    _collect_item(results, event)
+                    if progress:
+                        # Objects are streamed, so the total is not known up front
+                        progress(len(results["workflows"]) + len(results["applications"]), None, f"Imported {event['id']}")
 
-            # List all exported files
-            files = self.git_service.list_exported_files(repo)
+            results["success"] = len(results["errors"]) == 0
+            return results
+        except Exception as e:
+            return {"success": False, "error": str(e), "results": results}
 
-            # Import workflows
-            for file_path in files.get("workflows", []):
-                result = await self.import_workflow(config, file_path, auto_merge)
-                results["workflows"].append(result)
-                if not result.get("success"):
-                    results["errors"].append(f"Workflow {file_path}: {result.get('error', 'Unknown error')}")
+    async def iter_import_all(
+        self, config: RepositoryConfig, auto_merge: bool = True, rev: Optional[str] = None, force: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Import all workflows and applications from Git, yielding an event per item"""
+        # Get repository
+        repo = self.git_service.get_repo(config)
+        # Working tree imports are attributed to HEAD
+        commit_hash = self.git_service.resolve_commit(repo, rev)
+        yield {"event": "start", "operation": "import", "total": None}
+
+        for kind, file_path, data in self.git_service.iter_exported_objects(repo, rev):
+            if isinstance(data, UnreadableExport):
+                # Unreadable files are reported and the remaining objects still imported
+                result = {"success": False, "file_path": file_path, "error": data.error}
+            elif kind == "workflow":
+                result = await self._apply_workflow(config, data, file_path, auto_merge, force, commit_hash)
+            else:
+                result = await self._apply_application(config, data, file_path, auto_merge, force, commit_hash)
+            yield _count_object("import", {"event": "item", "kind": kind, "id": file_path, **result})
+
+    @traced("sync.import_paths")
+    async def import_paths(
+        self,
+        config: RepositoryConfig,
+        paths: List[str],
+        auto_merge: bool = True,
+        progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, Any]:
+        """Import only the given workflow and application paths
 
-            # Import applications
-            for file_path in files.get("applications", []):
-                result = await self.import_application(config, file_path, auto_merge)
-                results["applications"].append(result)
-                if not result.get("success"):
-                    results["errors"].append(f"Application {file_path}: {result.get('error', 'Unknown error')}")
+        Paths that no longer exist in the repository are reported as missing;
+        objects whose content was already synced are left unchanged.
+        """
+        results = {"workflows": [], "applications": [], "missing": [], "errors": []}
+
+        try:
+            repo = self.git_service.get_repo(config)
+            commit_hash = self.git_service.resolve_commit(repo)
+            for index, file_path in enumerate(paths):
+                if not self.git_service.path_exists(repo, file_path):
+                    results["missing"].append(file_path)
+                    continue
+
+                kind = "workflow" if file_path.startswith("workflows/") else "application"
+                try:
+                    if kind == "workflow":
+                        data = self.git_service.import_workflow(repo, file_path)
+                        result = await self._apply_workflow(config, data, file_path, auto_merge, commit_hash=commit_hash)
+                    else:
+                        data = self.git_service.import_application(repo, file_path)
+                        result = await self._apply_application(config, data, file_path, auto_merge, commit_hash=commit_hash)
+                except Exception as e:
+                    result = {"success": False, "error": str(e)}
+                _collect_item(results, _count_object("import", {"event": "item", "kind": kind, "id": file_path, **result}))
+                if progress:
+                    progress(index + 1, len(paths), f"Imported {file_path}")
 
             results["success"] = len(results["errors"]) == 0
             return results
         except Exception as e:
             return {"success": False, "error": str(e), "results": results}
 
+    async def stream_sync(
+        self,
+        config: RepositoryConfig,
+        direction: str = "bidirectional",
+        file_naming: str = "id-name",
+        auto_merge: bool = True,
+        stats_interval: float = 5.0,
+        incremental: bool = False,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream progress events of a sync
+
+        Every item produces an ``item`` event, a ``stats`` event with throughput is
+        emitted at most every ``stats_interval`` seconds, and each stage ends with
+        a compact ``summary`` (counts and the first errors, not every item).
+        ``incremental`` is passed on to the export stage. Nothing is exported
+        or imported when the pull fails.
+
+        A streamed sync cannot be joined, so one started while an identical
+        sync runs fails; ``sync()`` calls made meanwhile get its summaries.
+        """
+        # Shares the key of sync(): regular syncs arriving meanwhile wait for this one
+        key = (config.id, direction, incremental)
+        flight = _sync_flight.claim(key)
+        if flight is None:
+            raise Exception(f"A {direction} sync of repository {config.id} is already running")
+
+        started = datetime.utcnow()
+        self.state_store.update(config.id, status=SyncStatus.IN_PROGRESS, last_sync=started, sync_direction=direction)
+        results = {}
+
+        with SYNCS_IN_FLIGHT.track_inprogress():
+            try:
+                stages = self._stream_stages(config, direction, file_naming, auto_merge, incremental, results, stats_interval)
+                async for event in stages:
+                    yield event
+                self._record_sync_result(config, results, started)
+            except BaseException as e:
+                # Client disconnects close the generator (GeneratorExit) or cancel its task
+                cancelled = isinstance(e, (GeneratorExit, asyncio.CancelledError))
+                message = "Sync cancelled" if cancelled else str(e)
+                self.state_store.update(config.id, status=SyncStatus.FAILED, error_message=message)
+                # Calls that joined run the sync again rather than failing with this one
+                _sync_flight.finish(key, flight, error=asyncio.CancelledError() if cancelled else e)
+                raise
+            _sync_flight.finish(key, flight, results)
+
+    async def _stream_stages(
+        self,
+        config: RepositoryConfig,
+        direction: str,
+        file_naming: str,
+        auto_merge: bool,
+        incremental: bool,
+        results: Dict[str, Any],
+        stats_interval: float = 5.0,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Events of a streamed sync's stages, collecting each stage's summary in ``results``"""
+        stages = []
+        if direction in ["export", "bidirectional"]:
+            # Pull latest from Git first
+            repo = self.git_service.get_repo(config)
+            pull_result = self.git_service.pull(repo, config.branch, AuthService().git_auth(config))
+            yield {"event": "pull", **pull_result}
+            if not pull_result["success"]:
+                # Exporting or importing a stale clone could overwrite newer changes
+                results["pull"] = pull_result
+                return
+            stages.append(self.iter_export_all(config, file_naming, incremental=incremental))
+
+        if direction in ["import", "bidirectional"]:
+            stages.append(self.iter_import_all(config, auto_merge))
+
+        for stage in stages:
+            async for event in _with_stats(stage, stats_interval):
+                if event["event"] == "summary":
+                    results[event["operation"]] = {"success": event["success"], "errors": event["errors"]}
+                yield event
+
+    async def sync(
+        self,
+        config: RepositoryConfig,
+        direction: str = "bidirectional",
+        progress: Optional[ProgressCallback] = None,
+        incremental: bool = False,
+    ) -> Dict[str, Any]:
+        """Run a full sync: pull, then export and/or import
+
+        With ``incremental`` the export stage only exports objects updated
+        since the last export (see ``iter_export_all``).
+
+        Concurrent syncs of the same repository, direction and mode are
+        coalesced: a call made while one is running waits for it and returns
+        its results.
+        """
+
+        async def run():
+            with SYNCS_IN_FLIGHT.track_inprogress(), span("sync", {"repository.id": config.id, "sync.direction": direction}):
+                return await self._sync(config, direction, progress, incremental)
+
+        # Only the call that actually runs the sync reports progress
+        return await _sync_flight.do((config.id, direction, incremental), run)
+
+    async def _sync(
+        self,
+        config: RepositoryConfig,
+        direction: str,
+        progress: Optional[ProgressCallback] = None,
+        incremental: bool = False,
+    ) -> Dict[str, Any]:
+        results = {}
+        started = datetime.utcnow()
+        self.state_store.update(config.id, status=SyncStatus.IN_PROGRESS, last_sync=started, sync_direction=direction)
+
+        try:
+            if direction in ["export", "bidirectional"]:
+                # Pull latest from Git first
+                with span("sync.pull"):
+                    repo = self.git_service.get_repo(config)
+                    pull_result = self.git_service.pull(repo, config.branch, AuthService().git_auth(config))
+                if not pull_result["success"]:
+                    # Exporting or importing a stale clone could overwrite newer changes
+                    results["pull"] = pull_result
+                    self._record_sync_result(config, results, started)
+                    return results
+
+                # Export all
+                results["export"] = await self.export_all(config, progress=progress, incremental=incremental)
+
+            if direction in ["import", "bidirectional"]:
+                # Import all
+                results["import"] = await self.import_all(config, auto_merge=True, progress=progress)
+        except Exception as e:
+            self.state_store.update(config.id, status=SyncStatus.FAILED, error_message=str(e))
+            raise
+
+        self._record_sync_result(config, results, started)
+        return results
+
+    def _record_sync_result(self, config: RepositoryConfig, results: Dict[str, Any], started: datetime) -> None:
+        """Store the outcome of a sync in the shared state store"""
+        errors, conflicts = [], []
+        for result in results.values():
+            if result.get("error"):
+                errors.append(result["error"])
+            errors.extend(result.get("errors", []))
+            for item in result.get("workflows", []) + result.get("applications", []):
+                if item.get("conflict"):
+                    conflicts.append(item)
+
+        try:
+            repo = self.git_service.get_repo(config)
+            last_commit = repo.head.commit.hexsha if repo.head.is_valid() else None
+        except Exception:
+            last_commit = None
+
+        if conflicts:
+            status = SyncStatus.CONFLICT
+        elif errors:
+            status = SyncStatus.FAILED
+        else:
+            status = SyncStatus.COMPLETED
+
+        changes = {
+            "status": status,
+            "conflicts": conflicts,
+            "errors": errors,
+            "error_message": errors[0] if errors else None,
+            "last_commit": last_commit,
+        }
+        if status == SyncStatus.COMPLETED:
+            changes["last_success"] = started
+        self.state_store.update(config.id, **changes)
+
+    @staticmethod
+    def sync_state_from_job(job: Job, stored: Optional[SyncState] = None) -> SyncState:
+        """Derive a repository's sync state from a sync job
+
+        The outcome of earlier syncs (last success, commit, conflicts) is kept
+        from the ``stored`` state when there is one.
+        """
+        if job.status == JobStatus.COMPLETED and job.result and job.result.get("success") is False:
+            status = SyncStatus.FAILED
+        else:
+            status = {
+                JobStatus.PENDING: SyncStatus.PENDING,
+                JobStatus.RUNNING: SyncStatus.IN_PROGRESS,
+                JobStatus.COMPLETED: SyncStatus.COMPLETED,
+            }.get(job.status, SyncStatus.FAILED)
+
+        direction = job.params.get("direction", "bidirectional")
+        changes = {
+            "status": status,
+            "last_sync": job.started_at,
+            "error_message": job.error or (job.result or {}).get("error"),
+            "sync_direction": direction if direction in ("export", "import", "bidirectional") else "bidirectional",
+        }
+        if not job.is_finished:
+            changes["job_id"] = job.id
+            changes["progress"] = {"completed": job.completed, "total": job.total, "message": job.message}
+        if stored is not None:
+            if job.started_at is None:
+                # A queued job has not synced yet
+                del changes["last_sync"]
+            return stored.copy(update=changes)
+        return SyncState(
+            repository_id=job.repository_id,
+            last_success=job.finished_at if status == SyncStatus.COMPLETED else None,
+            **changes,
+        )
+
+    def current_sync_state(self, repository_id: str, jobs: List[Job]) -> Optional[SyncState]:
+        """A repository's sync state, showing the progress of its active sync job
+
+        ``jobs`` are the repository's sync jobs, newest first. While one is
+        queued or running its status and progress are shown (a running job
+        before a queued one); otherwise the stored state of the last sync, or
+        failing that the outcome of the latest job.
+        """
+        stored = self.get_sync_state(repository_id)
+        active = [job for job in jobs if not job.is_finished]
+        if active:
+            job = next((job for job in active if job.status == JobStatus.RUNNING), active[0])
+            return self.sync_state_from_job(job, stored)
+        if stored is None and jobs:
+            return self.sync_state_from_job(jobs[0])
+        return stored
+
     def get_sync_state(self, repository_id: str) -> Optional[SyncState]:
         """Get sync state for repository"""
-        return self.sync_states.get(repository_id)
+        return self.state_store.get(repository_id)
 
     def update_sync_state(self, repository_id: str, state: SyncState) -> None:
         """Update sync state"""
-        self.sync_states[repository_id] = state
+        self.state_store.save(state.copy(update={"repository_id": repository_id}))
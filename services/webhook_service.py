@@ -0,0 +1,146 @@
+"""Git push webhook handling"""
+
+import hashlib
+import hmac
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from models.repository import RepositoryConfig
+from models.webhook import PushEvent
+from utils.validators import normalize_repository_url
+
+NULL_SHA = "0" * 40
+
+# GitHub stops listing commits in push payloads after this many
+GITHUB_MAX_PAYLOAD_COMMITS = 2048
+
+SYNCED_DIRS = ("workflows", "applications")
+
+
+class WebhookError(Exception):
+    """Raised for webhook payloads that cannot be processed"""
+
+
+class WebhookService:
+    """Parses and verifies GitHub, GitLab and Gitea push webhooks"""
+
+    def detect_provider(self, headers: Mapping[str, str]) -> Optional[str]:
+        """Identify the sending provider from its event header"""
+        headers = {key.lower(): value for key, value in headers.items()}
+        # Gitea also sends X-GitHub-Event, so it must be checked first
+        if "x-gitea-event" in headers:
+            return "gitea"
+        if "x-gitlab-event" in headers:
+            return "gitlab"
+        if "x-github-event" in headers:
+            return "github"
+        return None
+
+    def event_type(self, provider: str, headers: Mapping[str, str]) -> str:
+        """Get the provider's event name, normalized to e.g. ``push``"""
+        headers = {key.lower(): value for key, value in headers.items()}
+        event = headers.get(f"x-{provider}-event", "")
+        if provider == "gitlab":
+            # "Push Hook", "Tag Push Hook", ...
+            return event.lower().replace(" hook", "").replace(" ", "_")
+        return event.lower()
+
+    def verify_signature(self, provider: str, headers: Mapping[str, str], body: bytes, secret: str) -> bool:
+        """Check the request was sent by someone who knows the webhook secret"""
+        headers = {key.lower(): value for key, value in headers.items()}
+        if provider == "gitlab":
+            # GitLab sends the secret itself rather than a signature
+            token = headers.get("x-gitlab-token")
+            return token is not None and hmac.compare_digest(token.encode(), secret.encode())
+
+        expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        if provider == "github":
+            signature = headers.get("x-hub-signature-256", "")
+            if not signature.startswith("sha256="):
+                return False
+            signature = signature[len("sha256=") :]
+        else:
+            signature = headers.get("x-gitea-signature", "")
+        return hmac.compare_digest(signature.lower().encode(), expected.encode())
+
+    def parse_push(self, provider: str, payload: Dict[str, Any]) -> PushEvent:
+        """Build a push event from a provider's payload"""
+        if not isinstance(payload, dict) or not payload.get("ref"):
+            raise WebhookError("Payload is not a push event")
+
+        commits = payload.get("commits") or []
+        changed: List[str] = []
+        seen = set()
+        for commit in commits:
+            for key in ("added", "modified", "removed"):
+                for path in commit.get(key) or []:
+                    if path not in seen:
+                        seen.add(path)
+                        changed.append(path)
+
+        before, after = payload.get("before"), payload.get("after")
+        created = before == NULL_SHA or bool(payload.get("created"))
+        deleted = after == NULL_SHA or bool(payload.get("deleted"))
+
+        if provider == "gitlab":
+            total = payload.get("total_commits_count", len(commits))
+            complete = total <= len(commits)
+            project = payload.get("project") or {}
+            repository = payload.get("repository") or {}
+            urls = [
+                project.get("git_http_url"),
+                project.get("git_ssh_url"),
+                project.get("web_url"),
+                repository.get("git_http_url"),
+                repository.get("git_ssh_url"),
+                repository.get("homepage"),
+            ]
+        else:
+            if provider == "github":
+                complete = len(commits) < GITHUB_MAX_PAYLOAD_COMMITS
+            else:
+                complete = payload.get("total_commits", len(commits)) <= len(commits)
+            repository = payload.get("repository") or {}
+            urls = [repository.get("clone_url"), repository.get("html_url"), repository.get("ssh_url")]
+
+        # New branches and force pushes do not list everything that changed
+        if created or payload.get("forced"):
+            complete = False
+
+        return PushEvent(
+            provider=provider,
+            ref=payload["ref"],
+            before=before,
+            after=after,
+            repository_urls=[url for url in urls if url],
+            changed_paths=changed,
+            complete=complete,
+            deleted=deleted,
+        )
+
+    def sync_paths(self, paths: Iterable[str]) -> List[str]:
+        """Map changed files to the workflow and application paths to import
+
+        Files of an exploded workflow map to the workflow's directory; files
+        outside ``workflows/`` and ``applications/`` are ignored.
+        """
+        result: List[str] = []
+        for path in paths:
+            parts = path.strip("/").split("/")
+            if len(parts) < 2 or parts[0] not in SYNCED_DIRS:
+                continue
+            if len(parts) == 2:
+                if not parts[1].endswith(".json"):
+                    continue
+                unit = path
+            elif parts[0] == "workflows":
+                unit = f"{parts[0]}/{parts[1]}"
+            else:
+                continue
+            if unit not in result:
+                result.append(unit)
+        return result
+
+    def match_repositories(self, event: PushEvent, configs: Iterable[RepositoryConfig]) -> List[RepositoryConfig]:
+        """Connected repositories tracking the pushed repository and branch"""
+        urls = {normalize_repository_url(url) for url in event.repository_urls}
+        return [config for config in configs if config.branch == event.branch and normalize_repository_url(config.url) in urls]
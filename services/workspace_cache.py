@@ -0,0 +1,264 @@
+"""Lifecycle management of local repository clones"""
+
+import logging
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from utils.locks import repository_lock, try_repository_lock
+
+logger = logging.getLogger("dify_git_plugin.workspaces")
+
+# File in a clone's git dir whose mtime records the last time the clone was used
+ACCESS_MARKER = "dify-last-access"
+
+# Clones are made under this suffix and renamed once complete
+PARTIAL_SUFFIX = ".partial"
+
+
+class WorkspaceCache:
+    """Tracks disk usage and last access of the clones under a directory
+
+    Clones idle for ``idle_seconds`` are evicted, and least recently used
+    clones are evicted while the total size exceeds ``quota_bytes``. Only clones
+    without uncommitted changes or unpushed commits are evicted, never one used
+    within ``min_idle_seconds`` or currently locked, and evicted repositories
+    are cloned again on next access. ``git gc --auto`` runs in the background
+    every ``gc_interval`` seconds for clones in use.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        quota_bytes: int = 0,
+        idle_seconds: float = 0,
+        min_idle_seconds: float = 300,
+        gc_interval: float = 3600,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.root = Path(root)
+        self.quota_bytes = quota_bytes
+        self.idle_seconds = idle_seconds
+        self.min_idle_seconds = min_idle_seconds
+        self.gc_interval = gc_interval
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._sizes: Dict[str, int] = {}
+        self._last_gc: Dict[str, float] = {}
+        self._last_enforced = 0.0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="workspace-maintenance")
+
+    def clone_path(self, repository_id: str) -> Path:
+        return self.root / repository_id
+
+    def partial_path(self, repository_id: str) -> Path:
+        return self.root / f"{repository_id}{PARTIAL_SUFFIX}"
+
+    def repository_ids(self) -> List[str]:
+        """Ids of the complete clones on disk"""
+        if not self.root.exists():
+            return []
+        return sorted(
+            entry.name
+            for entry in self.root.iterdir()
+            if entry.is_dir() and not entry.name.endswith(PARTIAL_SUFFIX) and not entry.name.startswith(".")
+        )
+
+    def _marker(self, repository_id: str) -> Path:
+        path = self.clone_path(repository_id)
+        git_dir = path / ".git"
+        return (git_dir if git_dir.is_dir() else path) / ACCESS_MARKER
+
+    def touch(self, repository_id: str) -> None:
+        """Record that a clone was used, and queue background upkeep when due"""
+        marker = self._marker(repository_id)
+        try:
+            marker.touch()
+        except OSError:
+            return
+
+        now = self.clock()
+        with self._lock:
+            # Any use may change the clone's size
+            self._sizes.pop(repository_id, None)
+            run_gc = now - self._last_gc.setdefault(repository_id, now) >= self.gc_interval
+            if run_gc:
+                self._last_gc[repository_id] = now
+            run_enforce = (self.quota_bytes or self.idle_seconds) and now - self._last_enforced >= 60
+            if run_enforce:
+                self._last_enforced = now
+
+        if run_gc:
+            self._executor.submit(self.gc, repository_id)
+        if run_enforce:
+            self._executor.submit(self.enforce)
+
+    def last_access(self, repository_id: str) -> float:
+        """Time the clone was last used"""
+        try:
+            return self._marker(repository_id).stat().st_mtime
+        except OSError:
+            return self.clone_path(repository_id).stat().st_mtime
+
+    def disk_usage(self, repository_id: str) -> int:
+        """Size of a clone in bytes"""
+        with self._lock:
+            if repository_id in self._sizes:
+                return self._sizes[repository_id]
+
+        total = 0
+        for dirpath, _, filenames in os.walk(self.clone_path(repository_id)):
+            for filename in filenames:
+                try:
+                    total += os.lstat(os.path.join(dirpath, filename)).st_size
+                except OSError:
+                    pass
+
+        with self._lock:
+            self._sizes[repository_id] = total
+        return total
+
+    def is_evictable(self, repository_id: str) -> bool:
+        """Check that deleting the clone loses nothing: no local changes or unpushed commits"""
+        # GitPython is imported on first use to keep it out of plugin startup
+        from git import GitCommandError, InvalidGitRepositoryError, NoSuchPathError, Repo
+
+        try:
+            repo = Repo(self.clone_path(repository_id))
+            if not repo.bare and repo.is_dirty(untracked_files=True):
+                return False
+            if repo.head.is_valid():
+                # Commits not on any remote-tracking branch were never pushed; GitService keeps
+                # these branches in bare clones too, and clones made before it did stay until fetched
+                return int(repo.git.rev_list("--count", "HEAD", "--not", "--remotes")) == 0
+            return True
+        except (InvalidGitRepositoryError, NoSuchPathError, GitCommandError, ValueError):
+            return False
+
+    def evict(self, repository_id: str) -> bool:
+        """Delete an idle clone if nothing would be lost; returns whether it was deleted"""
+        with try_repository_lock(repository_id) as acquired:
+            if not acquired or not self.is_evictable(repository_id):
+                return False
+            shutil.rmtree(self.clone_path(repository_id), ignore_errors=True)
+
+        with self._lock:
+            self._sizes.pop(repository_id, None)
+            self._last_gc.pop(repository_id, None)
+        logger.info("Evicted clone of repository %s", repository_id)
+        return True
+
+    def remove(self, repository_id: str) -> None:
+        """Delete a repository's clone, e.g. when it is disconnected"""
+        with repository_lock(repository_id):
+            shutil.rmtree(self.clone_path(repository_id), ignore_errors=True)
+            shutil.rmtree(self.partial_path(repository_id), ignore_errors=True)
+
+        with self._lock:
+            self._sizes.pop(repository_id, None)
+            self._last_gc.pop(repository_id, None)
+
+    def enforce(self, now: Optional[float] = None) -> List[str]:
+        """Evict idle clones, then least recently used ones until within the quota"""
+        now = self.clock() if now is None else now
+        clones = sorted(self.repository_ids(), key=self.last_access)
+        evicted = []
+
+        if self.idle_seconds:
+            for repository_id in clones:
+                if now - self.last_access(repository_id) >= self.idle_seconds and self.evict(repository_id):
+                    evicted.append(repository_id)
+
+        if self.quota_bytes:
+            remaining = [repository_id for repository_id in clones if repository_id not in evicted]
+            total = sum(self.disk_usage(repository_id) for repository_id in remaining)
+            for repository_id in remaining:
+                if total <= self.quota_bytes:
+                    break
+                if now - self.last_access(repository_id) < self.min_idle_seconds:
+                    continue
+                size = self.disk_usage(repository_id)
+                if self.evict(repository_id):
+                    evicted.append(repository_id)
+                    total -= size
+            if total > self.quota_bytes:
+                logger.warning("Clones use %d bytes, over the %d byte quota", total, self.quota_bytes)
+
+        return evicted
+
+    def gc(self, repository_id: str) -> None:
+        """Run ``git gc --auto`` unless the clone is in use"""
+        from git import GitCommandError, InvalidGitRepositoryError, NoSuchPathError, Repo
+
+        with try_repository_lock(repository_id) as acquired:
+            if not acquired or not self.clone_path(repository_id).exists():
+                return
+            try:
+                Repo(self.clone_path(repository_id)).git.gc("--auto", "--quiet")
+            except (GitCommandError, InvalidGitRepositoryError, NoSuchPathError):
+                logger.exception("git gc failed for repository %s", repository_id)
+
+        with self._lock:
+            self._sizes.pop(repository_id, None)
+
+    def cleanup_orphans(self, known_ids: Optional[Iterable[str]] = None) -> List[str]:
+        """Delete interrupted clones, directories that are not repositories and, if
+        ``known_ids`` is given, clones of repositories that are no longer connected"""
+        from git import InvalidGitRepositoryError, NoSuchPathError, Repo
+
+        known = set(known_ids) if known_ids is not None else None
+        removed = []
+        if not self.root.exists():
+            return removed
+
+        for entry in self.root.iterdir():
+            if not entry.is_dir() or entry.name.startswith("."):
+                continue
+            orphan = entry.name.endswith(PARTIAL_SUFFIX) or (known is not None and entry.name not in known)
+            if not orphan:
+                try:
+                    Repo(entry)
+                except (InvalidGitRepositoryError, NoSuchPathError):
+                    orphan = True
+            if orphan:
+                repository_id = entry.name[: -len(PARTIAL_SUFFIX)] if entry.name.endswith(PARTIAL_SUFFIX) else entry.name
+                with try_repository_lock(repository_id) as acquired:
+                    # A locked repository is being cloned or used right now
+                    if not acquired:
+                        continue
+                    shutil.rmtree(entry, ignore_errors=True)
+                removed.append(entry.name)
+
+        if removed:
+            logger.info("Removed orphaned clone directories: %s", ", ".join(removed))
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        clones = self.repository_ids()
+        return {
+            "clones": len(clones),
+            "bytes": sum(self.disk_usage(repository_id) for repository_id in clones),
+            "quota_bytes": self.quota_bytes,
+        }
+
+
+_caches: Dict[Path, WorkspaceCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_workspace_cache(root: Optional[Path] = None) -> WorkspaceCache:
+    """Get the process-wide cache for the clones under ``root`` (default: GIT_TEMP_DIR)"""
+    key = Path(root or os.getenv("GIT_TEMP_DIR", "./temp/git")).resolve()
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = WorkspaceCache(
+                key,
+                quota_bytes=int(float(os.getenv("PLUGIN_WORKSPACE_QUOTA_MB", "1024")) * 1024 * 1024),
+                idle_seconds=float(os.getenv("PLUGIN_WORKSPACE_IDLE_HOURS", "168")) * 3600,
+            )
+        return _caches[key]
@@ -0,0 +1,132 @@
+"""Tests for credential envelopes, key rotation and the credential cache"""
+
+import base64
+import json
+
+import pytest
+from cryptography.fernet import InvalidToken
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from endpoint_handlers.repositories import repositories
+from endpoint_handlers.repositories import router as repositories_router
+from models.repository import RepositoryConfig
+from services import credential_cache
+from services.auth_service import AuthService
+from services.credential_cache import CredentialCache
+
+
+def test_envelope_round_trip_without_outer_base64():
+    """Test that envelopes name their master key and each gets its own data key"""
+    auth_service = AuthService("master-key")
+    first = auth_service.encrypt_credentials({"token": "secret"})
+    second = auth_service.encrypt_credentials({"token": "secret"})
+
+    version, key_id, wrapped_key, _ = first.split(".", 3)
+    assert (version, key_id) == ("v2", auth_service.key_id)
+    assert wrapped_key != second.split(".", 3)[2]
+    assert auth_service.decrypt_credentials(first) == {"token": "secret"}
+
+    with pytest.raises(InvalidToken):
+        auth_service.decrypt_credentials(first[:-8] + "AAAAAAAA")
+
+
+def test_rotation_rewraps_data_keys_only():
+    """Test that previous keys still decrypt and rewrap keeps the ciphertext"""
+    envelope = AuthService("old-key").encrypt_credentials({"token": "secret"})
+    rotated_service = AuthService("new-key", previous_keys=["old-key"])
+
+    assert rotated_service.decrypt_credentials(envelope) == {"token": "secret"}
+    rewrapped = rotated_service.rewrap(envelope)
+    assert rewrapped.split(".", 3)[3] == envelope.split(".", 3)[3]
+    assert rotated_service.rewrap(rewrapped) == rewrapped
+    assert AuthService("new-key", previous_keys=[]).decrypt_credentials(rewrapped) == {"token": "secret"}
+
+    with pytest.raises(ValueError, match="unknown master key"):
+        AuthService("new-key", previous_keys=[]).decrypt_credentials(envelope)
+
+
+def test_legacy_values_are_read_and_upgraded():
+    """Test that base64-wrapped Fernet tokens from earlier versions still decrypt"""
+    auth_service = AuthService("master-key")
+    legacy = base64.urlsafe_b64encode(auth_service.cipher.encrypt(json.dumps({"token": "old"}).encode())).decode()
+
+    assert auth_service.decrypt_credentials(legacy) == {"token": "old"}
+    assert AuthService("new-key", previous_keys=["master-key"]).decrypt_credentials(legacy) == {"token": "old"}
+    upgraded = auth_service.rewrap(legacy)
+    assert upgraded.startswith("v2.")
+    assert auth_service.decrypt_credentials(upgraded) == {"token": "old"}
+
+
+def test_cache_expires_and_zeroizes():
+    """Test TTL expiry, LRU eviction and that evicted plaintext is overwritten"""
+    now = [0.0]
+    cache = CredentialCache(ttl=10, max_entries=2, clock=lambda: now[0])
+    cache.put("repo-1", "envelope-1", b'{"token": "one"}')
+    buffer = cache._entries[("repo-1", "envelope-1")][1]
+
+    assert cache.get("repo-1", "envelope-1") == {"token": "one"}
+    assert cache.get("repo-1", "other-envelope") is None
+
+    now[0] = 10
+    assert cache.get("repo-1", "envelope-1") is None
+    assert buffer == bytearray(len(buffer))
+
+    cache.put("repo-1", "a", b"{}")
+    cache.put("repo-2", "b", b"{}")
+    cache.put("repo-3", "c", b"{}")
+    assert len(cache) == 2 and cache.get("repo-1", "a") is None
+
+    cache.invalidate("repo-2")
+    assert len(cache) == 1
+
+
+def test_repository_credentials_are_decrypted_once(monkeypatch):
+    """Test that hot paths reuse decrypted credentials until they change"""
+    monkeypatch.setattr(credential_cache, "_cache", CredentialCache(ttl=60))
+    auth_service = AuthService("master-key")
+    config = RepositoryConfig(
+        id="repo",
+        name="repo",
+        url="https://example.com/repo.git",
+        workspace_id="ws",
+        credentials={"encrypted": auth_service.encrypt_credentials({"token": "secret"})},
+    )
+
+    opened = []
+    original = AuthService._open
+    monkeypatch.setattr(AuthService, "_open", lambda self, data: opened.append(data) or original(self, data))
+
+    assert auth_service.repository_credentials(config) == {"token": "secret"}
+    assert AuthService("master-key").repository_credentials(config) == {"token": "secret"}
+    assert len(opened) == 1
+
+    config.credentials = {"encrypted": auth_service.encrypt_credentials({"token": "changed"})}
+    assert auth_service.repository_credentials(config) == {"token": "changed"}
+    assert len(opened) == 2
+
+
+def test_rotate_keys_endpoint(monkeypatch):
+    """Test that the rotation route re-wraps stored secrets under the current key"""
+    monkeypatch.setenv("PLUGIN_ENCRYPTION_KEY", "old-key")
+    config = RepositoryConfig(
+        id="rotate-repo",
+        name="repo",
+        url="https://example.com/repo.git",
+        workspace_id="ws",
+        credentials={"encrypted": AuthService().encrypt_credentials({"token": "secret"})},
+        webhook_secret=AuthService().encrypt_credentials({"secret": "hook"}),
+    )
+    monkeypatch.setitem(repositories, config.id, config)
+
+    monkeypatch.setenv("PLUGIN_ENCRYPTION_KEY", "new-key")
+    monkeypatch.setenv("PLUGIN_ENCRYPTION_PREVIOUS_KEYS", "old-key")
+    app = FastAPI()
+    app.include_router(repositories_router)
+    response = TestClient(app).post("/repositories/rotate-keys")
+
+    assert response.status_code == 200
+    assert response.json()["rotated"] == ["rotate-repo"]
+    current = AuthService("new-key", previous_keys=[])
+    assert current.repository_credentials(config) == {"token": "secret"}
+    assert current.decrypt_credentials(config.webhook_secret) == {"secret": "hook"}
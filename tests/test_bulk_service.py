@@ -0,0 +1,120 @@
+"""Tests for multi-repository operations"""
+
+import asyncio
+import threading
+import time
+from collections import Counter
+
+import pytest
+from git import Repo
+from pydantic import ValidationError
+
+from endpoint_handlers.bulk import BulkSyncRequest
+from models.repository import RepositoryConfig
+from services.bulk_service import BulkService
+from services.git_service import GitService
+
+
+def _config(repository_id, url):
+    return RepositoryConfig(id=repository_id, name=repository_id, url=url, workspace_id="ws")
+
+
+def test_concurrency_limits_and_aggregation():
+    """Test the global and per-host limits and the aggregated result"""
+    service = BulkService(max_workers=4, per_host=2)
+    configs = [_config(f"a{i}", f"https://git-a.example.com/org/a{i}.git") for i in range(4)]
+    configs += [_config(f"b{i}", f"git@git-b.example.com:org/b{i}.git") for i in range(4)]
+
+    lock = threading.Lock()
+    running, peak = Counter(), Counter()
+
+    def operation(config):
+        host = config.id[0]
+        with lock:
+            running[host] += 1
+            running["all"] += 1
+            peak[host] = max(peak[host], running[host])
+            peak["all"] = max(peak["all"], running["all"])
+        time.sleep(0.02)
+        with lock:
+            running[host] -= 1
+            running["all"] -= 1
+        if config.id == "b3":
+            raise RuntimeError("unreachable")
+        return {"success": True}
+
+    result = asyncio.run(service.run("pull", configs, operation))
+
+    assert peak["a"] <= 2 and peak["b"] <= 2
+    assert peak["all"] == 4
+    assert (result["total"], result["succeeded"], result["failed"]) == (8, 7, 1)
+    assert not result["success"]
+    assert result["results"][-1] == {
+        "repository_id": "b3",
+        "success": False,
+        "error": "unreachable",
+        "elapsed": result["results"][-1]["elapsed"],
+    }
+
+
+def test_pull_all(tmp_path, monkeypatch):
+    """Test pulling several local clones"""
+    origin = Repo.init(tmp_path / "origin", initial_branch="main")
+    (tmp_path / "origin" / "README.md").write_text("hello\n")
+    origin.index.add(["README.md"])
+    origin.index.commit("Initial commit")
+
+    monkeypatch.setenv("GIT_TEMP_DIR", str(tmp_path / "git"))
+    configs = [_config(f"repo-{i}", f"file://{tmp_path / 'origin'}") for i in range(3)]
+    for config in configs:
+        GitService().clone_repository(config)
+
+    result = asyncio.run(BulkService(max_workers=2).pull_all(configs))
+    assert result["success"]
+    assert [item["result"]["updated"] for item in result["results"]] == [False] * 3
+
+
+def test_host_limit_is_shared_between_requests():
+    """Test that concurrent bulk requests and jobs on separate event loops share the per-host limit"""
+    service = BulkService(max_workers=8, per_host=2)
+    lock = threading.Lock()
+    running, peak = [0], [0]
+
+    def operation(config):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        return {"success": True}
+
+    def batch(name):
+        return [_config(f"{name}{i}", f"https://git.example.com/org/{name}{i}.git") for i in range(3)]
+
+    async def two_requests():
+        return await asyncio.gather(service.run("pull", batch("a"), operation), service.run("pull", batch("b"), operation))
+
+    assert all(result["success"] for result in asyncio.run(two_requests()))
+    assert peak[0] == 2
+
+    # Background jobs each run under their own asyncio.run in a job thread
+    peak[0] = 0
+    results = []
+    jobs = [
+        threading.Thread(target=lambda name=name: results.append(asyncio.run(service.run("pull", batch(name), operation))))
+        for name in "cd"
+    ]
+    for job in jobs:
+        job.start()
+    for job in jobs:
+        job.join()
+    assert [result["success"] for result in results] == [True, True]
+    assert peak[0] == 2
+
+
+def test_sync_direction_is_validated():
+    """Test that bulk syncs reject unknown directions instead of reporting success"""
+    with pytest.raises(ValidationError):
+        BulkSyncRequest(direction="sideways")
+    assert BulkSyncRequest().direction == "bidirectional"
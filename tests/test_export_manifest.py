@@ -0,0 +1,98 @@
+"""Tests for export path mapping, collisions and renames"""
+
+import json
+
+from git import Repo
+
+from models.workflow import ApplicationExport, WorkflowExport
+from services.git_service import GitService
+from utils.export_manifest import MANIFEST_FILE, ExportManifest, safe_name
+
+
+def _workflow(object_id, name):
+    return WorkflowExport(id=object_id, name=name, data={"graph": {"nodes": [{"id": "start"}]}})
+
+
+def _files(root):
+    return sorted(str(path.relative_to(root)) for path in root.rglob("*") if path.is_file() and ".git" not in path.parts)
+
+
+def test_safe_name_matches_character_filter():
+    """Test that the compiled filter keeps the same characters as the per-character check"""
+    for name in ["Flow: v2/final?", "Résumé bot_1", "  --x--  ", "数据 流程", "a\tb\nc", "💡 idea"]:
+        assert safe_name(name) == "".join(c for c in name if c.isalnum() or c in (" ", "-", "_")).strip()
+
+
+def test_name_collisions_are_resolved_and_persisted(tmp_path):
+    """Test that objects with the same name get distinct files and the mapping survives a reload"""
+    repo = Repo.init(tmp_path / "repo")
+    git_service = GitService(temp_dir=str(tmp_path / "git"))
+
+    first = git_service.export_workflow(repo, _workflow("wf-1", "Support Bot"), "name")
+    second = git_service.export_workflow(repo, _workflow("wf-2", "Support Bot"), "name")
+    # Differs only in case, which clashes on case-insensitive filesystems
+    third = git_service.export_workflow(repo, _workflow("wf-3", "support bot"), "name")
+    assert first == "workflows/workflow-Support Bot.json"
+    assert second == "workflows/workflow-Support Bot-wf-2.json"
+    assert third == "workflows/workflow-support bot-wf-3.json"
+
+    # Re-exporting keeps every object where it is
+    assert git_service.export_workflow(repo, _workflow("wf-2", "Support Bot"), "name") == second
+    assert git_service.save_export_manifest(repo)
+    manifest = json.loads((tmp_path / "repo" / MANIFEST_FILE).read_text())
+    assert manifest["objects"] == {"workflow:wf-1": first, "workflow:wf-2": second, "workflow:wf-3": third}
+
+    reloaded = GitService(temp_dir=str(tmp_path / "git"))
+    assert reloaded.workflow_path(repo, _workflow("wf-2", "Support Bot"), "name") == second
+    assert not reloaded.save_export_manifest(repo)
+
+
+def test_renames_move_files(tmp_path):
+    """Test that renamed objects and layout changes leave no orphaned copies"""
+    repo = Repo.init(tmp_path / "repo")
+    git_service = GitService(temp_dir=str(tmp_path / "git"))
+    root = tmp_path / "repo"
+
+    git_service.export_application(repo, ApplicationExport(id="app-1", name="Old", data={}), "name")
+    git_service.export_workflow(repo, _workflow("wf-1", "Draft"), "id-name")
+    git_service.export_workflow(repo, _workflow("wf-1", "Final"), "id-name", layout="exploded")
+    path = git_service.export_application(repo, ApplicationExport(id="app-1", name="New", data={}), "name")
+    git_service.save_export_manifest(repo)
+
+    assert path == "applications/app-New.json"
+    assert _files(root) == [
+        MANIFEST_FILE,
+        "applications/app-New.json",
+        "workflows/workflow-wf-1-Final/nodes/start.json",
+        "workflows/workflow-wf-1-Final/workflow.json",
+    ]
+
+    # The freed name goes to the next object asking for it
+    assert git_service.export_application(repo, ApplicationExport(id="app-2", name="Old", data={}), "name") == (
+        "applications/app-Old.json"
+    )
+
+
+def test_existing_exports_are_indexed(tmp_path):
+    """Test that repositories exported before the manifest existed keep their files"""
+    repo = Repo.init(tmp_path / "repo")
+    (tmp_path / "repo" / "workflows").mkdir()
+    (tmp_path / "repo" / "workflows" / "workflow-Flow.json").write_text(json.dumps({"id": "wf-1", "name": "Flow"}))
+
+    git_service = GitService(temp_dir=str(tmp_path / "git"))
+    assert git_service.export_manifest(repo).path_of("workflow:wf-1") == "workflows/workflow-Flow.json"
+    assert git_service.export_workflow(repo, _workflow("wf-2", "Flow"), "name") == "workflows/workflow-Flow-wf-2.json"
+    assert git_service.export_workflow(repo, _workflow("wf-1", "Flow"), "name") == "workflows/workflow-Flow.json"
+
+    # Removing an export releases its path
+    assert git_service.remove_export(repo, "workflows/workflow-Flow.json")
+    assert "workflow:wf-1" not in git_service.export_manifest(repo)
+
+
+def test_manifest_round_trip():
+    """Test serialization and lookups by path with and without extension"""
+    manifest = ExportManifest({"workflow:a": "workflows/workflow-a", "application:b": "applications/app-b.json"})
+    assert manifest.owner_of("workflows/workflow-a.json") == "workflow:a"
+    assert manifest.owner_of("APPLICATIONS/app-B") == "application:b"
+    assert dict(manifest.items("application")) == {"application:b": "applications/app-b.json"}
+    assert ExportManifest.from_json(json.dumps(manifest.to_document()).encode()).to_document() == manifest.to_document()
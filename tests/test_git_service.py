@@ -0,0 +1,183 @@
+"""Tests for Git service"""
+
+import pytest
+from git import GitCommandError, Repo
+
+from models.repository import RepositoryConfig
+from models.workflow import ApplicationExport, WorkflowExport
+from services.git_service import GitService, UnreadableExport
+
+
+def _init_repo(path):
+    repo = Repo.init(path)
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "Test")
+        config.set_value("user", "email", "test@example.com")
+    return repo
+
+
+def test_commit_files(tmp_path):
+    """Test committing an explicit file list and in-memory blobs"""
+    repo = _init_repo(tmp_path / "repo")
+    git_service = GitService(temp_dir=str(tmp_path / "git"))
+    (tmp_path / "repo" / "a.json").write_text("{}\n")
+    (tmp_path / "repo" / "ignored.txt").write_text("not committed\n")
+
+    result = git_service.commit_files(repo, "First", paths=["a.json"], blobs={"workflows/b.json": b"[]\n"})
+    assert result["success"]
+    assert repo.head.commit.hexsha == result["commit_hash"]
+    assert sorted(item.path for item in repo.head.commit.tree.traverse()) == ["a.json", "workflows", "workflows/b.json"]
+    assert "a.json" not in [item.a_path for item in repo.index.diff("HEAD")]
+
+    # Unchanged content produces no commit
+    assert not git_service.commit_files(repo, "Again", paths=["a.json"])["success"]
+
+    result = git_service.commit_files(repo, "Remove", removed=["workflows/b.json"], author={"name": "Dify", "email": "d@x"})
+    assert result["success"]
+    assert [item.path for item in repo.head.commit.tree.traverse()] == ["a.json"]
+    assert repo.head.commit.author.name == "Dify"
+    assert repo.head.commit.parents[0].message == "First"
+
+
+def test_commit_files_keeps_checkout_in_step(tmp_path):
+    """Test that a later commit() neither restores removed files nor drops committed blobs"""
+    repo = _init_repo(tmp_path / "repo")
+    git_service = GitService(temp_dir=str(tmp_path / "git"))
+    (tmp_path / "repo" / "a.json").write_text("{}\n")
+    git_service.commit_files(repo, "First", paths=["a.json"])
+
+    assert git_service.commit_files(repo, "Swap", blobs={"b.json": b"[]\n"}, removed=["a.json"])["success"]
+    assert not (tmp_path / "repo" / "a.json").exists()
+    assert (tmp_path / "repo" / "b.json").read_bytes() == b"[]\n"
+    assert not repo.is_dirty(untracked_files=True)
+
+    (tmp_path / "repo" / "c.json").write_text("{}\n")
+    assert git_service.commit(repo, "Second")["success"]
+    assert sorted(item.path for item in repo.head.commit.tree.traverse()) == ["b.json", "c.json"]
+
+
+def test_commit_files_removes_directories(tmp_path):
+    """Test that removed directories leave neither the tree nor the checkout, and nothing outside is touched"""
+    repo = _init_repo(tmp_path / "repo")
+    git_service = GitService(temp_dir=str(tmp_path / "git"))
+    blobs = {"workflows/flow/workflow.json": b"{}\n", "workflows/flow/nodes/a.json": b"{}\n", "keep.json": b"{}\n"}
+    git_service.commit_files(repo, "First", blobs=blobs)
+    (tmp_path / "outside.json").write_text("{}\n")
+
+    assert not git_service.commit_files(repo, "Escape", removed=["workflows/flow", "../outside.json"])["success"]
+    assert (tmp_path / "outside.json").exists()
+
+    assert git_service.commit_files(repo, "Remove", removed=["workflows/flow"])["success"]
+    assert [item.path for item in repo.head.commit.tree.traverse()] == ["keep.json"]
+    # Emptied parent directories go too
+    assert not (tmp_path / "repo" / "workflows").exists()
+    assert not repo.is_dirty(untracked_files=True)
+
+
+def test_bare_repository_export_and_import(tmp_path):
+    """Test exporting into and importing from a bare clone"""
+    origin = _init_repo(tmp_path / "origin")
+    (tmp_path / "origin" / "README.md").write_text("origin\n")
+    origin.index.add(["README.md"])
+    origin.index.commit("Initial")
+    branch = origin.active_branch.name
+
+    git_service = GitService(temp_dir=str(tmp_path / "git"))
+    config = RepositoryConfig(
+        id="bare", name="Bare", url=str(tmp_path / "origin"), branch=branch, workspace_id="ws", bare=True
+    )
+    repo = git_service.clone_repository(config)
+    assert repo.bare
+
+    workflow = WorkflowExport(id="wf-1", name="Flow", data={"graph": {"nodes": [{"id": "start"}]}})
+    path = git_service.export_workflow(repo, workflow)
+    assert git_service.get_repository_status(repo)["staged_files"] == [path]
+
+    result = git_service.commit(repo, "Export")
+    assert result["success"]
+    assert git_service.list_exported_files(repo)["workflows"] == [path]
+    assert git_service.import_workflow(repo, path)["data"] == workflow.data
+
+    # Re-exporting unchanged content stages nothing
+    git_service.export_workflow(repo, workflow)
+    assert not git_service.commit(repo, "Again")["success"]
+
+    # Switching to the exploded layout replaces the file with a directory in one commit
+    exploded = git_service.export_workflow(repo, workflow, layout="exploded")
+    assert git_service.commit(repo, "Explode")["success"]
+    assert git_service.list_exported_files(repo)["workflows"] == [exploded]
+    assert git_service.import_workflow(repo, exploded)["data"] == workflow.data
+
+
+def test_bare_staged_exports_outlive_the_service(tmp_path):
+    """Test that exports staged by one request are seen and committed by the next"""
+    origin = _init_repo(tmp_path / "origin")
+    (tmp_path / "origin" / "README.md").write_text("origin\n")
+    origin.index.add(["README.md"])
+    origin.index.commit("Initial")
+    config = RepositoryConfig(
+        id="bare", name="Bare", url=str(tmp_path / "origin"), branch=origin.active_branch.name, workspace_id="ws", bare=True
+    )
+    GitService(temp_dir=str(tmp_path / "git")).clone_repository(config)
+
+    def service_and_repo():
+        git_service = GitService(temp_dir=str(tmp_path / "git"))
+        return git_service, git_service.get_repo(config)
+
+    workflow = WorkflowExport(id="wf-1", name="Flow", data={"graph": {"nodes": [{"id": "start"}]}})
+    git_service, repo = service_and_repo()
+    exploded = git_service.export_workflow(repo, workflow, layout="exploded")
+
+    # A staged, uncommitted directory
+    git_service, repo = service_and_repo()
+    assert git_service.path_exists(repo, exploded)
+    assert git_service.import_workflow(repo, exploded)["data"] == workflow.data
+    assert git_service.commit(repo, "Export")["success"]
+
+    git_service, repo = service_and_repo()
+    git_service.remove_export(repo, exploded)
+    git_service, repo = service_and_repo()
+    assert not git_service.path_exists(repo, exploded)
+
+
+def test_iter_exported_objects_from_commit(tmp_path):
+    """Test streaming exported objects from a committed tree"""
+    repo = _init_repo(tmp_path / "repo")
+    git_service = GitService(temp_dir=str(tmp_path / "git"))
+    workflow = WorkflowExport(id="wf-1", name="Flow", data={"graph": {"nodes": [{"id": "a"}, {"id": "b"}]}})
+    other = WorkflowExport(id="wf-2", name="Other", data={"graph": {"nodes": []}})
+
+    paths = [
+        git_service.export_workflow(repo, workflow, layout="exploded"),
+        git_service.export_workflow(repo, other),
+        git_service.export_application(repo, ApplicationExport(id="app-1", name="App", data={"mode": "chat"})),
+    ]
+    files = [str(f.relative_to(tmp_path / "repo")) for f in (tmp_path / "repo").rglob("*.json")]
+    commit_hash = git_service.commit_files(repo, "Export", paths=files)["commit_hash"]
+
+    objects = list(git_service.iter_exported_objects(repo, commit_hash))
+    assert [(kind, path) for kind, path, _ in objects] == [
+        ("application", paths[2]),
+        ("workflow", paths[0]),
+        ("workflow", paths[1]),
+    ]
+    assert objects[1][2]["data"] == workflow.data
+
+    # Stopping early does not raise
+    iterator = git_service.iter_exported_objects(repo, commit_hash)
+    next(iterator)
+    iterator.close()
+
+
+def test_iter_exported_objects_reports_errors(tmp_path):
+    """Test that unreadable objects are typed records and listing failures raise with git's message"""
+    repo = _init_repo(tmp_path / "repo")
+    git_service = GitService(temp_dir=str(tmp_path / "git"))
+    commit_hash = git_service.commit_files(repo, "Broken", blobs={"workflows/broken.json": b"{"})["commit_hash"]
+
+    [(kind, path, data)] = list(git_service.iter_exported_objects(repo, commit_hash))
+    assert (kind, path) == ("workflow", "workflows/broken.json")
+    assert isinstance(data, UnreadableExport) and data.error
+
+    with pytest.raises(GitCommandError, match="not a tree object"):
+        list(git_service.iter_exported_objects(repo, "0" * 40))
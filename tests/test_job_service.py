@@ -0,0 +1,98 @@
+"""Tests for the background job service"""
+
+import asyncio
+import time
+
+from models.job import JobStatus
+from services.job_service import JobService, job_handler
+
+
+@job_handler("test-count")
+async def _count_job(job, progress):
+    total = job.params["total"]
+    for i in range(total):
+        await asyncio.sleep(job.params.get("delay", 0))
+        progress(i + 1, total, f"item {i}")
+    return {"success": True, "counted": total}
+
+
+def _wait(service, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = service.get(job_id)
+        if job.is_finished:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def test_job_runs_and_persists(tmp_path):
+    """Test that jobs run, report progress and survive a restart"""
+    service = JobService(db_path=tmp_path / "jobs.db")
+    job = service.submit("test-count", {"total": 3}, repository_id="repo-1")
+
+    job = _wait(service, job.id)
+    assert job.status == JobStatus.COMPLETED
+    assert (job.completed, job.total) == (3, 3)
+    assert job.result == {"success": True, "counted": 3}
+    service.shutdown()
+
+    restarted = JobService(db_path=tmp_path / "jobs.db")
+    assert [j.id for j in restarted.list(repository_id="repo-1")] == [job.id]
+    restarted.shutdown()
+
+
+def test_cancel_running_job(tmp_path):
+    """Test cooperative cancellation of a running job"""
+    service = JobService(db_path=tmp_path / "jobs.db")
+    job = service.submit("test-count", {"total": 1000, "delay": 0.01})
+
+    while service.get(job.id).status == JobStatus.PENDING:
+        time.sleep(0.01)
+    service.cancel(job.id)
+
+    job = _wait(service, job.id)
+    assert job.status == JobStatus.CANCELLED
+    assert job.completed < 1000
+    service.shutdown()
+
+
+@job_handler("test-needs-repo", recoverable=lambda job: None if job.params.get("runnable") else "repository gone")
+async def _needs_repo_job(job, progress):
+    return {"success": True}
+
+
+def _insert_pending(service, kind, params):
+    """Persist a job as left pending by a previous process"""
+    job = service.submit(kind, params)
+    _wait(service, job.id)
+    service._execute("UPDATE jobs SET status = ?, finished_at = NULL WHERE id = ?", (JobStatus.PENDING.value, job.id))
+    return job.id
+
+
+def test_recover_fails_jobs_that_cannot_run(tmp_path):
+    """Test that recovered jobs whose check fails are not queued again"""
+    service = JobService(db_path=tmp_path / "jobs.db")
+    stuck = _insert_pending(service, "test-needs-repo", {"runnable": False})
+    runnable = _insert_pending(service, "test-needs-repo", {"runnable": True})
+    service.shutdown()
+
+    restarted = JobService(db_path=tmp_path / "jobs.db")
+    restarted.recover()
+    job = restarted.get(stuck)
+    assert job.status == JobStatus.FAILED
+    assert job.error == "Not resumed after plugin restart: repository gone"
+    assert _wait(restarted, runnable).status == JobStatus.COMPLETED
+    restarted.shutdown()
+
+
+def test_cancelled_pending_job_is_forgotten(tmp_path):
+    """Test that cancelling a queued job does not leave its id behind"""
+    service = JobService(db_path=tmp_path / "jobs.db", max_workers=1)
+    blocker = service.submit("test-count", {"total": 20, "delay": 0.01})
+    queued = service.submit("test-count", {"total": 1})
+    assert service.cancel(queued.id).status == JobStatus.CANCELLED
+
+    _wait(service, blocker.id)
+    service.shutdown()
+    assert service._cancelled == set()
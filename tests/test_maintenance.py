@@ -0,0 +1,97 @@
+"""Tests for background Git maintenance"""
+
+import os
+import threading
+import time
+from pathlib import Path
+
+from git import Repo
+
+from models.repository import RepositoryConfig
+from services.git_service import GitService
+from services.maintenance import MaintenanceRunner, repack_batch_size
+from services.workspace_cache import WorkspaceCache
+from utils.locks import repository_lock
+
+
+def _clone_with_packs(tmp_path, packs):
+    origin = Repo.init(tmp_path / "origin", initial_branch="main")
+    (tmp_path / "origin" / "README.md").write_text("hello\n")
+    origin.index.add(["README.md"])
+    origin.index.commit("Initial commit")
+
+    git_service = GitService(temp_dir=str(tmp_path / "git"))
+    config = RepositoryConfig(id="repo", name="repo", url=f"file://{tmp_path / 'origin'}", workspace_id="ws")
+    repo = git_service.clone_repository(config)
+
+    for i in range(packs):
+        path = Path(repo.working_dir) / f"file-{i}.txt"
+        path.write_text(f"{i}\n")
+        repo.index.add([path.name])
+        repo.index.commit(f"Commit {i}")
+        repo.git.repack("-d", "-q")
+    return repo
+
+
+def test_maintenance_writes_commit_graph_and_midx(tmp_path):
+    """Test that a due clone gets a commit-graph, multi-pack-index and repack"""
+    repo = _clone_with_packs(tmp_path, packs=4)
+    runner = MaintenanceRunner(WorkspaceCache(tmp_path / "git"), max_packs=3)
+
+    # Recently used clones are left alone
+    assert runner.run_repository("repo") is None
+
+    metrics = runner.run_repository("repo", force=True)
+    assert metrics["tasks"] == ["incremental-repack", "multi-pack-index", "commit-graph"]
+    assert metrics["before"]["packs"] >= 3
+    assert os.path.exists(os.path.join(repo.git_dir, "objects", "pack", "multi-pack-index"))
+    assert os.path.isdir(os.path.join(repo.git_dir, "objects", "info", "commit-graphs"))
+
+    # History still reads correctly through the commit-graph
+    assert len(list(repo.iter_commits())) == 5
+    assert runner.stats("repo")["last_maintenance"] is not None
+
+
+def test_maintenance_skips_locked_and_recently_maintained(tmp_path):
+    """Test that busy clones and clones that are not due are skipped"""
+    _clone_with_packs(tmp_path, packs=1)
+    now = [time.time() + 3600]
+    runner = MaintenanceRunner(WorkspaceCache(tmp_path / "git"), clock=lambda: now[0])
+
+    # The lock is re-entrant, so try from another thread while holding it
+    results = []
+    with repository_lock("repo"):
+        thread = threading.Thread(target=lambda: results.append(runner.run_repository("repo")))
+        thread.start()
+        thread.join()
+    assert results == [None]
+
+    assert runner.run_repository("repo") is not None
+    now[0] = runner.last_run(Repo(tmp_path / "git" / "repo")) + 3600
+    assert runner.run_repository("repo") is None
+
+
+def test_repack_batch_size_spares_largest_pack(tmp_path):
+    """Test that incremental repacks are bounded by the second largest pack"""
+    repo = _clone_with_packs(tmp_path, packs=3)
+    sizes = sorted(path.stat().st_size for path in (Path(repo.git_dir) / "objects" / "pack").glob("*.pack"))
+    assert repack_batch_size(repo) == sizes[-2] + 1
+
+
+def test_writes_hold_the_repository_lock(tmp_path):
+    """Test that commits wait for the lock maintenance takes, instead of running under a repack"""
+    repo = _clone_with_packs(tmp_path, packs=1)
+    # Handles are tagged with the config id maintenance locks on
+    assert repo.repository_id == "repo"
+    (Path(repo.working_dir) / "new.txt").write_text("new\n")
+    results = []
+
+    with repository_lock("repo"):
+        thread = threading.Thread(
+            target=lambda: results.append(GitService(temp_dir=str(tmp_path / "git")).commit(repo, "New"))
+        )
+        thread.start()
+        thread.join(0.2)
+        assert thread.is_alive()
+    thread.join()
+    assert results[0]["success"]
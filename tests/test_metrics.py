@@ -0,0 +1,105 @@
+"""Tests for metrics collection and exposition"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from git import Repo
+
+from endpoint_handlers.metrics import record_request_metrics
+from endpoint_handlers.metrics import router as metrics_router
+from models.repository import RepositoryConfig
+from services.git_service import GitService
+from utils.metrics import GIT_BYTES_WRITTEN, GIT_OPERATION_ERRORS, GIT_OPERATION_SECONDS, REGISTRY, Registry, timed
+
+
+@pytest.fixture
+def metrics_enabled(monkeypatch):
+    monkeypatch.setattr(REGISTRY, "enabled", True)
+    REGISTRY.clear()
+    yield REGISTRY
+    REGISTRY.clear()
+
+
+def test_render_exposition_format():
+    """Test counters, gauges and cumulative histogram buckets in the text format"""
+    registry = Registry(enabled=True)
+    requests = registry.counter("requests_total", "Requests", ["method"])
+    in_flight = registry.gauge("in_flight", "In flight")
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+
+    requests.inc(method="GET")
+    requests.inc(2, method='PO"ST')
+    in_flight.set(3)
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value)
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{method="GET"} 1' in text
+    assert 'requests_total{method="PO\\"ST"} 2' in text
+    assert "in_flight 3" in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_count 3" in text
+
+    with pytest.raises(ValueError):
+        requests.inc(path="/")
+
+
+def test_disabled_registry_records_nothing():
+    """Test that updates are no-ops while metrics are off"""
+    registry = Registry(enabled=False)
+    calls = registry.counter("calls_total", "Calls")
+    latency = registry.histogram("latency_seconds", "Latency", ["operation"])
+    errors = registry.counter("errors_total", "Errors", ["operation"])
+
+    @timed(latency, errors, operation="op")
+    def operation():
+        return {"success": False}
+
+    calls.inc()
+    operation()
+    assert calls.value() is None
+    assert latency.value(operation="op") is None
+
+    registry.enabled = True
+    operation()
+    assert latency.value(operation="op")[2] == 1
+    assert errors.value(operation="op") == 1
+
+
+def test_git_operations_and_routes_are_instrumented(tmp_path, metrics_enabled):
+    """Test Git operation timings, bytes written and the /metrics route"""
+    origin = Repo.init(tmp_path / "origin", initial_branch="main")
+    (tmp_path / "origin" / "README.md").write_text("hello\n")
+    origin.index.add(["README.md"])
+    origin.index.commit("Initial commit")
+
+    git_service = GitService(temp_dir=str(tmp_path / "git"))
+    config = RepositoryConfig(id="repo", name="repo", url=f"file://{tmp_path / 'origin'}", workspace_id="ws")
+    repo = git_service.clone_repository(config)
+    git_service._write_file(repo, "workflows/a.json", "{}\n")
+    git_service.commit(repo, "Add workflow")
+    # Nothing left to commit is not an error
+    git_service.commit(repo, "Nothing")
+
+    assert GIT_OPERATION_SECONDS.value(operation="clone")[2] == 1
+    assert GIT_OPERATION_SECONDS.value(operation="commit")[2] == 2
+    assert GIT_OPERATION_ERRORS.value(operation="commit") is None
+    assert GIT_BYTES_WRITTEN.value() == 3
+
+    app = FastAPI()
+    app.include_router(metrics_router)
+    app.middleware("http")(record_request_metrics)
+    client = TestClient(app)
+    client.get("/metrics")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'dify_git_operation_duration_seconds_count{operation="commit"} 2' in response.text
+    assert 'dify_http_request_duration_seconds_count{method="GET",route="/metrics",status="200"} 1' in response.text
+
+    metrics_enabled.enabled = False
+    assert client.get("/metrics").status_code == 404
@@ -0,0 +1,102 @@
+"""Tests for the sampling profiler and diagnostics routes"""
+
+import asyncio
+import threading
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from endpoint_handlers.diagnostics import router as diagnostics_router
+from utils.profiler import SamplingProfiler, SlowRequestLog
+
+
+def _busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+async def _waiting_task(started):
+    started.set()
+    await asyncio.sleep(10)
+
+
+def test_samples_threads_and_suspended_tasks():
+    """Test that busy threads and tasks suspended in another thread's loop show up"""
+    stop, task_started = threading.Event(), threading.Event()
+    worker = threading.Thread(target=_busy_loop, args=(stop,), name="busy-worker")
+    worker.start()
+
+    loop = asyncio.new_event_loop()
+    task_holder = []
+
+    def run_loop():
+        asyncio.set_event_loop(loop)
+        task_holder.append(loop.create_task(_waiting_task(task_started), name="waiting-task"))
+        loop.run_forever()
+
+    loop_thread = threading.Thread(target=run_loop, name="loop-thread")
+    loop_thread.start()
+    task_started.wait(5)
+
+    try:
+        profiler = SamplingProfiler(interval=0.002).run_for(0.2)
+    finally:
+        stop.set()
+        worker.join()
+        loop.call_soon_threadsafe(task_holder[0].cancel)
+        loop.call_soon_threadsafe(loop.stop)
+        loop_thread.join()
+        loop.close()
+
+    collapsed = profiler.collapsed()
+    assert profiler.samples > 10
+    assert any(line.startswith("thread:busy-worker;") and "_busy_loop" in line for line in collapsed.splitlines())
+    assert any(line.startswith("task:waiting-task;_waiting_task") for line in collapsed.splitlines())
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed.splitlines())
+    assert profiler.summary()["top"]
+
+
+def test_slow_request_log_profiles_slow_tail():
+    """Test that only requests over the threshold are recorded, with a profile"""
+    log = SlowRequestLog(threshold=0.1, interval=0.005)
+
+    with log.watch("GET", "/fast"):
+        pass
+
+    def slow_operation():
+        time.sleep(0.6)
+
+    worker = threading.Thread(target=slow_operation, name="slow-worker")
+    with log.watch("POST", "/sync/repo"):
+        worker.start()
+        worker.join()
+
+    assert [entry["path"] for entry in log.entries] == ["/sync/repo"]
+    entry = log.entries[0]
+    assert entry["duration"] >= 0.6
+    assert entry["profile"]["samples"] > 0
+    assert "slow_operation" in entry["collapsed"]
+
+
+def test_diagnostics_routes_require_token(monkeypatch):
+    """Test that diagnostics are off without a token and reject wrong tokens"""
+    app = FastAPI()
+    app.include_router(diagnostics_router)
+    client = TestClient(app)
+
+    assert client.get("/diagnostics/profile").status_code == 404
+
+    monkeypatch.setenv("PLUGIN_DIAGNOSTICS_TOKEN", "secret")
+    assert client.get("/diagnostics/profile", headers={"X-Diagnostics-Token": "wrong"}).status_code == 401
+    assert client.get("/diagnostics/profile?seconds=600", headers={"X-Diagnostics-Token": "secret"}).status_code == 400
+
+    response = client.get(
+        "/diagnostics/profile?seconds=0.1&interval_ms=2&format=json", headers={"Authorization": "Bearer secret"}
+    )
+    assert response.status_code == 200
+    assert response.json()["samples"] > 0
+
+    response = client.get("/diagnostics/slow-requests", headers={"X-Diagnostics-Token": "secret"})
+    assert response.status_code == 200
+    assert response.json()["threshold"] == 10
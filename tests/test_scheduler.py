@@ -0,0 +1,76 @@
+"""Tests for the auto-sync scheduler"""
+
+import asyncio
+
+import pytest
+
+from models.repository import RepositoryConfig
+from services.scheduler import SyncScheduler
+
+
+def _config(repository_id, auto_sync=True, sync_interval=1):
+    return RepositoryConfig(
+        id=repository_id,
+        name=repository_id,
+        url="file:///tmp/repo",
+        workspace_id="ws",
+        auto_sync=auto_sync,
+        sync_interval=sync_interval,
+    )
+
+
+def test_only_auto_sync_repositories_are_scheduled():
+    """Test that first runs are spread within one interval"""
+    configs = [_config("a"), _config("b", auto_sync=False)]
+    scheduler = SyncScheduler(lambda: configs, jitter=0)
+    scheduler.refresh(now=0)
+
+    assert list(scheduler._next_run) == ["a"]
+    assert 0 <= scheduler._next_run["a"] <= 60
+    assert scheduler.due(now=60) == ["a"]
+
+
+def test_skip_if_running_and_coalescing():
+    """Test skip-if-running semantics and coalescing of missed runs"""
+    scheduler = SyncScheduler(lambda: [_config("a")], jitter=0)
+    scheduler.refresh(now=0)
+    first = scheduler._next_run["a"]
+
+    assert scheduler.due(now=first) == ["a"]
+    assert scheduler._next_run["a"] == pytest.approx(first + 60)
+
+    # Still running when due again
+    scheduler._running.add("a")
+    assert scheduler.due(now=first + 60) == []
+    assert scheduler.stats["skipped"] == 1
+    scheduler._running.clear()
+
+    # Many intervals missed: one run, next run restarts from now
+    assert scheduler.due(now=first + 1000) == ["a"]
+    assert scheduler.stats["coalesced"] == 1
+    assert scheduler._next_run["a"] == pytest.approx(first + 1060)
+
+
+def test_concurrency_cap():
+    """Test that concurrent syncs never exceed the cap"""
+    active = 0
+    peak = 0
+
+    async def run_sync(config):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+
+    configs = [_config(str(i)) for i in range(10)]
+    scheduler = SyncScheduler(lambda: configs, run_sync=run_sync, max_concurrency=3)
+
+    async def main():
+        tasks = scheduler.run_due(now=0)
+        tasks += scheduler.run_due(now=120)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert peak == 3
+    assert scheduler.stats["completed"] == 10
@@ -0,0 +1,35 @@
+"""Tests for canonical export serialization"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from models.workflow import WorkflowExport
+from utils.serialization import canonical_export, canonical_json
+
+
+def test_canonical_json_key_order():
+    """Test that key order does not affect output"""
+    a = canonical_json({"b": 1, "a": {"y": 2, "x": 1}})
+    b = canonical_json({"a": {"x": 1, "y": 2}, "b": 1})
+    assert a == b
+    assert a.endswith("\n")
+    assert list(json.loads(a).keys()) == ["a", "b"]
+
+
+def test_canonical_json_numbers():
+    """Test stable number formatting"""
+    assert canonical_json({"n": 1.0}) == canonical_json({"n": 1})
+    assert json.loads(canonical_json({"n": 0.1}))["n"] == 0.1
+    with pytest.raises(ValueError):
+        canonical_json({"n": float("nan")})
+
+
+def test_canonical_export_omits_volatile_fields():
+    """Test that repeated exports of unchanged data are byte-identical"""
+    first = WorkflowExport(id="wf-1", name="Flow", data={"b": 1, "a": 2}, exported_at=datetime.utcnow())
+    second = WorkflowExport(id="wf-1", name="Flow", data={"a": 2, "b": 1}, exported_at=datetime.utcnow() + timedelta(hours=1))
+
+    assert canonical_export(first) == canonical_export(second)
+    assert "exported_at" not in json.loads(canonical_export(first))
@@ -0,0 +1,160 @@
+"""Tests for single-flight coalescing"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from utils.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_run():
+    """Test that calls made while one is in flight get its result"""
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"value": len(calls)}
+
+    async def main():
+        return await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert calls == [1]
+    assert results == [{"value": 1}] * 5
+    assert flight.stats == {"executed": 1, "joined": 4, "reused": 0}
+
+    # Nothing is reused without a window
+    asyncio.run(flight.do("key", work))
+    assert len(calls) == 2
+
+
+def test_calls_from_other_threads_join():
+    """Test that calls from separate event loops are coalesced"""
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    async def work():
+        started.set()
+        await asyncio.to_thread(release.wait)
+        return "done"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(asyncio.run(flight.do("key", work))))
+    leader.start()
+    started.wait()
+
+    follower = threading.Thread(target=lambda: results.append(asyncio.run(flight.do("key", work))))
+    follower.start()
+    while flight.stats["joined"] == 0:
+        time.sleep(0.001)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert results == ["done", "done"]
+    assert flight.stats["executed"] == 1
+
+
+def test_result_reused_within_window():
+    """Test that a recent result is reused until the window expires"""
+    now = [0.0]
+    flight = SingleFlight(reuse_window=2, clock=lambda: now[0])
+    calls = []
+
+    async def work():
+        calls.append(1)
+        return {"items": []}
+
+    first = asyncio.run(flight.do("key", work))
+    first["items"].append("modified")
+
+    now[0] = 1.5
+    assert asyncio.run(flight.do("key", work)) == {"items": []}
+    assert asyncio.run(flight.do("other", work)) == {"items": []}
+    assert len(calls) == 2
+
+    now[0] = 3.0
+    asyncio.run(flight.do("key", work))
+    assert len(calls) == 3
+
+
+def test_errors_are_shared_but_not_reused():
+    """Test that waiters get the error and the next call runs again"""
+    flight = SingleFlight(reuse_window=60)
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def main():
+        return await asyncio.gather(flight.do("key", work), flight.do("key", work), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert [str(result) for result in results] == ["boom", "boom"]
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(flight.do("key", work))
+    assert len(calls) == 2
+
+
+def test_cancelled_leader_does_not_cancel_joiners():
+    """Test that joiners still get the result when the caller running the work is cancelled"""
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        leader = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0)
+        joiner = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await joiner
+
+    assert asyncio.run(main()) == "done"
+    assert calls == [1]
+
+
+def test_joiners_retry_cancelled_work():
+    """Test that a joiner runs the work again when the work itself was cancelled"""
+    flight = SingleFlight()
+    started = threading.Event()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        started.set()
+        await asyncio.sleep(60 if len(calls) == 1 else 0)
+        return len(calls)
+
+    async def leader():
+        task = asyncio.create_task(flight.do("key", work))
+        while flight.stats["joined"] == 0:
+            await asyncio.sleep(0.001)
+        # Returning shuts the loop down, which cancels the work
+        return task
+
+    results = []
+    follower = threading.Thread(target=lambda: results.append(asyncio.run(flight.do("key", work))))
+    thread = threading.Thread(target=lambda: asyncio.run(leader()))
+    thread.start()
+    started.wait()
+    follower.start()
+    thread.join()
+    follower.join()
+
+    assert results == [2]
+    assert flight.stats["executed"] == 2
@@ -0,0 +1,41 @@
+"""Cold start budget: heavy dependencies load on first use"""
+
+from benchmarks.startup import BUDGET_MS, DEFERRED_MODULES, SCENARIOS, measure
+from services.auth_service import AuthService, _pbkdf2
+
+
+def test_startup_defers_heavy_dependencies_and_stays_in_budget():
+    """Test that running main.py skips GitPython, FastAPI, httpx and cryptography and stays under budget"""
+    result = measure("startup", SCENARIOS["startup"], repeat=3)
+
+    assert {"services.workspace_cache", "services.scheduler", "services.maintenance"} <= set(result.loaded)
+    assert not {name.split(".")[0] for name in result.loaded} & set(DEFERRED_MODULES)
+    assert result.deferred_loaded == []
+    assert result.import_ms <= BUDGET_MS, f"startup imports took {result.import_ms} ms (budget {BUDGET_MS:g} ms)"
+
+
+def test_package_imports_are_lazy():
+    """Test that importing a package does not import its submodules' dependencies"""
+    result = measure("packages", SCENARIOS["packages"], repeat=1)
+
+    loaded = {name.split(".")[0] for name in result.loaded}
+    assert result.deferred_loaded == []
+    assert not loaded & {"pydantic", *DEFERRED_MODULES}
+
+    from endpoint_handlers import bulk_router
+    from services import GitService
+
+    assert GitService.__name__ == "GitService"
+    assert bulk_router.routes
+
+
+def test_auth_service_derives_each_key_once():
+    """Test that services created per request share one key derivation"""
+    _pbkdf2.cache_clear()
+    encrypted = AuthService("per-request-key").encrypt_credentials({"token": "secret"})
+    assert AuthService("per-request-key").decrypt_credentials(encrypted) == {"token": "secret"}
+
+    assert _pbkdf2.cache_info().misses == 1
+    # Constructing a service alone does not run the KDF
+    AuthService("unused-key")
+    assert _pbkdf2.cache_info().misses == 1
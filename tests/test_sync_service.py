@@ -0,0 +1,356 @@
+"""Tests for the sync service"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from git import Repo
+
+import services.sync_service as sync_module
+from models.job import Job, JobStatus
+from models.repository import RepositoryConfig
+from models.sync import SyncStatus
+from services.git_service import GitService
+from services.state_store import SyncStateStore
+from services.sync_service import SyncService
+
+
+class FakeDifyClient:
+    """In-memory stand-in for DifyAPIClient"""
+
+    def __init__(self):
+        self.workflows = {"wf-1": {"id": "wf-1", "name": "Flow", "graph": {"nodes": []}}}
+        self.applications = {"app-1": {"id": "app-1", "name": "App", "mode": "chat"}}
+        self.calls = []
+
+    async def get_all_workflows(self):
+        return [{"id": key, "updated_at": data.get("updated_at")} for key, data in self.workflows.items()]
+
+    async def get_all_applications(self):
+        return [{"id": key, "updated_at": data.get("updated_at")} for key, data in self.applications.items()]
+
+    async def get_workflow(self, workflow_id):
+        self.calls.append(("get_workflow", workflow_id))
+        return dict(self.workflows[workflow_id])
+
+    async def get_application(self, app_id):
+        self.calls.append(("get_application", app_id))
+        return dict(self.applications[app_id])
+
+    async def update_workflow(self, workflow_id, data):
+        self.calls.append(("update_workflow", workflow_id))
+        self.workflows[workflow_id] = data
+        return data
+
+    async def update_application(self, app_id, data):
+        self.calls.append(("update_application", app_id))
+        self.applications[app_id] = data
+        return data
+
+
+def _setup(tmp_path):
+    origin = Repo.init(tmp_path / "origin", initial_branch="main")
+    (tmp_path / "origin" / "README.md").write_text("flows\n")
+    origin.index.add(["README.md"])
+    origin.index.commit("Initial commit")
+    Repo.clone_from(f"file://{tmp_path / 'origin'}", tmp_path / "git" / "repo-1")
+    config = RepositoryConfig(id="repo-1", name="Repo", url=f"file://{tmp_path / 'origin'}", workspace_id="ws")
+    store = SyncStateStore(db_path=tmp_path / "state.db")
+    sync_service = SyncService(GitService(temp_dir=str(tmp_path / "git")), FakeDifyClient(), store)
+    return config, store, sync_service
+
+
+def test_unchanged_objects_are_skipped(tmp_path):
+    """Test that export and import skip objects already synced"""
+    config, store, sync_service = _setup(tmp_path)
+
+    first = asyncio.run(sync_service.export_all(config))
+    assert first["success"]
+    assert not any(item.get("skipped") for item in first["workflows"] + first["applications"])
+
+    second = asyncio.run(sync_service.export_all(config))
+    assert all(item.get("skipped") for item in second["workflows"] + second["applications"])
+
+    sync_service.dify_client.calls.clear()
+    imported = asyncio.run(sync_service.import_all(config))
+    assert [item["action"] for item in imported["workflows"] + imported["applications"]] == ["unchanged", "unchanged"]
+    assert sync_service.dify_client.calls == []
+
+    forced = asyncio.run(sync_service.import_all(config, force=True))
+    assert [item["action"] for item in forced["workflows"]] == ["updated"]
+
+
+def test_sync_state_is_shared(tmp_path):
+    """Test that sync state persists across service instances"""
+    config, store, sync_service = _setup(tmp_path)
+
+    asyncio.run(sync_service.sync(config, "import"))
+
+    other = SyncService(sync_service.git_service, sync_service.dify_client, SyncStateStore(db_path=tmp_path / "state.db"))
+    state = other.get_sync_state("repo-1")
+    assert state.status == SyncStatus.COMPLETED
+    assert state.last_success is not None
+    assert state.sync_direction == "import"
+
+
+def test_stream_sync_events(tmp_path):
+    """Test that streamed syncs emit item events and a compact summary"""
+    config, store, sync_service = _setup(tmp_path)
+    asyncio.run(sync_service.export_all(config))
+
+    async def collect():
+        return [event async for event in sync_service.stream_sync(config, "import", stats_interval=0)]
+
+    events = asyncio.run(collect())
+    assert [event["event"] for event in events if event["event"] != "stats"] == ["start", "item", "item", "summary"]
+    assert any(event["event"] == "stats" for event in events)
+
+    summary = events[-1]
+    assert (summary["processed"], summary["skipped"], summary["failed"]) == (2, 2, 0)
+    assert "workflows" not in summary
+    assert store.get("repo-1").status == SyncStatus.COMPLETED
+
+
+def test_import_paths(tmp_path):
+    """Test that only the given paths are imported and missing ones are reported"""
+    config, store, sync_service = _setup(tmp_path)
+    exported = asyncio.run(sync_service.export_all(config))
+    workflow_path = exported["workflows"][0]["file_path"]
+
+    result = asyncio.run(sync_service.import_paths(config, [workflow_path, "applications/gone.json"]))
+    assert result["success"]
+    assert [item["action"] for item in result["workflows"]] == ["unchanged"]
+    assert result["applications"] == []
+    assert result["missing"] == ["applications/gone.json"]
+
+
+def test_incremental_export(tmp_path):
+    """Test that incremental exports only fetch objects updated since the mark"""
+    config, store, sync_service = _setup(tmp_path)
+    client = sync_service.dify_client
+    client.workflows["wf-1"]["updated_at"] = 100
+    client.applications["app-1"]["updated_at"] = 50
+
+    first = asyncio.run(sync_service.export_all(config, incremental=True))
+    assert first["mode"] == "full"
+    assert store.get_export_mark("repo-1", "ws")[0] == 100
+
+    client.calls.clear()
+    second = asyncio.run(sync_service.export_all(config, incremental=True))
+    assert second["mode"] == "incremental"
+    assert client.calls == [("get_workflow", "wf-1")]
+
+    client.calls.clear()
+    client.applications["app-1"]["updated_at"] = "1970-01-01T00:03:20Z"
+    asyncio.run(sync_service.export_all(config, incremental=True))
+    # Objects updated in the same second as the mark are fetched again
+    assert client.calls == [("get_workflow", "wf-1"), ("get_application", "app-1")]
+    assert store.get_export_mark("repo-1", "ws")[0] == 200
+
+    # The periodic full export leaves the files of objects deleted in Dify alone
+    workflow_path = first["workflows"][0]["file_path"]
+    del client.workflows["wf-1"]
+    store.save_export_mark("repo-1", "ws", 200, datetime(2000, 1, 1))
+    reconciled = asyncio.run(sync_service.export_all(config, incremental=True))
+    assert reconciled["mode"] == "full"
+    assert reconciled["workflows"] == []
+    assert (tmp_path / "git" / "repo-1" / workflow_path).exists()
+
+
+def test_prune_exports_removes_deleted_objects(tmp_path):
+    """Test that files of objects deleted in Dify are removed from the index, or only listed in a dry run"""
+    config, store, sync_service = _setup(tmp_path)
+    git_service = sync_service.git_service
+    exported = asyncio.run(sync_service.export_all(config))
+    repo = git_service.get_repo(config)
+    # Added in Git and never imported into Dify
+    (tmp_path / "git" / "repo-1" / "workflows" / "workflow-wf-9-New.json").write_text('{"id": "wf-9", "name": "New"}')
+    assert git_service.commit(repo, "Export")["success"]
+    app_path = exported["applications"][0]["file_path"]
+
+    del sync_service.dify_client.applications["app-1"]
+    assert asyncio.run(sync_service.export_all(config))["applications"] == []
+    assert (tmp_path / "git" / "repo-1" / app_path).exists()
+
+    dry_run = asyncio.run(sync_service.prune_exports(config, dry_run=True))
+    assert dry_run["applications"] == [{"success": True, "action": "would_delete", "file_path": app_path}]
+    assert dry_run["workflows"] == []
+    assert repo.git.status("--porcelain") == ""
+    assert store.get_object_hash("repo-1", "application:app-1") is not None
+
+    pruned = asyncio.run(sync_service.prune_exports(config))
+    assert pruned["success"]
+    assert pruned["applications"] == [{"success": True, "action": "deleted", "file_path": app_path}]
+    assert repo.git.diff("--cached", "--name-status") == f"D\t{app_path}"
+    assert "application:app-1" not in git_service.export_manifest(repo)
+    assert not (tmp_path / "git" / "repo-1" / app_path).exists()
+    assert store.get_object_hash("repo-1", "application:app-1") is None
+
+    # The unsynced workflow is kept, and nothing is left for import_all to bring back
+    assert (tmp_path / "git" / "repo-1" / "workflows" / "workflow-wf-9-New.json").exists()
+    assert asyncio.run(sync_service.import_all(config))["applications"] == []
+
+
+def test_failed_bare_commit_is_reported(tmp_path, monkeypatch):
+    """Test that exports into a bare clone fail when their commit fails, and are retried"""
+    Repo.init(tmp_path / "git" / "repo-1", bare=True)
+    config = RepositoryConfig(id="repo-1", name="Repo", url="file:///tmp/origin", workspace_id="ws", bare=True)
+    store = SyncStateStore(db_path=tmp_path / "state.db")
+    sync_service = SyncService(GitService(temp_dir=str(tmp_path / "git")), FakeDifyClient(), store)
+    monkeypatch.setattr(sync_service.git_service, "commit", lambda repo, message: {"success": False, "error": "boom"})
+
+    single = asyncio.run(sync_service.export_workflow(config, "wf-1"))
+    assert (single["success"], single["error"]) == (False, "boom")
+    assert store.get_object_hash("repo-1", "workflow:wf-1") is None
+
+    result = asyncio.run(sync_service.export_all(config))
+    assert not result["success"]
+    assert result["errors"] == ["Commit failed: boom"]
+    assert store.get_object_hash("repo-1", "application:app-1") is None
+
+
+def test_import_all_reports_unreadable_files(tmp_path):
+    """Test that a broken file or workflow directory fails only its own item"""
+    config, store, sync_service = _setup(tmp_path)
+    asyncio.run(sync_service.export_all(config))
+    root = tmp_path / "git" / "repo-1"
+    (root / "applications" / "app-broken.json").write_text("{not json")
+    (root / "workflows" / "workflow-empty" / "nodes").mkdir(parents=True)
+    (root / "workflows" / "workflow-empty" / "nodes" / "a.json").write_text("{}")
+    repo = sync_service.git_service.get_repo(config)
+    commit_hash = sync_service.git_service.commit(repo, "Add broken files")["commit_hash"]
+
+    from_tree = asyncio.run(sync_service.import_all(config))
+    assert [item["success"] for item in from_tree["applications"]] == [True, False]
+    assert [item["success"] for item in from_tree["workflows"]] == [True]
+
+    # Committed trees also list workflow directories without a skeleton
+    from_commit = asyncio.run(sync_service.import_all(config, rev=commit_hash))
+    assert [item["success"] for item in from_commit["applications"]] == [True, False]
+    assert [item["success"] for item in from_commit["workflows"]] == [False, True]
+    assert any("skeleton" in error for error in from_commit["errors"])
+
+
+def test_objects_record_their_commit(tmp_path):
+    """Test that exports into a bare clone and imports record the commit holding the object"""
+    Repo.init(tmp_path / "git" / "repo-1", bare=True)
+    config = RepositoryConfig(id="repo-1", name="Repo", url="file:///tmp/origin", workspace_id="ws", bare=True)
+    store = SyncStateStore(db_path=tmp_path / "state.db")
+    sync_service = SyncService(GitService(temp_dir=str(tmp_path / "git")), FakeDifyClient(), store)
+
+    exported = asyncio.run(sync_service.export_all(config))
+    assert store.get_object_commit("repo-1", "workflow:wf-1") == exported["commit_hash"]
+
+    single = asyncio.run(sync_service.export_application(config, "app-1"))
+    assert single["skipped"]
+    sync_service.dify_client.applications["app-1"]["mode"] = "workflow"
+    asyncio.run(sync_service.export_application(config, "app-1"))
+    repo = sync_service.git_service.get_repo(config)
+    assert store.get_object_commit("repo-1", "application:app-1") == repo.head.commit.hexsha != exported["commit_hash"]
+
+    asyncio.run(sync_service.import_all(config, rev=exported["commit_hash"], force=True))
+    assert store.get_object_commit("repo-1", "application:app-1") == exported["commit_hash"]
+
+
+def test_sync_errors_are_stored_separately(tmp_path):
+    """Test that a failed sync keeps its errors out of pending_changes"""
+    config, store, sync_service = _setup(tmp_path)
+    sync_service.dify_client.workflows["wf-1"] = None
+
+    asyncio.run(sync_service.sync(config, "export"))
+    state = store.get("repo-1")
+    assert state.status == SyncStatus.FAILED
+    assert state.pending_changes == []
+    assert state.errors and state.errors[0] == state.error_message
+
+
+def test_sync_is_incremental_only_on_request(tmp_path, monkeypatch):
+    """Test that syncs export everything unless an incremental sync is asked for"""
+    config, store, sync_service = _setup(tmp_path)
+    sync_service.dify_client.workflows["wf-1"]["updated_at"] = 100
+    sync_service.dify_client.applications["app-1"]["updated_at"] = 50
+    monkeypatch.setattr(sync_module._sync_flight, "reuse_window", 0)
+
+    def export_mode(**kwargs):
+        return asyncio.run(sync_service.sync(config, "export", **kwargs))["export"]["mode"]
+
+    assert export_mode() == "full"
+    assert export_mode(incremental=True) == "full"
+    assert export_mode() == "full"
+    assert export_mode(incremental=True) == "incremental"
+
+
+def test_stream_sync_shares_flight_and_cleans_up(tmp_path, monkeypatch):
+    """Test that streamed syncs coalesce with sync() and leave no IN_PROGRESS state behind"""
+    config, store, sync_service = _setup(tmp_path)
+    monkeypatch.setattr(sync_module._sync_flight, "reuse_window", 0)
+
+    async def joined():
+        stream = sync_service.stream_sync(config, "export", stats_interval=0)
+        assert (await stream.__anext__())["event"] == "pull"
+        regular = asyncio.create_task(sync_service.sync(config, "export"))
+        await asyncio.sleep(0)
+        with pytest.raises(Exception, match="already running"):
+            await sync_service.stream_sync(config, "export").__anext__()
+        events = [event async for event in stream]
+        return events, await regular
+
+    events, results = asyncio.run(joined())
+    assert events[-1]["event"] == "summary"
+    assert results == {"export": {"success": True, "errors": []}}
+    assert store.get("repo-1").status == SyncStatus.COMPLETED
+
+    async def disconnected():
+        stream = sync_service.stream_sync(config, "export", stats_interval=0)
+        await stream.__anext__()
+        await stream.aclose()
+
+    asyncio.run(disconnected())
+    state = store.get("repo-1")
+    assert (state.status, state.error_message) == (SyncStatus.FAILED, "Sync cancelled")
+    # The flight was released
+    assert asyncio.run(sync_service.sync(config, "export"))["export"]["success"]
+
+
+def test_failed_pull_stops_sync(tmp_path):
+    """Test that nothing is exported into a clone that could not be updated"""
+    config, store, sync_service = _setup(tmp_path)
+    config.url = f"file://{tmp_path / 'gone'}"
+    Repo(tmp_path / "git" / "repo-1").remote("origin").set_url(config.url)
+
+    results = asyncio.run(sync_service.sync(config, "export"))
+    assert list(results) == ["pull"] and not results["pull"]["success"]
+    assert sync_service.dify_client.calls == []
+    assert store.get("repo-1").status == SyncStatus.FAILED
+
+    async def stream():
+        return [event async for event in sync_service.stream_sync(config, "bidirectional")]
+
+    assert [event["event"] for event in asyncio.run(stream())] == ["pull"]
+    assert sync_service.dify_client.calls == []
+
+
+def test_active_job_progress_is_shown(tmp_path, monkeypatch):
+    """Test that a running sync job's progress is shown over the stored state"""
+    monkeypatch.setattr(sync_module._sync_flight, "reuse_window", 0)
+    config, store, sync_service = _setup(tmp_path)
+    asyncio.run(sync_service.sync(config, "export"))
+    last_success = store.get("repo-1").last_success
+
+    finished = Job(id="job-1", kind="sync", repository_id="repo-1", status=JobStatus.COMPLETED, result={"success": True})
+    assert sync_service.current_sync_state("repo-1", [finished]) == store.get("repo-1")
+
+    running = Job(
+        id="job-2",
+        kind="sync",
+        repository_id="repo-1",
+        status=JobStatus.RUNNING,
+        params={"direction": "export"},
+        completed=1,
+        total=2,
+        message="Exported wf-1",
+        started_at=datetime.utcnow(),
+    )
+    state = sync_service.current_sync_state("repo-1", [running, finished])
+    assert (state.status, state.job_id, state.last_success) == (SyncStatus.IN_PROGRESS, "job-2", last_success)
+    assert state.progress == {"completed": 1, "total": 2, "message": "Exported wf-1"}
@@ -0,0 +1,101 @@
+"""Tests for tracing spans"""
+
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from git import Repo
+
+from models.repository import RepositoryConfig
+from services.git_service import GitService, _git_subcommand
+from utils.tracing import NOOP_SPAN, TRACER, ConsoleExporter, InMemoryExporter, propagate, span, traced, traceparent
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    exporter = InMemoryExporter()
+    monkeypatch.setattr(TRACER, "exporter", exporter)
+    return exporter
+
+
+def test_spans_propagate_through_tasks_and_threads(exporter):
+    """Test parent links across asyncio tasks and thread-pool offloads"""
+
+    @traced("child")
+    async def child(index):
+        await asyncio.sleep(0)
+        return index
+
+    def blocking():
+        with span("in-thread"):
+            pass
+
+    async def main():
+        with span("root", {"repository.id": "repo"}):
+            await asyncio.gather(child(1), child(2))
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                await asyncio.get_running_loop().run_in_executor(executor, propagate(blocking))
+            with pytest.raises(ValueError):
+                with span("failing"):
+                    raise ValueError("boom")
+
+    asyncio.run(main())
+
+    spans = {s.name: s for s in exporter.spans}
+    root = spans["root"]
+    assert root.parent_id is None and root.attributes == {"repository.id": "repo"}
+    assert [s.parent_id for s in exporter.spans if s.name == "child"] == [root.span_id, root.span_id]
+    assert spans["in-thread"].parent_id == root.span_id
+    assert spans["in-thread"].thread != root.thread
+    assert spans["failing"].status == "ERROR"
+    assert {s.trace_id for s in exporter.spans} == {root.trace_id}
+
+
+def test_disabled_tracer_is_a_no_op():
+    """Test that nothing is recorded without an exporter"""
+    assert not TRACER.enabled
+    with span("ignored") as current:
+        assert current is NOOP_SPAN
+        assert traceparent() is None
+
+
+def test_git_commands_are_traced(tmp_path, exporter):
+    """Test that git subprocesses get spans without exposing URLs"""
+    origin = Repo.init(tmp_path / "origin", initial_branch="main")
+    (tmp_path / "origin" / "README.md").write_text("hello\n")
+    origin.index.add(["README.md"])
+    origin.index.commit("Initial commit")
+
+    git_service = GitService(temp_dir=str(tmp_path / "git"))
+    config = RepositoryConfig(id="repo", name="repo", url=f"file://{tmp_path / 'origin'}", workspace_id="ws")
+    with span("connect"):
+        repo = git_service.clone_repository(config)
+        git_service.get_branches(repo)
+
+    names = [s.name for s in exporter.spans]
+    assert "git clone" in names
+    assert "git checkout" in names
+    connect = next(s for s in exporter.spans if s.name == "connect")
+    assert all(s.parent_id == connect.span_id for s in exporter.spans if s.name.startswith("git "))
+
+    assert _git_subcommand(["git", "-c", "http.extraHeader=secret", "clone", "https://token@host/repo.git"]) == "clone"
+
+
+def test_console_export_and_traceparent(tmp_path):
+    """Test OTLP-style JSON lines and continuing a remote trace"""
+    path = tmp_path / "traces.jsonl"
+    with open(path, "w") as stream:
+        TRACER.exporter = ConsoleExporter(stream)
+        try:
+            remote = "00-" + "a" * 32 + "-" + "b" * 16 + "-01"
+            with TRACER.continue_trace(remote), span("handler"):
+                assert traceparent().startswith("00-" + "a" * 32 + "-")
+        finally:
+            TRACER.exporter = None
+
+    record = json.loads(path.read_text())
+    assert record["name"] == "handler"
+    assert record["traceId"] == "a" * 32
+    assert record["parentSpanId"] == "b" * 16
+    assert record["endTimeUnixNano"] >= record["startTimeUnixNano"]
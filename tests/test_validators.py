@@ -1,8 +1,18 @@
 """Tests for validators"""
 
+import subprocess
+from pathlib import Path
+
 import pytest
 
-from utils.validators import sanitize_filename, validate_branch_name, validate_repository_url
+from utils.validators import (
+    sanitize_filename,
+    validate_branch_name,
+    validate_file_path,
+    validate_many,
+    validate_ref_name,
+    validate_repository_url,
+)
 
 
 def test_validate_repository_url():
@@ -42,3 +52,33 @@ def test_sanitize_filename():
     assert sanitize_filename("workflow/123") == "workflow_123"
     assert sanitize_filename("  workflow  ") == "workflow"
     assert sanitize_filename(".workflow") == "workflow"
+
+
+@pytest.mark.parametrize(
+    "name",
+    ["main", "feature/x", "a@b", "a{b", "v1.0", "a/-b", "é", "a..b", "a@{b", "a/.b", ".a", "a.lock", "a.lock/b", "a/"]
+    + ["/a", "a//b", "a.", "a b", "a~b", "a^b", "a:b", "a?b", "a*b", "a[b", "a\\b", "a\x01b", "a\x7fb", "HEAD", ".."],
+)
+def test_validate_branch_name_matches_git(name):
+    """Test branch validation against git check-ref-format --branch"""
+    git_accepts = subprocess.run(["git", "check-ref-format", "--branch", name], capture_output=True).returncode == 0
+    assert validate_branch_name(name) == git_accepts
+    assert validate_ref_name(name) == (git_accepts or name == "HEAD")
+
+
+def test_validate_file_path_compares_components(tmp_path):
+    """Test that a sibling directory sharing the base's prefix is outside it"""
+    base = tmp_path / "repo"
+    base.mkdir()
+    assert validate_file_path("workflows/a.json", base)
+    assert not validate_file_path("../repo-2/a.json", base)
+    assert not validate_file_path("../../etc/passwd", base)
+
+
+def test_validate_many():
+    """Test that bulk validation returns one result per value, in order"""
+    assert validate_many(["main", "bad name", "release/v1"], "branch") == [True, False, True]
+    assert validate_many(["https://github.com/a/b.git", "ftp://x"], "url") == [True, False]
+    assert validate_many(["a.json", "../b.json"], "path", Path("/srv/repo")) == [True, False]
+    with pytest.raises(ValueError):
+        validate_many(["a.json"], "path")
@@ -0,0 +1,149 @@
+"""Tests for push webhook handling"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+from pathlib import Path
+
+import pytest
+
+import endpoint_handlers.webhooks as webhooks
+from models.repository import RepositoryConfig
+from services.webhook_service import WebhookService
+from utils.validators import normalize_repository_url
+
+FIXTURES = Path(__file__).parent / "fixtures" / "webhooks"
+SECRET = "s3cret"
+
+
+def _fixture(name):
+    return (FIXTURES / f"{name}.json").read_bytes()
+
+
+def _github_headers(body, secret=SECRET):
+    signature = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return {"X-GitHub-Event": "push", "X-Hub-Signature-256": f"sha256={signature}"}
+
+
+def _config(repository_id, url, branch="main"):
+    return RepositoryConfig(id=repository_id, name=repository_id, url=url, branch=branch, workspace_id="ws")
+
+
+def test_parse_push_fixtures():
+    """Test that every provider's payload yields the pushed ref, URLs and paths"""
+    service = WebhookService()
+
+    github = service.parse_push("github", json.loads(_fixture("github_push")))
+    assert github.branch == "main"
+    assert github.complete and not github.deleted
+    assert "workflows/wf-3_legacy.json" in github.changed_paths
+
+    gitlab = service.parse_push("gitlab", json.loads(_fixture("gitlab_push")))
+    assert gitlab.branch == "develop"
+    assert gitlab.changed_paths == ["applications/app-9_onboarding.json", "docs/notes.md"]
+
+    gitea = service.parse_push("gitea", json.loads(_fixture("gitea_push")))
+    assert gitea.changed_paths == ["workflows/wf-7_summary.json"]
+
+    truncated = json.loads(_fixture("gitlab_push"))
+    truncated["total_commits_count"] = 40
+    assert not service.parse_push("gitlab", truncated).complete
+
+
+def test_verify_signature():
+    """Test GitHub and Gitea HMAC signatures and the GitLab token"""
+    service = WebhookService()
+    body = _fixture("github_push")
+
+    assert service.verify_signature("github", _github_headers(body), body, SECRET)
+    assert not service.verify_signature("github", _github_headers(body, "wrong"), body, SECRET)
+    assert not service.verify_signature("github", _github_headers(body), body + b" ", SECRET)
+
+    signature = hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()
+    assert service.verify_signature("gitea", {"X-Gitea-Signature": signature}, body, SECRET)
+    assert service.verify_signature("gitlab", {"X-Gitlab-Token": SECRET}, body, SECRET)
+    assert not service.verify_signature("gitlab", {}, body, SECRET)
+
+
+def test_sync_paths_and_matching():
+    """Test that changed files map to importable paths and repositories match by URL"""
+    service = WebhookService()
+    event = service.parse_push("github", json.loads(_fixture("github_push")))
+
+    assert service.sync_paths(event.changed_paths) == [
+        "workflows/wf-2_triage.json",
+        "applications/app-1_support-bot.json",
+        "workflows/wf-1_rag",
+        "workflows/wf-3_legacy.json",
+    ]
+
+    configs = [
+        _config("ssh", "git@github.com:Octo-Org/dify-flows.git"),
+        _config("https", "https://github.com/octo-org/dify-flows"),
+        _config("other-branch", "https://github.com/octo-org/dify-flows.git", branch="develop"),
+        _config("other-repo", "https://github.com/octo-org/other.git"),
+    ]
+    assert [config.id for config in service.match_repositories(event, configs)] == ["ssh", "https"]
+
+    assert normalize_repository_url("ssh://git@gitea.example.com:2222/team/flows.git") == "gitea.example.com/team/flows"
+
+
+@pytest.fixture
+def submitted(monkeypatch):
+    jobs = []
+
+    def submit_job(kind, repository_id, params):
+        jobs.append((kind, repository_id, params))
+        return {"success": True, "job_id": f"job-{len(jobs)}"}
+
+    monkeypatch.setattr(webhooks, "submit_job", submit_job)
+    monkeypatch.setattr(webhooks, "repositories", {})
+    monkeypatch.setenv("PLUGIN_WEBHOOK_SECRET", SECRET)
+    return jobs
+
+
+def test_push_webhook_queues_incremental_import(submitted):
+    """Test that a verified push queues an import of only the changed paths"""
+    webhooks.repositories["repo-1"] = _config("repo-1", "https://github.com/octo-org/dify-flows.git")
+    body = _fixture("github_push")
+
+    status, result = webhooks.handle_push_webhook(_github_headers(body, "wrong"), body)
+    assert status == 401
+    assert submitted == []
+
+    # Untracked branches get the same answer as a bad signature
+    payload = json.loads(body)
+    payload["ref"] = "refs/heads/untracked"
+    untracked = json.dumps(payload).encode()
+    assert webhooks.handle_push_webhook(_github_headers(untracked), untracked) == (status, result)
+
+    status, result = webhooks.handle_push_webhook(_github_headers(body), body)
+    assert status == 200
+    assert [job["job_id"] for job in result["jobs"]] == ["job-1"]
+    kind, repository_id, params = submitted[0]
+    assert (kind, repository_id) == ("import_paths", "repo-1")
+    assert "workflows/wf-1_rag" in params["paths"]
+
+    # A new branch does not list every change, so everything is imported
+    payload = json.loads(body)
+    payload["before"] = "0" * 40
+    body = json.dumps(payload).encode()
+    webhooks.handle_push_webhook(_github_headers(body), body)
+    assert submitted[1][0] == "import_all"
+    assert submitted[1][2]["pull"]
+
+
+def test_import_all_job_pulls_first(monkeypatch):
+    """Test that webhook-triggered full imports pull the push before importing"""
+    from endpoint_handlers import sync
+    from models.job import Job
+
+    config = _config("repo-1", "https://github.com/octo-org/dify-flows.git")
+    monkeypatch.setitem(sync.repositories, config.id, config)
+    pulled = []
+    monkeypatch.setattr(sync, "_pull_for_job", lambda service, cfg: pulled.append(cfg.id) or {"success": False, "error": "x"})
+
+    job = Job(id="job-1", kind="import_all", repository_id=config.id, params={"pull": True})
+    assert asyncio.run(sync._run_import_all_job(job, None)) == {"success": False, "error": "x"}
+    assert pulled == ["repo-1"]
@@ -0,0 +1,48 @@
+"""Tests for the exploded workflow layout"""
+
+from git import Repo
+
+from models.workflow import WorkflowExport
+from services.git_service import GitService
+from utils.workflow_layout import assemble_workflow, explode_workflow
+
+
+def _workflow_data():
+    return {
+        "id": "wf-1",
+        "graph": {
+            "nodes": [{"id": "start", "data": {"type": "start"}}, {"id": "llm/1", "data": {"prompt": "Hello"}}],
+            "edges": [{"source": "start", "target": "llm/1"}],
+        },
+    }
+
+
+def test_explode_and_assemble_round_trip():
+    """Test that an exploded workflow reassembles to the original document"""
+    document = {"id": "wf-1", "name": "Flow", "data": _workflow_data()}
+    files = explode_workflow(document)
+
+    assert set(files) == {"workflow.json", "nodes/start.json", "nodes/llm_1.json"}
+    assert files["workflow.json"]["data"]["graph"]["nodes"][0] == {"$ref": "nodes/start.json"}
+
+    node_files = {path: content for path, content in files.items() if path != "workflow.json"}
+    assert assemble_workflow(files["workflow.json"], node_files) == document
+
+
+def test_git_service_exploded_export_and_import(tmp_path):
+    """Test exporting and importing a workflow in the exploded layout"""
+    repo = Repo.init(tmp_path / "repo")
+    git_service = GitService(temp_dir=str(tmp_path / "git"))
+    workflow = WorkflowExport(id="wf-1", name="Flow", data=_workflow_data())
+
+    path = git_service.export_workflow(repo, workflow, layout="exploded")
+    assert path == "workflows/workflow-wf-1-Flow"
+    assert git_service.list_exported_files(repo)["workflows"] == [path]
+
+    data = git_service.import_workflow(repo, path)
+    assert data["data"] == workflow.data
+
+    # Removing a node removes its file
+    workflow.data["graph"]["nodes"].pop()
+    git_service.export_workflow(repo, workflow, layout="exploded")
+    assert not (tmp_path / "repo" / path / "nodes" / "llm_1.json").exists()
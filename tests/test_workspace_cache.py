@@ -0,0 +1,106 @@
+"""Tests for the workspace cache"""
+
+import os
+
+from git import Repo
+
+from models.repository import RepositoryConfig
+from models.workflow import WorkflowExport
+from services.git_service import GitService
+from services.workspace_cache import WorkspaceCache
+
+
+def _origin(tmp_path):
+    origin = Repo.init(tmp_path / "origin", initial_branch="main")
+    (tmp_path / "origin" / "README.md").write_text("hello\n" * 1000)
+    origin.index.add(["README.md"])
+    origin.index.commit("Initial commit")
+    return f"file://{tmp_path / 'origin'}"
+
+
+def _clone(git_service, repository_id, url):
+    config = RepositoryConfig(id=repository_id, name=repository_id, url=url, workspace_id="ws")
+    git_service.clone_repository(config)
+    config.local_path = str(git_service.temp_dir / repository_id)
+    return config
+
+
+def _age(cache, repository_id, seconds):
+    marker = cache._marker(repository_id)
+    timestamp = marker.stat().st_mtime - seconds
+    os.utime(marker, (timestamp, timestamp))
+
+
+def test_lru_eviction_within_quota(tmp_path):
+    """Test that the least recently used clean clones are evicted and re-cloned lazily"""
+    url = _origin(tmp_path)
+    git_service = GitService(temp_dir=str(tmp_path / "git"))
+    configs = [_clone(git_service, f"repo-{i}", url) for i in range(3)]
+
+    cache = WorkspaceCache(tmp_path / "git", min_idle_seconds=60)
+    size = cache.disk_usage("repo-0")
+    cache.quota_bytes = size * 2
+
+    _age(cache, "repo-0", 3000)
+    _age(cache, "repo-1", 2000)
+    _age(cache, "repo-2", 1000)
+
+    # Uncommitted changes are never evicted
+    (tmp_path / "git" / "repo-0" / "README.md").write_text("changed\n")
+    assert cache.enforce() == ["repo-1"]
+    assert cache.repository_ids() == ["repo-0", "repo-2"]
+
+    repo = git_service.get_repo(configs[1])
+    assert repo.head.commit.message == "Initial commit"
+    assert "repo-1" in cache.repository_ids()
+
+
+def test_unpushed_commits_and_idle_eviction(tmp_path):
+    """Test idle eviction skips clones with unpushed commits"""
+    url = _origin(tmp_path)
+    git_service = GitService(temp_dir=str(tmp_path / "git"))
+    _clone(git_service, "pushed", url)
+    config = _clone(git_service, "unpushed", url)
+
+    repo = git_service.get_repo(config)
+    (tmp_path / "git" / "unpushed" / "new.txt").write_text("new\n")
+    git_service.commit(repo, "Local commit")
+
+    cache = WorkspaceCache(tmp_path / "git", idle_seconds=3600)
+    _age(cache, "pushed", 7200)
+    _age(cache, "unpushed", 7200)
+    assert cache.enforce() == ["pushed"]
+
+
+def test_cleanup_orphans(tmp_path):
+    """Test that partial clones, non-repositories and disconnected clones are removed"""
+    url = _origin(tmp_path)
+    git_service = GitService(temp_dir=str(tmp_path / "git"))
+    _clone(git_service, "kept", url)
+    _clone(git_service, "disconnected", url)
+    (tmp_path / "git" / "interrupted.partial").mkdir()
+    (tmp_path / "git" / "junk").mkdir()
+
+    cache = WorkspaceCache(tmp_path / "git")
+    assert sorted(cache.cleanup_orphans()) == ["interrupted.partial", "junk"]
+    assert cache.cleanup_orphans(known_ids=["kept"]) == ["disconnected"]
+    assert cache.repository_ids() == ["kept"]
+
+
+def test_bare_clone_eviction_follows_pushes(tmp_path):
+    """Test that bare clones are evictable once their export commits are pushed"""
+    _origin(tmp_path)
+    Repo(tmp_path / "origin").clone(tmp_path / "origin.git", bare=True)
+    git_service = GitService(temp_dir=str(tmp_path / "git"))
+    config = RepositoryConfig(id="bare", name="bare", url=f"file://{tmp_path / 'origin.git'}", workspace_id="ws", bare=True)
+    repo = git_service.clone_repository(config)
+
+    cache = WorkspaceCache(tmp_path / "git")
+    assert cache.is_evictable("bare")
+
+    git_service.export_workflow(repo, WorkflowExport(id="wf-1", name="Flow", data={}))
+    assert git_service.commit(repo, "Export")["success"]
+    assert not cache.is_evictable("bare")
+
+    assert git_service.push(repo)["success"]
+    assert cache.is_evictable("bare")
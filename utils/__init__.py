@@ -1,8 +1,13 @@
 """Utility functions for Git Integration Plugin"""
 
-from .encryption import decrypt_data, encrypt_data
-from .logging import setup_logging
-from .validators import sanitize_filename, validate_branch_name, validate_repository_url
+from typing import TYPE_CHECKING
+
+from .lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .encryption import decrypt_data, encrypt_data
+    from .logging import setup_logging
+    from .validators import sanitize_filename, validate_branch_name, validate_repository_url
 
 __all__ = [
     "encrypt_data",
@@ -12,3 +17,16 @@ __all__ = [
     "sanitize_filename",
     "setup_logging",
 ]
+
+# Imported on first access so that e.g. utils.locks does not load cryptography
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "encrypt_data": ".encryption",
+        "decrypt_data": ".encryption",
+        "validate_repository_url": ".validators",
+        "validate_branch_name": ".validators",
+        "sanitize_filename": ".validators",
+        "setup_logging": ".logging",
+    },
+)
@@ -0,0 +1,129 @@
+"""Mapping of exported objects to their repository paths
+
+Exports are named after the object's id, name or both. Names are not unique
+in Dify, so two objects can map to the same file; the manifest records which
+object owns each path so collisions are detected and a renamed object's old
+file can be moved instead of left behind. It is stored at the repository
+root, outside the directories that are imported.
+"""
+
+import json
+import re
+from functools import lru_cache
+from typing import Dict, Iterator, Optional, Tuple
+
+MANIFEST_FILE = ".dify-export.json"
+MANIFEST_VERSION = 1
+
+# Directory and file name prefix per object kind
+EXPORT_PREFIXES = {"workflow": ("workflows", "workflow"), "application": ("applications", "app")}
+
+_UNSAFE_NAME_CHARS = re.compile(r"[^\w \-]")
+
+
+@lru_cache(maxsize=4096)
+def safe_name(name: str) -> str:
+    """Reduce an object name to letters, digits, spaces, dashes and underscores"""
+    return _UNSAFE_NAME_CHARS.sub("", name).strip()
+
+
+def export_stem(kind: str, object_id: str, name: str, file_naming: str = "id-name") -> str:
+    """Preferred repository path of an export, without extension"""
+    directory, prefix = EXPORT_PREFIXES[kind]
+    if file_naming == "id":
+        return f"{directory}/{prefix}-{object_id}"
+    elif file_naming == "name":
+        # Objects whose name has no usable characters are named by id
+        return f"{directory}/{prefix}-{safe_name(name) or object_id}"
+    else:  # id-name
+        return f"{directory}/{prefix}-{object_id}-{safe_name(name)}"
+
+
+def object_key(kind: str, object_id: str) -> str:
+    return f"{kind}:{object_id}"
+
+
+def path_stem(path: str) -> str:
+    """A path without its ``.json`` extension (exploded workflows are directories)"""
+    return path[:-5] if path.endswith(".json") else path
+
+
+class ExportManifest:
+    """Object key (``kind:id``) to repository path of every exported object
+
+    Paths are claimed by stem and compared case-insensitively, so a file and
+    an exploded directory of the same object, or names differing only in
+    case (which clash on macOS and Windows checkouts), count as one path.
+    """
+
+    def __init__(self, objects: Optional[Dict[str, str]] = None):
+        self._objects: Dict[str, str] = {}
+        self._owners: Dict[str, str] = {}
+        self.dirty = False
+        for key, path in (objects or {}).items():
+            self._set(key, path)
+
+    @classmethod
+    def from_json(cls, data: bytes) -> "ExportManifest":
+        document = json.loads(data)
+        if document.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported export manifest version: {document.get('version')}")
+        return cls(document.get("objects", {}))
+
+    def to_document(self) -> Dict[str, object]:
+        return {"version": MANIFEST_VERSION, "objects": dict(self._objects)}
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._objects
+
+    def items(self, kind: Optional[str] = None) -> Iterator[Tuple[str, str]]:
+        """(key, path) of every object, or of one kind"""
+        for key, path in self._objects.items():
+            if kind is None or key.partition(":")[0] == kind:
+                yield key, path
+
+    def path_of(self, key: str) -> Optional[str]:
+        return self._objects.get(key)
+
+    def owner_of(self, path: str) -> Optional[str]:
+        """Key of the object holding ``path`` (with or without extension)"""
+        return self._owners.get(path_stem(path).casefold())
+
+    def resolve(self, key: str, stem: str, is_free=None) -> str:
+        """Stem to write ``key`` to, given its preferred ``stem``
+
+        The object already holding a stem keeps it; any other object wanting
+        it gets its id appended. ``is_free(stem)`` can veto stems that are
+        not in the manifest but are taken in the repository.
+        """
+        owner = self.owner_of(stem)
+        if owner == key or (owner is None and (is_free is None or is_free(stem))):
+            return stem
+        return f"{stem}-{key.partition(':')[2]}"
+
+    def assign(self, key: str, path: str) -> Optional[str]:
+        """Record ``key`` at ``path``, returning its previous path if it moved"""
+        previous = self._objects.get(key)
+        if previous == path:
+            return None
+        self._set(key, path)
+        self.dirty = True
+        return previous
+
+    def forget(self, key: str) -> Optional[str]:
+        """Drop ``key``, returning the path it had"""
+        path = self._objects.pop(key, None)
+        if path is not None:
+            self._owners.pop(path_stem(path).casefold(), None)
+            self.dirty = True
+        return path
+
+    def _set(self, key: str, path: str) -> None:
+        previous = self._objects.get(key)
+        if previous is not None:
+            self._owners.pop(path_stem(previous).casefold(), None)
+        self._objects[key] = path
+        self._owners[path_stem(path).casefold()] = key
@@ -0,0 +1,34 @@
+"""Lazily imported package exports
+
+Package ``__init__`` modules re-export names from their submodules. Importing
+all of those eagerly means ``import services.scheduler`` also loads GitPython,
+httpx and cryptography; with ``lazy_exports`` a name's submodule is only
+imported when the name is first accessed (PEP 562).
+"""
+
+import importlib
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """Module ``__getattr__`` and ``__dir__`` for ``package``
+
+    ``exports`` maps each exported name to ``".submodule"`` (same attribute
+    name) or ``".submodule:attribute"``.
+    """
+    namespace = importlib.import_module(package).__dict__
+
+    def __getattr__(name: str) -> Any:
+        target = exports.get(name)
+        if target is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        module_name, _, attribute = target.partition(":")
+        value = getattr(importlib.import_module(module_name, package), attribute or name)
+        # Later lookups find the name directly without going through __getattr__
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(exports))
+
+    return __getattr__, __dir__
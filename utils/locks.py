@@ -0,0 +1,29 @@
+"""Per-repository locks"""
+
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+_locks: Dict[str, threading.RLock] = {}
+_locks_lock = threading.Lock()
+
+
+def repository_lock(repository_id: str) -> threading.RLock:
+    """Get the process-wide lock guarding a repository's clone on disk"""
+    with _locks_lock:
+        lock = _locks.get(repository_id)
+        if lock is None:
+            lock = _locks[repository_id] = threading.RLock()
+        return lock
+
+
+@contextmanager
+def try_repository_lock(repository_id: str) -> Iterator[bool]:
+    """Acquire a repository's lock without waiting; yields whether it was acquired"""
+    lock = repository_lock(repository_id)
+    acquired = lock.acquire(blocking=False)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            lock.release()
@@ -0,0 +1,293 @@
+"""Prometheus-style metrics
+
+A small in-process registry of counters, gauges and histograms rendered in
+the Prometheus text exposition format by ``GET /metrics``. Collection is
+turned on with ``PLUGIN_METRICS_ENABLED``; while it is off every update
+returns immediately, so instrumented code pays only an attribute check.
+"""
+
+import asyncio
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from a cached lookup to a large clone
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """A named metric with a fixed set of label names"""
+
+    type = "untyped"
+
+    def __init__(self, registry: "Registry", name: str, documentation: str, labels: Sequence[str] = ()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if labels.keys() != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def value(self, **labels) -> Any:
+        """Current value for a label set (for tests and diagnostics)"""
+        with self._lock:
+            return self._values.get(self._key(labels))
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        """Yield (name suffix, formatted labels, value) for every series"""
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in sorted(items):
+            yield "", _format_labels(self.label_names, key), value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_inprogress(self, **labels) -> Iterator[None]:
+        """Count the block as in progress while it runs"""
+        # Decided once so the decrement always matches the increment
+        enabled = self.registry.enabled
+        if enabled:
+            self.inc(**labels)
+        try:
+            yield
+        finally:
+            if enabled:
+                self.dec(**labels)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, registry, name, documentation, labels=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                # Per-bucket (non-cumulative) counts, then sum and count
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the duration of the block"""
+        if not self.registry.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        with self._lock:
+            items = [(key, (list(series[0]), series[1], series[2])) for key, series in self._values.items()]
+        for key, (counts, total, count) in sorted(items):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                yield "_bucket", _format_labels(self.label_names, key, ("le", le)), cumulative
+            yield "_sum", _format_labels(self.label_names, key), total
+            yield "_count", _format_labels(self.label_names, key), count
+
+
+class Registry:
+    """A set of metrics rendered together"""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, documentation: str, labels: Sequence[str], **kwargs) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(self, name, documentation, labels, **kwargs)
+            elif not isinstance(metric, cls) or metric.label_names != tuple(labels):
+                raise ValueError(f"Metric {name} is already registered with a different type or labels")
+            return metric
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labels)
+
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labels)
+
+    def histogram(
+        self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labels, buckets=buckets)
+
+    def clear(self) -> None:
+        """Reset every series (metrics stay registered)"""
+        for metric in list(self._metrics.values()):
+            metric.clear()
+
+    def render(self) -> str:
+        """The registry in the Prometheus text exposition format"""
+        lines: List[str] = []
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _failed(result: Any) -> bool:
+    # Most service methods report failures as {"success": False, ...} instead of raising
+    return isinstance(result, dict) and result.get("success") is False
+
+
+def timed(
+    histogram: Histogram, errors: Optional[Counter] = None, is_error: Callable[[Any], bool] = _failed, **labels
+) -> Callable[[Callable], Callable]:
+    """Decorator observing a function's latency, and counting raised errors and results ``is_error`` rejects"""
+
+    def record(started: float, failed: bool) -> None:
+        histogram.observe(time.perf_counter() - started, **labels)
+        if failed and errors is not None:
+            errors.inc(**labels)
+
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            return _timed_async(func, histogram.registry, is_error, record)
+        return _timed_sync(func, histogram.registry, is_error, record)
+
+    return decorator
+
+
+def _timed_sync(func: Callable, registry: Registry, is_error: Callable[[Any], bool], record: Callable) -> Callable:
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not registry.enabled:
+            return func(*args, **kwargs)
+        started, failed = time.perf_counter(), True
+        try:
+            result = func(*args, **kwargs)
+            failed = is_error(result)
+            return result
+        finally:
+            record(started, failed)
+
+    return wrapper
+
+
+def _timed_async(func: Callable, registry: Registry, is_error: Callable[[Any], bool], record: Callable) -> Callable:
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        if not registry.enabled:
+            return await func(*args, **kwargs)
+        started, failed = time.perf_counter(), True
+        try:
+            result = await func(*args, **kwargs)
+            failed = is_error(result)
+            return result
+        finally:
+            record(started, failed)
+
+    return wrapper
+
+
+REGISTRY = Registry(enabled=os.getenv("PLUGIN_METRICS_ENABLED", "false").lower() in ("1", "true", "yes"))
+
+GIT_OPERATION_SECONDS = REGISTRY.histogram(
+    "dify_git_operation_duration_seconds", "Duration of GitService operations", ["operation"]
+)
+GIT_OPERATION_ERRORS = REGISTRY.counter("dify_git_operation_errors_total", "Failed GitService operations", ["operation"])
+GIT_BYTES_WRITTEN = REGISTRY.counter("dify_git_bytes_written_total", "Bytes of exported content written to repositories")
+GIT_OPEN_REPOSITORIES = REGISTRY.gauge("dify_git_open_repositories", "Repo handles currently open")
+
+DIFY_API_REQUEST_SECONDS = REGISTRY.histogram(
+    "dify_api_request_duration_seconds", "Duration of Dify API requests", ["method", "endpoint"]
+)
+DIFY_API_ERRORS = REGISTRY.counter("dify_api_errors_total", "Failed Dify API requests", ["method", "endpoint", "status"])
+
+CRYPTO_SECONDS = REGISTRY.histogram(
+    "dify_crypto_duration_seconds", "Duration of credential encryption and decryption", ["operation"]
+)
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "dify_http_request_duration_seconds", "Duration of plugin HTTP requests", ["method", "route", "status"]
+)
+
+SYNC_OBJECTS = REGISTRY.counter(
+    "dify_sync_objects_total", "Workflows and applications processed by syncs", ["operation", "kind", "result"]
+)
+SYNCS_IN_FLIGHT = REGISTRY.gauge("dify_syncs_in_flight", "Syncs currently running")
@@ -0,0 +1,248 @@
+"""Statistical profiling of the running process
+
+``SamplingProfiler`` periodically captures the stack of every thread (from
+``sys._current_frames``) and of every suspended asyncio task, and aggregates
+them into collapsed stacks (``thread;outer;...;inner count`` per line) that
+flamegraph.pl, speedscope and similar tools read directly. Nothing is
+installed into the interpreter, so the process can be profiled on demand.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("dify_git_plugin.profiler")
+
+# Longest profile a single request may ask for
+MAX_PROFILE_SECONDS = 60.0
+
+# Deepest stack recorded per sample
+_MAX_DEPTH = 128
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def _thread_stack(frame) -> Tuple[str, ...]:
+    """Labels of a thread's frames from outermost to innermost"""
+    labels = []
+    while frame is not None and len(labels) < _MAX_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return tuple(reversed(labels))
+
+
+def _all_tasks() -> List[asyncio.Task]:
+    """Tasks of every event loop in the process (asyncio.all_tasks only sees the current thread's loop)"""
+    registry = getattr(asyncio.tasks, "_all_tasks", None)
+    if registry is None:
+        return []
+    try:
+        return list(registry)
+    except RuntimeError:
+        # Changed size while copying; skip tasks in this sample
+        return []
+
+
+def _is_running(task: asyncio.Task) -> bool:
+    """Whether a task is executing right now (as opposed to suspended at an await)"""
+    coro = task.get_coro()
+    return bool(getattr(coro, "cr_running", False))
+
+
+class SamplingProfiler:
+    """Samples all thread and asyncio task stacks every ``interval`` seconds"""
+
+    def __init__(self, interval: float = 0.005, include_tasks: bool = True):
+        self.interval = interval
+        self.include_tasks = include_tasks
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.duration = 0.0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample(self) -> None:
+        """Take one sample of every other thread and every suspended task"""
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            self.stacks[(f"thread:{names.get(ident, ident)}",) + _thread_stack(frame)] += 1
+
+        if self.include_tasks:
+            for task in _all_tasks():
+                # A running task's frames are already on its thread's stack
+                if task.done() or _is_running(task):
+                    continue
+                # Suspended at an await: oldest frame first
+                frames = task.get_stack(limit=_MAX_DEPTH)
+                if frames:
+                    self.stacks[(f"task:{task.get_name()}",) + tuple(_frame_label(f) for f in frames)] += 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.sample()
+            except Exception:
+                logger.exception("Profiler sample failed")
+            self._stop_event.wait(self.interval)
+
+    def start(self) -> "SamplingProfiler":
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self.started_at is not None:
+            self.duration = time.monotonic() - self.started_at
+        return self
+
+    def run_for(self, seconds: float) -> "SamplingProfiler":
+        """Profile the process for ``seconds`` (blocking)"""
+        self.start()
+        time.sleep(min(seconds, MAX_PROFILE_SECONDS))
+        return self.stop()
+
+    def collapsed(self) -> str:
+        """Collapsed stacks, one ``frame;frame;... count`` line per distinct stack"""
+        lines = [f"{';'.join(stack)} {count}" for stack, count in self.stacks.most_common()]
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def top(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Innermost frames by share of samples"""
+        leaves: Counter = Counter()
+        for stack, count in self.stacks.items():
+            if len(stack) > 1:
+                leaves[stack[-1]] += count
+        total = sum(self.stacks.values()) or 1
+        return [{"frame": frame, "samples": n, "ratio": round(n / total, 4)} for frame, n in leaves.most_common(limit)]
+
+    def summary(self, top: int = 20) -> Dict[str, Any]:
+        return {
+            "samples": self.samples,
+            "duration": round(self.duration, 3),
+            "interval": self.interval,
+            "stacks": len(self.stacks),
+            "top": self.top(top),
+        }
+
+
+# Only one on-demand profile at a time; concurrent samplers would skew each other
+_profile_lock = threading.Lock()
+
+
+@contextmanager
+def exclusive_profile() -> Iterator[bool]:
+    """Yields whether this caller may run an on-demand profile now"""
+    acquired = _profile_lock.acquire(blocking=False)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            _profile_lock.release()
+
+
+class SlowRequestLog:
+    """Profiles requests that run longer than ``threshold`` seconds
+
+    A request is not sampled while it is fast. A watchdog thread notices
+    requests that have run for ``threshold`` seconds and starts a sampler for
+    each; when such a request finishes, the profile of its slow tail is kept
+    in a bounded log and summarized in a warning. At most ``max_concurrent``
+    slow requests are profiled at once.
+    """
+
+    def __init__(self, threshold: float = 10.0, interval: float = 0.01, max_entries: int = 20, max_concurrent: int = 2):
+        self.threshold = threshold
+        self.interval = interval
+        self.max_concurrent = max_concurrent
+        self.entries: Deque[Dict[str, Any]] = deque(maxlen=max_entries)
+        self._watched: Dict[int, Dict[str, Any]] = {}
+        self._active = 0
+        self._lock = threading.Lock()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def _watch_loop(self) -> None:
+        tick = min(1.0, self.threshold / 4)
+        while True:
+            time.sleep(tick)
+            now = time.monotonic()
+            with self._lock:
+                for request in self._watched.values():
+                    if request["profiler"] or now - request["started"] < self.threshold:
+                        continue
+                    if self._active >= self.max_concurrent:
+                        break
+                    request["profiler"] = SamplingProfiler(self.interval).start()
+                    self._active += 1
+
+    @contextmanager
+    def watch(self, method: str, path: str) -> Iterator[None]:
+        """Time the block and profile it once it is slow"""
+        request = {"started": time.monotonic(), "profiler": None}
+        with self._lock:
+            self._watched[id(request)] = request
+            if self._watchdog is None:
+                self._watchdog = threading.Thread(target=self._watch_loop, name="slow-request-watchdog", daemon=True)
+                self._watchdog.start()
+        try:
+            yield
+        finally:
+            with self._lock:
+                del self._watched[id(request)]
+                profiler = request["profiler"]
+                if profiler is not None:
+                    self._active -= 1
+            elapsed = time.monotonic() - request["started"]
+            if profiler is not None:
+                profiler.stop()
+            if elapsed >= self.threshold:
+                self._record(method, path, elapsed, profiler)
+
+    def _record(self, method: str, path: str, elapsed: float, profiler: Optional[SamplingProfiler]) -> None:
+        entry = {
+            "method": method,
+            "path": path,
+            "duration": round(elapsed, 3),
+            "finished_at": datetime.utcnow().isoformat(),
+            "profile": profiler.summary(top=10) if profiler else None,
+            "collapsed": profiler.collapsed() if profiler else None,
+        }
+        self.entries.append(entry)
+        top = entry["profile"]["top"] if entry["profile"] else []
+        logger.warning(
+            "Slow request %s %s took %.1fs (hottest frame: %s)", method, path, elapsed, top[0]["frame"] if top else "n/a"
+        )
+
+
+_slow_request_log: Optional[SlowRequestLog] = None
+_slow_request_log_lock = threading.Lock()
+
+
+def get_slow_request_log() -> Optional[SlowRequestLog]:
+    """The process-wide slow-request log, or None when PLUGIN_SLOW_REQUEST_SECONDS is 0"""
+    global _slow_request_log
+    threshold = float(os.getenv("PLUGIN_SLOW_REQUEST_SECONDS", "10"))
+    if threshold <= 0:
+        return None
+    with _slow_request_log_lock:
+        if _slow_request_log is None:
+            _slow_request_log = SlowRequestLog(threshold)
+        return _slow_request_log
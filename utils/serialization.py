@@ -0,0 +1,48 @@
+"""Canonical serialization for exported objects"""
+
+import hashlib
+import json
+import math
+from datetime import date, datetime
+from typing import Any
+
+# Fields that change on every export without the underlying object changing.
+# They are kept on the export models but never written to the repository.
+VOLATILE_EXPORT_FIELDS = {"exported_at"}
+
+
+def _normalize(value: Any) -> Any:
+    """Normalize values so equal data always serializes to the same text"""
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, float):
+        if math.isnan(value) or math.isinf(value):
+            raise ValueError(f"Cannot serialize non-finite number: {value}")
+        # 1.0 and 1 are the same number to Dify; always write the integer form
+        if value.is_integer():
+            return int(value)
+        return value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (str, int)):
+        return value
+    return str(value)
+
+
+def canonical_json(data: Any) -> str:
+    """Serialize data to canonical JSON (sorted keys, stable numbers, trailing newline)"""
+    return json.dumps(_normalize(data), indent=2, sort_keys=True, ensure_ascii=False, separators=(",", ": ")) + "\n"
+
+
+def content_hash(data: Any) -> str:
+    """Hash of the canonical serialization, equal for equal data regardless of key order"""
+    return hashlib.sha256(canonical_json(data).encode("utf-8")).hexdigest()
+
+
+def canonical_export(export: Any) -> str:
+    """Serialize an export model to canonical JSON without volatile fields"""
+    return canonical_json(export.dict(exclude=VOLATILE_EXPORT_FIELDS))
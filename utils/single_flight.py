@@ -0,0 +1,116 @@
+"""Coalescing of concurrent identical operations"""
+
+import asyncio
+import copy
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class SingleFlight:
+    """Run at most one operation per key at a time and share its result
+
+    A call for a key that is already in flight waits for the running call and
+    gets its result (or exception) instead of starting the work again. A
+    successful result is also handed to calls arriving within ``reuse_window``
+    seconds after it completed. Cancelling a call only stops that call from
+    waiting: the work carries on for the others, and if the work itself is
+    cancelled a waiting call runs it again. Works across threads and event
+    loops, so request handlers, background jobs and the scheduler share one
+    instance.
+    """
+
+    def __init__(self, reuse_window: float = 0.0, clock: Callable[[], float] = time.monotonic):
+        self.reuse_window = reuse_window
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._recent: Dict[Hashable, Tuple[float, Any]] = {}
+        self.stats = {"executed": 0, "joined": 0, "reused": 0}
+
+    def _recent_result(self, key: Hashable, now: float) -> Tuple[bool, Any]:
+        entry = self._recent.get(key)
+        if entry is None:
+            return False, None
+        finished, result = entry
+        if now - finished > self.reuse_window:
+            del self._recent[key]
+            return False, None
+        return True, result
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fn`` for ``key`` unless an identical call is running or just finished"""
+        while True:
+            with self._lock:
+                found, result = self._recent_result(key, self.clock())
+                if found:
+                    self.stats["reused"] += 1
+                    return copy.deepcopy(result)
+
+                future = self._in_flight.get(key)
+                leader = future is None
+                if leader:
+                    future = Future()
+                    self._in_flight[key] = future
+                    self.stats["executed"] += 1
+                else:
+                    self.stats["joined"] += 1
+
+            if leader:
+                # The work runs as its own task, so cancelling the leader does not cancel it for the joiners
+                task = asyncio.ensure_future(fn())
+                task.add_done_callback(lambda done: self._settle(key, future, done))
+                return await asyncio.shield(task)
+
+            try:
+                return copy.deepcopy(await asyncio.shield(asyncio.wrap_future(future)))
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The work itself was cancelled (e.g. its event loop shut down); run it again
+
+    def _settle(self, key: Hashable, future: Future, task: "asyncio.Future[Any]") -> None:
+        if task.cancelled():
+            self.finish(key, future, error=asyncio.CancelledError())
+        elif task.exception() is not None:
+            self.finish(key, future, error=task.exception())
+        else:
+            self.finish(key, future, task.result())
+
+    def claim(self, key: Hashable) -> Optional[Future]:
+        """Mark ``key`` in flight for a caller that runs the work itself
+
+        Returns the future to pass to ``finish``, or None when a call for the
+        key is already running. Calls to ``do`` made meanwhile join it.
+        """
+        with self._lock:
+            if key in self._in_flight:
+                return None
+            future = self._in_flight[key] = Future()
+            self.stats["executed"] += 1
+            return future
+
+    def finish(self, key: Hashable, future: Future, result: Any = None, error: Optional[BaseException] = None) -> None:
+        """Hand the outcome of a claimed or leading call to the calls waiting on it"""
+        # Waiters get a snapshot, so the caller is free to modify its result
+        snapshot = None if error is not None else copy.deepcopy(result)
+        with self._lock:
+            del self._in_flight[key]
+            if error is None and self.reuse_window > 0:
+                self._recent[key] = (self.clock(), snapshot)
+        if isinstance(error, asyncio.CancelledError):
+            # Waiting calls retry rather than being cancelled themselves
+            future.cancel()
+        elif error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(snapshot)
+
+    def forget(self, key: Optional[Hashable] = None) -> None:
+        """Drop remembered results (all of them when no key is given)"""
+        with self._lock:
+            if key is None:
+                self._recent.clear()
+            else:
+                self._recent.pop(key, None)
@@ -0,0 +1,22 @@
+"""Local persistent storage helpers"""
+
+import os
+import sqlite3
+from pathlib import Path
+from typing import Optional
+
+
+def get_storage_dir(storage_path: Optional[str] = None) -> Path:
+    """Get the plugin storage directory, creating it if needed"""
+    path = Path(storage_path or os.getenv("STORAGE_PATH", "./storage"))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def connect_sqlite(db_path: Path) -> sqlite3.Connection:
+    """Open a SQLite connection suitable for use from several threads and processes"""
+    connection = sqlite3.connect(str(db_path), timeout=30, isolation_level=None, check_same_thread=False)
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
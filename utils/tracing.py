@@ -0,0 +1,233 @@
+"""Tracing spans
+
+Spans follow the OpenTelemetry data model (128-bit trace ids, 64-bit span
+ids, parent links, attributes, status) and are exported as OTLP-style JSON
+objects, one per line, to the console or a file for offline analysis. The
+current span lives in a context variable, so it follows asyncio tasks; use
+``propagate`` to carry it into thread pools. Tracing is turned on by
+``PLUGIN_TRACING_EXPORTER`` (``console`` or ``file``); while it is off
+``span`` yields a shared no-op span and records nothing.
+"""
+
+import asyncio
+import contextvars
+import functools
+import json
+import logging
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, TextIO
+
+logger = logging.getLogger("dify_git_plugin.tracing")
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+class Span:
+    """A timed operation within a trace"""
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None, attributes: Optional[Dict] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = "UNSET"
+        self.status_message: Optional[str] = None
+        self.thread = threading.current_thread().name
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, error: BaseException) -> None:
+        self.status = "ERROR"
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """OTLP JSON field names, so exported spans can be converted for other tools"""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round((self.end_ns - self.start_ns) / 1e6, 3) if self.end_ns else None,
+            "attributes": self.attributes,
+            "status": {"code": self.status, "message": self.status_message},
+            "thread": self.thread,
+        }
+
+
+class _NoOpSpan:
+    """Returned while tracing is off; every call does nothing"""
+
+    trace_id = span_id = parent_id = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_exception(self, error: BaseException) -> None:
+        pass
+
+
+NOOP_SPAN = _NoOpSpan()
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("dify_git_current_span", default=None)
+
+
+class ConsoleExporter:
+    """Writes finished spans as JSON lines to a stream (stderr by default)"""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream or sys.stderr
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+class FileExporter(ConsoleExporter):
+    """Appends finished spans as JSON lines to a file"""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        super().__init__(open(path, "a", buffering=1, encoding="utf-8"))
+
+
+class InMemoryExporter:
+    """Keeps finished spans in a list (for tests)"""
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+
+class Tracer:
+    """Creates spans and hands finished ones to the exporter"""
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    @contextmanager
+    def span(self, name: str, attributes: Optional[Dict[str, Any]] = None, activate: bool = True) -> Iterator[Any]:
+        """Run the block in a child span of the current one (or a new trace)
+
+        With ``activate`` False the span is not made current, which generators
+        must use since their body runs interleaved with the consumer's code.
+        """
+        if self.exporter is None:
+            yield NOOP_SPAN
+            return
+
+        parent = _current_span.get()
+        span = Span(name, parent.trace_id if parent else secrets.token_hex(16), parent.span_id if parent else None, attributes)
+        token = _current_span.set(span) if activate else None
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            if token is not None:
+                _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            try:
+                self.exporter.export(span)
+            except Exception:
+                logger.exception("Failed to export span %s", name)
+
+    @contextmanager
+    def continue_trace(self, traceparent: Optional[str]) -> Iterator[None]:
+        """Make spans in the block children of a remote W3C ``traceparent``"""
+        match = _TRACEPARENT.match(traceparent or "")
+        if self.exporter is None or not match or _current_span.get() is not None:
+            yield
+            return
+
+        remote = Span("remote", match.group(1))
+        remote.span_id = match.group(2)
+        token = _current_span.set(remote)
+        try:
+            yield
+        finally:
+            _current_span.reset(token)
+
+
+def _exporter_from_env():
+    exporter = os.getenv("PLUGIN_TRACING_EXPORTER", "").lower()
+    if exporter == "console":
+        return ConsoleExporter()
+    if exporter == "file":
+        return FileExporter(os.getenv("PLUGIN_TRACING_FILE", "./storage/traces.jsonl"))
+    return None
+
+
+TRACER = Tracer(_exporter_from_env())
+
+
+def span(name: str, attributes: Optional[Dict[str, Any]] = None, activate: bool = True):
+    """Context manager running a block in a span of the process-wide tracer"""
+    return TRACER.span(name, attributes, activate)
+
+
+def current_span() -> Any:
+    return _current_span.get() or NOOP_SPAN
+
+
+def traceparent() -> Optional[str]:
+    """W3C ``traceparent`` header value for the current span, to propagate to other services"""
+    current = _current_span.get()
+    return f"00-{current.trace_id}-{current.span_id}-01" if current else None
+
+
+def traced(name: Optional[str] = None, attributes: Optional[Dict[str, Any]] = None) -> Callable[[Callable], Callable]:
+    """Decorator running a function (sync or async) in a span named after it"""
+
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not TRACER.enabled:
+                    return await func(*args, **kwargs)
+                with TRACER.span(span_name, attributes):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not TRACER.enabled:
+                return func(*args, **kwargs)
+            with TRACER.span(span_name, attributes):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def propagate(func: Callable) -> Callable:
+    """Bind ``func`` to the current context so spans it opens in another thread join the current trace"""
+    if not TRACER.enabled:
+        return func
+    return functools.partial(contextvars.copy_context().run, func)
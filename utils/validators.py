@@ -2,56 +2,79 @@
 
 import re
 from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
 from urllib.parse import urlparse
 
+# Clone URL forms git accepts: URLs with a transport, and scp-like git@host:path
+_REPOSITORY_URL = re.compile(r"(?:https?|git|ssh|file)://.+|git@.+:.+")
+
 
 def validate_repository_url(url: str) -> bool:
     """Validate Git repository URL"""
-    if not url:
-        return False
+    return bool(url) and _REPOSITORY_URL.match(url) is not None
 
-    # Check for common Git URL patterns
-    patterns = [
-        r"^https?://.+",  # HTTP/HTTPS
-        r"^git@.+:.+",  # SSH
-        r"^git://.+",  # Git protocol
-        r"^file://.+",  # Local file
-    ]
 
-    for pattern in patterns:
-        if re.match(pattern, url):
-            return True
+_SCP_URL = re.compile(r"^(?:[^@/]+@)?([^:/]+):(?!//)(.+)$")
 
-    return False
 
+def _split_repository_url(url: str):
+    url = url.strip()
+    scp = _SCP_URL.match(url)
+    if scp and "://" not in url:
+        return scp.group(1), scp.group(2)
+    parsed = urlparse(url)
+    return parsed.hostname or "", parsed.path
 
-def validate_branch_name(branch: str) -> bool:
-    """Validate Git branch name"""
-    if not branch:
-        return False
 
-    # Git branch naming rules
-    # Cannot contain: spaces, ~, ^, :, ?, *, [, \, @, {, }
-    invalid_chars = r"[ ~^:?*\[\\@{]"
-    if re.search(invalid_chars, branch):
-        return False
+def normalize_repository_url(url: str) -> str:
+    """Reduce a clone, web or SSH URL to ``host/owner/repo`` for comparison"""
+    host, path = _split_repository_url(url)
+    path = path.strip("/")
+    if path.endswith(".git"):
+        path = path[:-4]
+    return f"{host}/{path}".lower()
 
-    # Cannot start with . or end with .lock
-    if branch.startswith(".") or branch.endswith(".lock"):
-        return False
 
-    # Cannot be a single dot or double dots
-    if branch in [".", ".."]:
-        return False
+def repository_host(url: str) -> str:
+    """Get the host a repository URL points at (empty for local paths)"""
+    return _split_repository_url(url)[0].lower()
+
+
+# Characters `git check-ref-format` rejects anywhere in a ref name
+_REF_INVALID_CHARS = re.compile(r"[\x00-\x20\x7f~^:?*\[\\]")
 
-    return True
+
+def validate_ref_name(ref: str) -> bool:
+    """Validate a ref name (``refs/heads/main``, ``v1.0``) by the rules of ``git check-ref-format``"""
+    # Substring tests run in C and are cheaper than regex alternations scanned at every position
+    return (
+        bool(ref)
+        and ref != "@"
+        and not ref.startswith((".", "/"))
+        and not ref.endswith(("/", ".", ".lock"))
+        and ".." not in ref
+        and "@{" not in ref
+        and "//" not in ref
+        # A component starting with "." or ending with ".lock"
+        and "/." not in ref
+        and ".lock/" not in ref
+        and _REF_INVALID_CHARS.search(ref) is None
+    )
+
+
+def validate_branch_name(branch: str) -> bool:
+    """Validate Git branch name (``git check-ref-format --branch``)"""
+    return validate_ref_name(branch) and not branch.startswith("-") and branch != "HEAD"
+
+
+# Characters not allowed in file names on common file systems
+_FILENAME_INVALID = re.compile(r'[<>:"/\\|?*]')
 
 
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename for safe file system usage"""
     # Remove or replace invalid characters
-    invalid_chars = r'[<>:"/\\|?*]'
-    sanitized = re.sub(invalid_chars, "_", filename)
+    sanitized = _FILENAME_INVALID.sub("_", filename)
 
     # Remove leading/trailing dots and spaces
     sanitized = sanitized.strip(". ")
@@ -69,7 +92,38 @@ def validate_file_path(file_path: str, base_dir: Path) -> bool:
         full_path = (base_dir / file_path).resolve()
         base_resolved = base_dir.resolve()
 
-        # Check if resolved path is within base directory
-        return str(full_path).startswith(str(base_resolved))
+        # Compare whole components: /data/repo-2 is not inside /data/repo
+        return full_path.is_relative_to(base_resolved)
     except Exception:
         return False
+
+
+def validate_many(values: Iterable[str], kind: str, base_dir: Optional[Path] = None) -> List[bool]:
+    """Validate many values of one ``kind`` at once; returns one result per value, in order
+
+    ``kind`` is ``"url"``, ``"branch"``, ``"ref"`` or ``"path"`` (relative to
+    ``base_dir``). Paths share one resolution of ``base_dir``.
+    """
+    if kind == "path":
+        if base_dir is None:
+            raise ValueError("Validating paths requires base_dir")
+        base_resolved = Path(base_dir).resolve()
+        results = []
+        for value in values:
+            try:
+                results.append((base_resolved / value).resolve().is_relative_to(base_resolved))
+            except Exception:
+                results.append(False)
+        return results
+
+    validator = _VALIDATORS.get(kind)
+    if validator is None:
+        raise ValueError(f"Unknown validator kind: {kind}")
+    return [validator(value) for value in values]
+
+
+_VALIDATORS: Dict[str, Callable[[str], bool]] = {
+    "url": validate_repository_url,
+    "branch": validate_branch_name,
+    "ref": validate_ref_name,
+}
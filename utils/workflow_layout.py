@@ -0,0 +1,75 @@
+"""Exploded on-disk layout for large workflows"""
+
+import copy
+from typing import Any, Dict, List, Optional, Tuple
+
+from .validators import sanitize_filename
+
+SKELETON_FILE = "workflow.json"
+NODES_DIR = "nodes"
+NODE_REF_KEY = "$ref"
+
+
+def _find_nodes(data: Dict[str, Any]) -> Optional[List[Any]]:
+    """Locate the graph node list inside workflow data"""
+    for container in (data, data.get("workflow")):
+        if isinstance(container, dict):
+            graph = container.get("graph")
+            if isinstance(graph, dict) and isinstance(graph.get("nodes"), list):
+                return graph["nodes"]
+    return None
+
+
+def explode_workflow(document: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Split a workflow export document into a graph skeleton and one document per node
+
+    Returns a mapping of paths relative to the workflow directory to their content.
+    Node entries in the skeleton are replaced by references so node order is kept.
+    """
+    skeleton = copy.deepcopy(document)
+    nodes = _find_nodes(skeleton.get("data", {}))
+    files: Dict[str, Dict[str, Any]] = {}
+
+    if nodes is not None:
+        used = set()
+        for index, node in enumerate(nodes):
+            if not isinstance(node, dict):
+                continue
+
+            base = sanitize_filename(str(node.get("id", ""))) or f"node-{index}"
+            name = base
+            suffix = 1
+            while name in used:
+                suffix += 1
+                name = f"{base}-{suffix}"
+            used.add(name)
+
+            path = f"{NODES_DIR}/{name}.json"
+            files[path] = node
+            nodes[index] = {NODE_REF_KEY: path}
+
+    files[SKELETON_FILE] = skeleton
+    return files
+
+
+def node_references(skeleton: Dict[str, Any]) -> List[Tuple[int, str]]:
+    """List (position, path) of node references in a workflow skeleton"""
+    nodes = _find_nodes(skeleton.get("data", {})) or []
+    return [
+        (index, node[NODE_REF_KEY])
+        for index, node in enumerate(nodes)
+        if isinstance(node, dict) and set(node) == {NODE_REF_KEY}
+    ]
+
+
+def assemble_workflow(skeleton: Dict[str, Any], node_files: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Reassemble a workflow export document from its skeleton and node documents"""
+    document = copy.deepcopy(skeleton)
+    nodes = _find_nodes(document.get("data", {}))
+
+    for index, path in node_references(document):
+        if path not in node_files:
+            raise ValueError(f"Missing workflow node file: {path}")
+        nodes[index] = node_files[path]
+
+    return document